@@ -3,6 +3,7 @@ pragma solidity ^0.8.20;
 
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
+import "@openzeppelin/contracts/utils/cryptography/MerkleProof.sol";
 
 /**
  * @title Certificate
@@ -18,6 +19,9 @@ contract Certificate is Ownable {
     event CertificateRevoked(bytes32 indexed certificateHash, address indexed institution, uint256 timestamp);
     event InstitutionAdded(address indexed institution);
     event InstitutionRemoved(address indexed institution);
+    event BatchAnchored(bytes32 indexed merkleRoot, address indexed institution, uint256 size, uint256 timestamp);
+    event BatchRevoked(bytes32 indexed merkleRoot, address indexed institution, uint256 timestamp);
+    event BatchMemberRevoked(bytes32 indexed merkleRoot, bytes32 indexed certificateHash, address indexed institution, uint256 timestamp);
 
     // --- State Variables ---
 
@@ -40,6 +44,13 @@ contract Certificate is Ownable {
     // Counter for the total number of issued certificates.
     uint256 private _certificateCount;
 
+    // Mapping from the Merkle root of an anchored batch to its details. Only the root is stored;
+    // each certificate holder keeps the proof that links their certificate hash to it.
+    mapping(bytes32 => CertificateDetails) private _batches;
+
+    // Certificates revoked individually inside an anchored batch, by Merkle root.
+    mapping(bytes32 => mapping(bytes32 => bool)) private _revokedBatchMembers;
+
     // --- Modifiers ---
 
     /**
@@ -82,6 +93,93 @@ contract Certificate is Ownable {
      * @param certificateHash The keccak256 hash of the off-chain certificate data.
      */
     function issueCertificate(bytes32 certificateHash) external onlyInstitution {
+        _issueCertificate(certificateHash);
+    }
+
+    /**
+     * @dev Issues a batch of certificates in one transaction.
+     * Emits one `CertificateIssued` event per certificate, exactly like `issueCertificate`.
+     * @param certificateHashes The keccak256 hashes of the off-chain certificate data.
+     */
+    function issueCertificates(bytes32[] calldata certificateHashes) external onlyInstitution {
+        for (uint256 i = 0; i < certificateHashes.length; i++) {
+            _issueCertificate(certificateHashes[i]);
+        }
+    }
+
+    /**
+     * @dev Revokes an existing certificate.
+     * @param certificateHash The hash of the certificate to revoke.
+     */
+    function revokeCertificate(bytes32 certificateHash) external onlyInstitution {
+        _revokeCertificate(certificateHash);
+    }
+
+    /**
+     * @dev Revokes a batch of certificates in one transaction.
+     * Emits one `CertificateRevoked` event per certificate, exactly like `revokeCertificate`.
+     * @param certificateHashes The hashes of the certificates to revoke.
+     */
+    function revokeCertificates(bytes32[] calldata certificateHashes) external onlyInstitution {
+        for (uint256 i = 0; i < certificateHashes.length; i++) {
+            _revokeCertificate(certificateHashes[i]);
+        }
+    }
+
+    // --- Merkle Batch Anchoring (Institution only) ---
+
+    /**
+     * @dev Anchors a whole batch of certificates as the root of a Merkle tree over their hashes.
+     * Leaves are keccak256(certificateHash) and pairs are hashed in sorted order (see scripts/merkle.py).
+     * @param merkleRoot The root of the batch's Merkle tree.
+     * @param size The number of certificates in the batch, recorded in the event only.
+     */
+    function anchorBatch(bytes32 merkleRoot, uint256 size) external onlyInstitution {
+        require(merkleRoot != bytes32(0), "Invalid Merkle root");
+        require(_batches[merkleRoot].status == Status.Unissued, "Batch already anchored");
+
+        _batches[merkleRoot] = CertificateDetails({
+            status: Status.Issued,
+            issuingInstitution: msg.sender,
+            timestamp: block.timestamp
+        });
+
+        emit BatchAnchored(merkleRoot, msg.sender, size, block.timestamp);
+    }
+
+    /**
+     * @dev Revokes every certificate of an anchored batch.
+     * @param merkleRoot The root of the batch to revoke.
+     */
+    function revokeBatch(bytes32 merkleRoot) external onlyInstitution {
+        CertificateDetails storage batch = _batches[merkleRoot];
+        require(batch.status == Status.Issued, "Batch not in issued state");
+
+        batch.status = Status.Revoked;
+        emit BatchRevoked(merkleRoot, msg.sender, block.timestamp);
+    }
+
+    /**
+     * @dev Revokes a single certificate of an anchored batch, identified by its Merkle proof.
+     * @param merkleRoot The root of the batch containing the certificate.
+     * @param certificateHash The hash of the certificate to revoke.
+     * @param proof The sibling hashes from the certificate's leaf up to the root.
+     */
+    function revokeBatchMember(bytes32 merkleRoot, bytes32 certificateHash, bytes32[] calldata proof) external onlyInstitution {
+        require(_batches[merkleRoot].status == Status.Issued, "Batch not in issued state");
+        require(MerkleProof.verifyCalldata(proof, merkleRoot, _batchLeaf(certificateHash)), "Invalid Merkle proof");
+        require(!_revokedBatchMembers[merkleRoot][certificateHash], "Certificate already revoked");
+
+        _revokedBatchMembers[merkleRoot][certificateHash] = true;
+        emit BatchMemberRevoked(merkleRoot, certificateHash, msg.sender, block.timestamp);
+    }
+
+    // --- Internal Lifecycle Logic ---
+
+    /**
+     * @dev Stores a new certificate record. Shared by the single and batch issuance functions.
+     */
+    function _issueCertificate(bytes32 certificateHash) internal {
         require(_certificates[certificateHash].status == Status.Unissued, "Certificate already exists");
 
         _certificates[certificateHash] = CertificateDetails({
@@ -95,10 +193,9 @@ contract Certificate is Ownable {
     }
 
     /**
-     * @dev Revokes an existing certificate.
-     * @param certificateHash The hash of the certificate to revoke.
+     * @dev Marks an issued certificate as revoked. Shared by the single and batch revocation functions.
      */
-    function revokeCertificate(bytes32 certificateHash) external onlyInstitution {
+    function _revokeCertificate(bytes32 certificateHash) internal {
         CertificateDetails storage cert = _certificates[certificateHash];
         require(cert.status == Status.Issued, "Certificate not in issued state");
         // Optional: require(cert.issuingInstitution == msg.sender, "Only the issuing institution can revoke");
@@ -107,6 +204,14 @@ contract Certificate is Ownable {
         emit CertificateRevoked(certificateHash, msg.sender, block.timestamp);
     }
 
+    /**
+     * @dev Returns the Merkle leaf of a certificate. Hashing the 32-byte certificate hash once more keeps
+     * leaves distinct from the 64-byte preimages of inner nodes, so an inner node cannot pass as a certificate.
+     */
+    function _batchLeaf(bytes32 certificateHash) internal pure returns (bytes32) {
+        return keccak256(abi.encodePacked(certificateHash));
+    }
+
     // --- Public View Functions ---
 
     /**
@@ -119,6 +224,64 @@ contract Certificate is Ownable {
         return (cert.status, cert.issuingInstitution, cert.timestamp);
     }
 
+    /**
+     * @dev Verifies the status of many certificates in a single call.
+     * @param certificateHashes The hashes of the certificates to verify.
+     * @return statuses The status of each certificate, in input order.
+     * @return institutions The issuing institution of each certificate.
+     * @return timestamps The issuance timestamp of each certificate.
+     */
+    function getCertificateStatuses(bytes32[] calldata certificateHashes)
+        external
+        view
+        returns (Status[] memory statuses, address[] memory institutions, uint256[] memory timestamps)
+    {
+        uint256 count = certificateHashes.length;
+        statuses = new Status[](count);
+        institutions = new address[](count);
+        timestamps = new uint256[](count);
+
+        for (uint256 i = 0; i < count; i++) {
+            CertificateDetails storage cert = _certificates[certificateHashes[i]];
+            statuses[i] = cert.status;
+            institutions[i] = cert.issuingInstitution;
+            timestamps[i] = cert.timestamp;
+        }
+    }
+
+    /**
+     * @dev Returns the status of an anchored batch.
+     * @param merkleRoot The root of the batch.
+     * @return The status, anchoring institution, and timestamp of the batch.
+     */
+    function getBatchStatus(bytes32 merkleRoot) external view returns (Status, address, uint256) {
+        CertificateDetails storage batch = _batches[merkleRoot];
+        return (batch.status, batch.issuingInstitution, batch.timestamp);
+    }
+
+    /**
+     * @dev Verifies a certificate anchored in a batch: its Merkle proof and the status of the batch.
+     * An invalid proof or an unknown root yields `Unissued`; a revoked batch or member yields `Revoked`.
+     * @param merkleRoot The root of the batch containing the certificate.
+     * @param certificateHash The hash of the certificate to verify.
+     * @param proof The sibling hashes from the certificate's leaf up to the root.
+     * @return The status, issuing institution, and timestamp of the certificate, as in `getCertificateStatus`.
+     */
+    function verifyBatchMember(bytes32 merkleRoot, bytes32 certificateHash, bytes32[] calldata proof)
+        external
+        view
+        returns (Status, address, uint256)
+    {
+        CertificateDetails storage batch = _batches[merkleRoot];
+        if (batch.status == Status.Unissued || !MerkleProof.verifyCalldata(proof, merkleRoot, _batchLeaf(certificateHash))) {
+            return (Status.Unissued, address(0), 0);
+        }
+        if (_revokedBatchMembers[merkleRoot][certificateHash]) {
+            return (Status.Revoked, batch.issuingInstitution, batch.timestamp);
+        }
+        return (batch.status, batch.issuingInstitution, batch.timestamp);
+    }
+
     /**
      * @dev Checks if an address is an authorized institution.
      * @param institutionAddress The address to check.
@@ -0,0 +1,137 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "@openzeppelin/contracts/access/Ownable.sol";
+
+/**
+ * @title RevocationRegistry
+ * @dev Stores the whole revocation set as a single root: that of a compacted sparse Merkle tree over
+ * certificate hashes, maintained off-chain (see scripts/sparse_merkle.py). Many revocations are published
+ * with one root update instead of one storage write per revoked certificate. Verifiers check a
+ * membership ("revoked") or non-membership ("not revoked") proof against the current root.
+ *
+ * Tree layout: an empty subtree hashes to zero, a subtree holding a single key is that key's leaf
+ * keccak256(0x01 || key), and any other node is keccak256(left || right). Proofs carry the non-zero
+ * siblings from the deepest level up, and a bitmap whose bit d is set when the sibling of the path
+ * node at depth d + 1 is non-zero.
+ */
+contract RevocationRegistry is Ownable {
+    // --- Events ---
+    event RevocationsPublished(bytes32 indexed previousRoot, bytes32 indexed newRoot, uint256 count, uint256 timestamp);
+
+    // --- State Variables ---
+
+    // Root of the sparse Merkle tree of revoked certificate hashes; zero while nothing is revoked.
+    bytes32 public root;
+
+    // Number of revocations published so far.
+    uint256 public revokedCount;
+
+    // --- Constructor ---
+
+    constructor(address initialOwner) Ownable(initialOwner) {}
+
+    // --- Revocation (Owner only) ---
+
+    /**
+     * @dev Publishes a batch of revocations as a new root.
+     * The new root is computed off-chain and not recomputed here: the owner is trusted like the
+     * institutions of `Certificate`, and the revoked hashes are part of the calldata, so anyone can
+     * replay the updates, rebuild the tree and check every root.
+     * @param previousRoot The root the update was computed from; rejects lost or reordered updates.
+     * @param newRoot The root after adding `certificateHashes` to the tree.
+     * @param certificateHashes The newly revoked certificate hashes.
+     */
+    function publishRevocations(bytes32 previousRoot, bytes32 newRoot, bytes32[] calldata certificateHashes) external onlyOwner {
+        require(previousRoot == root, "Stale revocation root");
+        require(certificateHashes.length > 0, "No revocations");
+
+        root = newRoot;
+        revokedCount += certificateHashes.length;
+        emit RevocationsPublished(previousRoot, newRoot, certificateHashes.length, block.timestamp);
+    }
+
+    // --- Public View Functions ---
+
+    /**
+     * @dev Verifies a membership proof: the certificate is revoked.
+     * @param certificateHash The hash of the certificate.
+     * @param depth The depth of the certificate's leaf.
+     * @param bitmap The depths that have a non-zero sibling.
+     * @param siblings The non-zero siblings, deepest first.
+     * @return True if the proof links the certificate's leaf to the current root.
+     */
+    function verifyRevoked(bytes32 certificateHash, uint256 depth, uint256 bitmap, bytes32[] calldata siblings)
+        external
+        view
+        returns (bool)
+    {
+        return _computeRoot(certificateHash, _leaf(certificateHash), depth, bitmap, siblings) == root;
+    }
+
+    /**
+     * @dev Verifies a non-membership proof: the certificate is not revoked.
+     * The certificate's path ends at `depth` either in an empty subtree (`neighbor` is zero) or in the
+     * leaf of another revoked certificate that shares the first `depth` bits of the hash.
+     * @param certificateHash The hash of the certificate.
+     * @param neighbor The revoked certificate whose leaf ends the path, or zero.
+     * @param depth The depth at which the path ends.
+     * @param bitmap The depths that have a non-zero sibling.
+     * @param siblings The non-zero siblings, deepest first.
+     * @return True if the proof shows the certificate is absent from the tree under the current root.
+     */
+    function verifyNotRevoked(
+        bytes32 certificateHash,
+        bytes32 neighbor,
+        uint256 depth,
+        uint256 bitmap,
+        bytes32[] calldata siblings
+    ) external view returns (bool) {
+        bytes32 node;
+        if (neighbor != bytes32(0)) {
+            if (neighbor == certificateHash) {
+                return false;
+            }
+            if (depth > 0 && (uint256(neighbor ^ certificateHash) >> (256 - depth)) != 0) {
+                return false;
+            }
+            node = _leaf(neighbor);
+        }
+        return _computeRoot(certificateHash, node, depth, bitmap, siblings) == root;
+    }
+
+    // --- Internal Proof Logic ---
+
+    /**
+     * @dev Returns the leaf of a revoked certificate. Its 33-byte preimage keeps leaves distinct from
+     * the 64-byte preimages of inner nodes.
+     */
+    function _leaf(bytes32 certificateHash) internal pure returns (bytes32) {
+        return keccak256(abi.encodePacked(bytes1(0x01), certificateHash));
+    }
+
+    /**
+     * @dev Hashes from a node at `depth` on the path of `key` up to the root.
+     */
+    function _computeRoot(bytes32 key, bytes32 node, uint256 depth, uint256 bitmap, bytes32[] calldata siblings)
+        internal
+        pure
+        returns (bytes32)
+    {
+        require(depth <= 256, "Invalid depth");
+        uint256 next = 0;
+        for (uint256 d = depth; d > 0; d--) {
+            uint256 level = d - 1;
+            bytes32 sibling;
+            if (((bitmap >> level) & 1) == 1) {
+                sibling = siblings[next++];
+            }
+            if (((uint256(key) >> (255 - level)) & 1) == 1) {
+                node = keccak256(abi.encodePacked(sibling, node));
+            } else {
+                node = keccak256(abi.encodePacked(node, sibling));
+            }
+        }
+        return node;
+    }
+}
@@ -28,7 +28,11 @@ def analyze_exp2_throughput(summary_file):
     try:
         df = pd.read_csv(os.path.join(DATA_DIR, 'exp2_throughput.csv'))
         fig, ax = plt.subplots(figsize=(10, 6))
-        sns.lineplot(x='concurrency_level', y='tps', data=df, marker='o', ax=ax)
+        if 'account_count' in df.columns:
+            sns.lineplot(x='concurrency_level', y='tps', hue='account_count', data=df, marker='o', ax=ax, palette='viridis')
+            ax.legend(title='Sender Accounts')
+        else:
+            sns.lineplot(x='concurrency_level', y='tps', data=df, marker='o', ax=ax)
         ax.set_title('System Throughput vs. Concurrency Level', fontsize=16, fontweight='bold')
         ax.set_xlabel('Concurrency Level', fontsize=12)
         ax.set_ylabel('Throughput (Transactions per Second)', fontsize=12)
@@ -44,8 +48,31 @@ def analyze_exp2_throughput(summary_file):
     finally:
         plt.close('all')
 
+def analyze_exp2_latency_vs_load(summary_file):
+    try:
+        df = pd.read_csv(os.path.join(DATA_DIR, 'exp2_latency_vs_load.csv'))
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(df['offered_rate'], df['p50_corrected_latency_seconds'], marker='o', label='p50 (corrected)')
+        ax.plot(df['offered_rate'], df['p99_corrected_latency_seconds'], marker='o', label='p99 (corrected)')
+        ax.plot(df['offered_rate'], df['p99_service_latency_seconds'], marker='x', linestyle='--', label='p99 (uncorrected)')
+        ax.set_title('Confirmation Latency vs. Offered Load (Open Loop)', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Offered Load (Transactions per Second)', fontsize=12)
+        ax.set_ylabel('Latency (seconds)', fontsize=12)
+        ax.legend()
+        plot_md = save_plot(fig, 'fig2b_latency_vs_load')
+        summary_file.write("\nThe open-loop run sends transactions at a fixed arrival rate, independent of outstanding requests. Corrected latency is measured from each transaction's intended send time, so it includes the delay caused by a saturated system (coordinated omission).\n\n")
+        summary_file.write(plot_md + "\n")
+    except FileNotFoundError:
+        summary_file.write("\n*   Open-loop data (exp2_latency_vs_load.csv) not found. Skipping latency-versus-load plot.*\n")
+    except Exception as e:
+        summary_file.write(f"\n*   An error occurred during Experiment 2 latency-versus-load analysis: {e}*\n")
+        traceback.print_exc()
+    finally:
+        plt.close('all')
+
 # --- Main Execution ---
 if __name__ == '__main__':
     summary_part_path = os.path.join(ANALYSIS_DIR, '_exp2_summary.md')
     with open(summary_part_path, 'w') as f:
         analyze_exp2_throughput(f)
+        analyze_exp2_latency_vs_load(f)
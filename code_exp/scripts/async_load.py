@@ -0,0 +1,238 @@
+"""
+Asyncio Load Engine for the Throughput Experiment
+
+This module runs thousands of virtual users as coroutines on one event loop.
+All of them share a single AsyncWeb3 client whose aiohttp session provides a
+bounded, keep-alive connection pool, so high concurrency levels need neither OS
+threads nor per-user connections.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+from collections import Counter
+
+import aiohttp
+from web3 import AsyncWeb3, AsyncHTTPProvider
+
+from latency_recorder import LatencyHistogram
+from confirmation_tracker import AsyncConfirmationTracker
+
+MAX_CONNECTION_POOL_SIZE = 256
+
+class LevelStats:
+    """Counters and a latency histogram collected while one concurrency level runs."""
+
+    def __init__(self):
+        self.successful_tx = 0
+        self.failed_tx = 0
+        self.latency = LatencyHistogram()
+        self.errors = Counter()
+        self.duration = 0.0
+
+    def record_success(self, latency):
+        self.successful_tx += 1
+        self.latency.record(latency)
+
+    def record_failure(self, error):
+        self.failed_tx += 1
+        self.errors[type(error).__name__] += 1
+
+class AsyncLoadEngine:
+    """Drives closed-loop issueCertificate load from coroutines sharing one connection pool."""
+
+    def __init__(self, rpc_url, contract_address, contract_abi, senders,
+                 receipt_timeout=30, poll_interval=0.05, request_timeout=120):
+        """
+        Initialize the AsyncLoadEngine.
+
+        Args:
+            rpc_url (str): The HTTP JSON-RPC endpoint
+            contract_address (str): Address of the deployed Certificate contract
+            contract_abi (list): ABI of the Certificate contract
+            senders (list): Unlocked accounts that send the transactions; virtual
+                user i sends from senders[i % len(senders)] with a local nonce stream
+            receipt_timeout (int): Seconds to wait for a receipt before counting a failure
+            poll_interval (float): Seconds between chain head polls of the confirmation tracker
+            request_timeout (int): Timeout in seconds for a single HTTP request
+        """
+        self.rpc_url = rpc_url
+        self.contract_address = contract_address
+        self.contract_abi = contract_abi
+        self.senders = list(senders)
+        self._next_nonces = {}
+        self._released_nonces = {}  # Sender -> min-heap of nonces whose transactions never reached the node
+        self.receipt_timeout = receipt_timeout
+        self.poll_interval = poll_interval
+        self.request_timeout = request_timeout
+        self.session = None
+        self.w3 = None
+        self.contract = None
+        self.confirmations = None
+        self.gas = None
+
+    async def start(self, pool_size=MAX_CONNECTION_POOL_SIZE):
+        """
+        Open the shared connection pool and the AsyncWeb3 client.
+
+        Args:
+            pool_size (int): Maximum number of simultaneous HTTP connections
+        """
+        await self.close()
+        connector = aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        provider = AsyncHTTPProvider(self.rpc_url)
+        await provider.cache_async_session(self.session)
+        self.w3 = AsyncWeb3(provider)
+        self.contract = self.w3.eth.contract(address=self.contract_address, abi=self.contract_abi)
+        # Receipts are resolved from new blocks rather than polled per transaction.
+        self.confirmations = AsyncConfirmationTracker(
+            self.rpc_url, self.session, poll_interval=self.poll_interval, timeout=self.receipt_timeout
+        )
+        self.confirmations.start()
+
+    async def close(self):
+        """Stop the confirmation tracker and close the shared connection pool."""
+        if self.confirmations is not None:
+            await self.confirmations.stop()
+            self.confirmations = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _sync_nonce(self, sender):
+        # Only called with no transaction of the sender outstanding (before a level starts).
+        self._next_nonces[sender] = await self.w3.eth.get_transaction_count(sender, 'pending')
+        self._released_nonces[sender] = []
+
+    def _allocate_nonce(self, sender):
+        # No await between read and increment, so this is atomic on the event loop.
+        released = self._released_nonces[sender]
+        if released:
+            return heapq.heappop(released)
+        nonce = self._next_nonces[sender]
+        self._next_nonces[sender] = nonce + 1
+        return nonce
+
+    async def _release_nonce(self, sender, nonce):
+        """
+        Hand back the nonce of a failed send so the sender's next transaction fills it.
+
+        The counter is never moved back: other virtual users may hold higher nonces of the
+        same sender. A send that timed out may still have reached the node, so the nonce is
+        only recycled while the node's pending count has not passed it; if it was queued
+        behind another gap, the reuse is rejected and released again until the count moves on.
+        """
+        if await self.w3.eth.get_transaction_count(sender, 'pending') > nonce:
+            return
+        released = self._released_nonces[sender]
+        if nonce not in released:
+            heapq.heappush(released, nonce)
+
+    async def _fill_gaps(self):
+        """
+        Fill every released nonce that no later send reused with a zero-value self-transfer.
+
+        Transactions above a gap stay queued in the node, so this runs before a level ends.
+
+        Returns:
+            int: The number of gaps that were filled
+        """
+        filled = 0
+        for sender, released in self._released_nonces.items():
+            pending = await self.w3.eth.get_transaction_count(sender, 'pending')
+            while released:
+                nonce = heapq.heappop(released)
+                if nonce < pending:
+                    continue
+                logging.warning(f"Repairing nonce gap {nonce} for {sender} with a filler transaction")
+                tx_hash = await self.w3.eth.send_transaction({
+                    'from': sender, 'to': sender, 'value': 0, 'nonce': nonce, 'gas': 21000
+                })
+                await self.confirmations.wait(tx_hash)
+                filled += 1
+        return filled
+
+    async def prepare(self, next_hash):
+        """
+        Estimate the issueCertificate gas (once) and sync every sender's nonce stream.
+
+        Must be called after start() and before sending.
+
+        Args:
+            next_hash (callable): Returns a fresh, unique bytes32 certificate hash
+        """
+        if self.gas is None:
+            estimate = await self.contract.functions.issueCertificate(next_hash()).estimate_gas({'from': self.senders[0]})
+            self.gas = int(estimate * 1.2)
+        for sender in self.senders:
+            await self._sync_nonce(sender)
+
+    async def send_and_confirm(self, cert_hash, sender):
+        """
+        Send one issueCertificate transaction and wait for its receipt.
+
+        Args:
+            cert_hash (bytes): The certificate hash to issue
+            sender (str): One of the engine's sender accounts
+
+        Returns:
+            AttributeDict: The transaction receipt
+        """
+        nonce = self._allocate_nonce(sender)
+        try:
+            tx_hash = await self.contract.functions.issueCertificate(cert_hash).transact({
+                'from': sender, 'gas': self.gas, 'nonce': nonce
+            })
+        except Exception:
+            await self._release_nonce(sender, nonce)
+            raise
+        return await self.confirmations.wait(tx_hash)
+
+    async def _virtual_user(self, sender, deadline, next_hash, stats):
+        while time.monotonic() < deadline:
+            cert_hash = next_hash()
+            start_time = time.monotonic()
+            try:
+                receipt = await self.send_and_confirm(cert_hash, sender)
+                if receipt.status == 1:
+                    stats.record_success(time.monotonic() - start_time)
+                else:
+                    stats.record_failure(RuntimeError("Transaction reverted"))
+            except Exception as e:
+                # Under heavy load some failures (timeouts, dropped connections) are expected.
+                stats.record_failure(e)
+
+    async def run_level(self, concurrency, duration, next_hash):
+        """
+        Run `concurrency` virtual users for `duration` seconds.
+
+        Args:
+            concurrency (int): Number of virtual users
+            duration (float): Test duration in seconds
+            next_hash (callable): Returns a fresh, unique bytes32 certificate hash
+
+        Returns:
+            LevelStats: Counters and latencies of the run, with `duration` set
+        """
+        await self.start(pool_size=min(concurrency, MAX_CONNECTION_POOL_SIZE))
+        try:
+            await self.prepare(next_hash)
+            stats = LevelStats()
+            start_time = time.monotonic()
+            deadline = start_time + duration
+            await asyncio.gather(*(
+                self._virtual_user(self.senders[i % len(self.senders)], deadline, next_hash, stats)
+                for i in range(concurrency)
+            ))
+            stats.duration = time.monotonic() - start_time
+            await self._fill_gaps()
+        finally:
+            await self.close()
+
+        if stats.errors:
+            logging.warning(f"Level {concurrency}: {stats.failed_tx} failed transactions by type: {dict(stats.errors)}")
+        return stats
@@ -0,0 +1,83 @@
+"""
+Benchmark: RPC Calls Saved by the Raw Signed-Transaction Fast Path
+
+Issues the same number of certificates through web3's `transact()` path and
+through `RawTransactionSender`, counts every JSON-RPC call per method and writes
+the per-transaction numbers to data/raw_tx_benchmark.csv.
+"""
+
+import os
+import time
+import logging
+from collections import Counter
+
+import pandas as pd
+from web3 import Web3
+
+from simulation import (
+    BlockchainHelper, HARDHAT_RPC_URL, DEPLOYER_PRIVATE_KEY,
+    CERTIFICATE_ARTIFACT_PATH, DATA_DIR
+)
+
+BENCHMARK_TRANSACTIONS = 200
+
+def rpc_counter_middleware(counter):
+    """Builds a middleware that counts JSON-RPC requests by method."""
+    def middleware(make_request, w3):
+        def inner(method, params):
+            counter[method] += 1
+            return make_request(method, params)
+        return inner
+    return middleware
+
+def run_path(helper, counter, name, send_one, hashes):
+    """Runs one path and returns its per-transaction RPC counts and timing."""
+    counter.clear()
+    start_time = time.time()
+    for cert_hash in hashes:
+        tx_hash = send_one(cert_hash)
+        helper.w3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.05)
+    elapsed = time.time() - start_time
+
+    rows = [
+        {'path': name, 'method': method, 'calls_per_tx': count / len(hashes)}
+        for method, count in sorted(counter.items())
+    ]
+    rows.append({'path': name, 'method': 'TOTAL', 'calls_per_tx': sum(counter.values()) / len(hashes)})
+    rows.append({'path': name, 'method': 'SECONDS_PER_TX', 'calls_per_tx': elapsed / len(hashes)})
+    logging.info(f"{name}: {sum(counter.values()) / len(hashes):.2f} RPC calls/tx, {elapsed / len(hashes) * 1000:.2f} ms/tx")
+    return rows
+
+def main():
+    """Runs the benchmark against the local Hardhat node."""
+    helper = BlockchainHelper(HARDHAT_RPC_URL, DEPLOYER_PRIVATE_KEY)
+    cert_factory = helper.get_contract_factory(CERTIFICATE_ARTIFACT_PATH)
+    contract, _ = helper.deploy_contract("Certificate (Raw Tx Benchmark)", cert_factory, helper.account.address)
+    helper.authorize_institution(contract)
+
+    counter = Counter()
+    helper.w3.middleware_onion.add(rpc_counter_middleware(counter), name='rpc_counter')
+
+    hashes = [Web3.keccak(text=f"raw-tx-benchmark-{i}") for i in range(2 * BENCHMARK_TRANSACTIONS)]
+    contract_hashes = hashes[:BENCHMARK_TRANSACTIONS]
+    raw_hashes = hashes[BENCHMARK_TRANSACTIONS:]
+
+    rows = run_path(
+        helper, counter, 'contract.transact',
+        lambda h: contract.functions.issueCertificate(h).transact(),
+        contract_hashes
+    )
+
+    # Chain parameters and the gas limit are looked up once, outside the measured loop.
+    raw_sender = helper.get_raw_sender(contract)
+    raw_sender.gas_limit('issueCertificate', raw_hashes[0])
+    helper.nonce_manager.sync()
+    rows += run_path(helper, counter, 'raw_signed', raw_sender.issue, raw_hashes)
+
+    df = pd.DataFrame(rows)
+    output_path = os.path.join(DATA_DIR, 'raw_tx_benchmark.csv')
+    df.to_csv(output_path, index=False)
+    logging.info(f"Raw transaction benchmark saved to {output_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+Batch Client for the Certificate Contract
+
+This module wraps the array entry points of `Certificate.sol`. Large hash lists
+are split into chunks whose gas fits under the block gas limit; the chunk size
+is derived from the measured fixed and per-item gas of each entry point.
+
+A contract whose ABI lacks an entry point (an artifact compiled before it was
+added) is rejected with an error instead of being served one hash at a time,
+so measurements are never taken on a different path than the one they name.
+"""
+
+import logging
+
+from web3 import Web3
+
+from tx_pipeline import NonceManager, TransactionPipeline
+
+GAS_PROBE_SIZES = (1, 17)
+
+def has_function(contract, function_name):
+    """Return True if the contract's ABI declares a function of that name."""
+    return any(entry.get('type') == 'function' and entry.get('name') == function_name for entry in contract.abi)
+
+def require_functions(contract, *function_names):
+    """
+    Raise if the contract's ABI lacks any of the named functions.
+
+    Raises:
+        RuntimeError: Naming the missing functions; the artifact predates them and must be recompiled
+    """
+    missing = [name for name in function_names if not has_function(contract, name)]
+    if missing:
+        raise RuntimeError(
+            f"The ABI of {contract.address} has no {', '.join(missing)}: "
+            f"the compiled artifact is stale, run `npx hardhat compile`"
+        )
+
+def measure_linear_gas(estimate_gas, probe_items):
+    """
+    Measure the fixed and per-item gas of an array entry point.
+
+    Args:
+        estimate_gas (callable): Maps a list of items to a gas estimate
+        probe_items (list): At least max(GAS_PROBE_SIZES) representative items
+
+    Returns:
+        tuple: (base_gas, per_item_gas)
+    """
+    small, large = GAS_PROBE_SIZES
+    gas_small = estimate_gas(probe_items[:small])
+    gas_large = estimate_gas(probe_items[:large])
+    per_item_gas = max((gas_large - gas_small) / (large - small), 1)
+    base_gas = max(gas_small - per_item_gas * small, 0)
+    return base_gas, per_item_gas
+
+def chunk_size_for_gas(base_gas, per_item_gas, gas_limit, safety=0.8, max_items=None):
+    """
+    Compute how many items fit into one call or transaction.
+
+    Args:
+        base_gas (float): Gas used regardless of the number of items
+        per_item_gas (float): Additional gas per item
+        gas_limit (int): The block (or call) gas limit
+        safety (float): Fraction of the gas limit that may be used
+        max_items (int): Optional upper bound on the chunk size
+
+    Returns:
+        int: The chunk size (at least 1)
+    """
+    size = int((gas_limit * safety - base_gas) // per_item_gas)
+    if max_items is not None:
+        size = min(size, max_items)
+    return max(size, 1)
+
+def chunked(items, size):
+    """Yield consecutive slices of `items` with at most `size` elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class CertificateBatchClient:
+    """Issues, revokes and verifies many certificates with a handful of array calls."""
+
+    def __init__(self, w3, contract, nonce_manager=None, safety=0.8, tx_safety=0.7, window=4, tracker=None):
+        """
+        Initialize the CertificateBatchClient.
+
+        Args:
+            w3 (Web3): The Web3 instance used to reach the node
+            contract (Contract): A deployed Certificate contract
+            nonce_manager (NonceManager): Shared nonce source; a new one is created if None
+            safety (float): Fraction of the block gas limit a single view call may use
+            tx_safety (float): Fraction of the block gas limit a single batch transaction may use
+            window (int): Batch transactions kept in flight by the submission pipeline
+            tracker (ConfirmationTracker): Optional block-driven receipt source for the pipeline
+        """
+        self.w3 = w3
+        self.contract = contract
+        self.nonce_manager = nonce_manager or NonceManager(w3, w3.eth.default_account)
+        self.safety = safety
+        self.tx_safety = tx_safety
+        self.window = window
+        self.tracker = tracker
+        self._status_chunk_size = None
+        self._gas_profiles = {}
+
+    def block_gas_limit(self):
+        """Return the gas limit of the latest block."""
+        return self.w3.eth.get_block('latest').gasLimit
+
+    def status_chunk_size(self):
+        """Return (and cache) the number of hashes that fit into one getCertificateStatuses call."""
+        if self._status_chunk_size is None:
+            require_functions(self.contract, 'getCertificateStatuses')
+            probe = [Web3.keccak(text=f"status-gas-probe-{i}") for i in range(max(GAS_PROBE_SIZES))]
+            base_gas, per_item_gas = measure_linear_gas(
+                lambda hashes: self.contract.functions.getCertificateStatuses(hashes).estimate_gas(),
+                probe
+            )
+            self._status_chunk_size = chunk_size_for_gas(base_gas, per_item_gas, self.block_gas_limit(), self.safety)
+            logging.info(
+                f"getCertificateStatuses: base gas {base_gas:.0f}, {per_item_gas:.0f} gas/item, "
+                f"{self._status_chunk_size} hashes per call"
+            )
+        return self._status_chunk_size
+
+    def get_statuses(self, cert_hashes):
+        """
+        Query the status of many certificates.
+
+        Args:
+            cert_hashes (list): 32-byte certificate hashes
+
+        Returns:
+            tuple: (statuses, institutions, timestamps) lists in input order
+        """
+        statuses, institutions, timestamps = [], [], []
+        for chunk in chunked(list(cert_hashes), self.status_chunk_size()):
+            chunk_statuses, chunk_institutions, chunk_timestamps = (
+                self.contract.functions.getCertificateStatuses(chunk).call()
+            )
+            statuses.extend(chunk_statuses)
+            institutions.extend(chunk_institutions)
+            timestamps.extend(chunk_timestamps)
+        return statuses, institutions, timestamps
+
+    def gas_profile(self, function_name, items):
+        """
+        Return (and cache) the fixed and per-item gas of a batch transaction.
+
+        The first items of the list are used as probes, so they must be valid for the
+        function (unissued hashes for issuance, issued hashes for revocation).
+
+        Args:
+            function_name (str): 'issueCertificates' or 'revokeCertificates'
+            items (list): The certificate hashes about to be submitted
+
+        Returns:
+            tuple: (base_gas, per_item_gas)
+        """
+        if function_name not in self._gas_profiles:
+            function = getattr(self.contract.functions, function_name)
+            sender = self.nonce_manager.address
+            estimate = lambda chunk: function(chunk).estimate_gas({'from': sender})
+            if len(items) >= max(GAS_PROBE_SIZES):
+                profile = measure_linear_gas(estimate, items)
+            else:
+                # Too few items to probe two sizes; attribute all gas to the items.
+                profile = (0, estimate(items) / len(items))
+            self._gas_profiles[function_name] = profile
+            logging.info(f"{function_name}: base gas {profile[0]:.0f}, {profile[1]:.0f} gas/certificate")
+        return self._gas_profiles[function_name]
+
+    def submit_chunked(self, function_name, cert_hashes, desc=None):
+        """
+        Submit a batch function over many hashes, one gas-sized chunk per transaction.
+
+        Args:
+            function_name (str): 'issueCertificates' or 'revokeCertificates'
+            cert_hashes (list): 32-byte certificate hashes
+            desc (str): Optional progress bar description
+
+        Returns:
+            list: Per-chunk results from TransactionPipeline.run
+        """
+        cert_hashes = list(cert_hashes)
+        if not cert_hashes:
+            return []
+        require_functions(self.contract, function_name)
+        gas_limit = self.block_gas_limit()
+        base_gas, per_item_gas = self.gas_profile(function_name, cert_hashes)
+        size = chunk_size_for_gas(base_gas, per_item_gas, gas_limit, self.tx_safety)
+        chunks = list(chunked(cert_hashes, size))
+        chunk_gas = min(int((base_gas + per_item_gas * len(chunks[0])) * 1.2), gas_limit)
+        logging.info(f"{function_name}: {len(cert_hashes)} certificates in {len(chunks)} transactions of up to {size}")
+
+        function = getattr(self.contract.functions, function_name)
+        pipeline = TransactionPipeline(self.w3, self.nonce_manager, window=self.window, tracker=self.tracker)
+        return pipeline.run(function, chunks, gas=chunk_gas, desc=desc)
+
+    def issue_many(self, cert_hashes, desc=None):
+        """Issue many certificates through issueCertificates."""
+        return self.submit_chunked('issueCertificates', cert_hashes, desc=desc)
+
+    def revoke_many(self, cert_hashes, desc=None):
+        """Revoke many issued certificates through revokeCertificates."""
+        return self.submit_chunked('revokeCertificates', cert_hashes, desc=desc)
@@ -0,0 +1,91 @@
+"""
+Lazy Certificate Source
+
+Experiments that scale far past the generated dataset only need certificate
+hashes, and only a block of them at a time. A CertificateSource addresses
+certificates by index: indices covered by the hash store (see hash_store.py)
+are served from it, every index beyond is synthesized on demand as
+keccak256 of the label, the seed and the index. Synthetic hashes are unique and
+deterministic, so a run with the same seed issues the same certificates, and
+iterating over any range keeps only one block in memory.
+"""
+
+from eth_hash.auto import keccak
+from web3 import Web3
+
+DEFAULT_SEED = 42
+DEFAULT_BLOCK_SIZE = 50_000
+
+class CertificateSource:
+    """Deterministic certificate hashes (and optional records) addressed by index."""
+
+    def __init__(self, store=None, seed=DEFAULT_SEED, label='certificate'):
+        """
+        Initialize the CertificateSource.
+
+        Args:
+            store (HashStore): Optional store serving the first len(store) indices
+            seed (int): Seed of the synthetic hashes past the store
+            label (str): Namespace of the synthetic hashes; sources with different
+                labels never share a hash
+        """
+        self.store = store
+        self.seed = seed
+        self.label = label
+        self.stored = len(store) if store is not None else 0
+        self._prefix = f"{label}:{seed}:".encode('utf-8')
+        self._fake = None
+
+    def _synthetic_hash(self, index):
+        return keccak(self._prefix + index.to_bytes(8, 'big'))
+
+    def hash_at(self, index):
+        """Return the hash of certificate `index` as a 32-byte `bytes` value."""
+        if index < 0:
+            raise IndexError(f"Certificate index {index} is negative")
+        if index < self.stored:
+            return self.store.hash_at(index)
+        return self._synthetic_hash(index)
+
+    def hashes(self, start, stop):
+        """
+        Return the hashes in [start, stop) as `bytes32` values ready for contract calls.
+
+        Args:
+            start (int): First certificate index
+            stop (int): End of the range (exclusive)
+
+        Returns:
+            list: 32-byte `bytes` values
+        """
+        stored_stop = min(stop, self.stored)
+        result = self.store.hashes(start, stored_stop) if start < stored_stop else []
+        result.extend(self._synthetic_hash(i) for i in range(max(start, self.stored), stop))
+        return result
+
+    def iter_blocks(self, start, stop, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Yield the hashes in [start, stop) as lists of at most `block_size` values.
+
+        Only one block is materialized at a time, so memory does not grow with the range.
+        """
+        for block_start in range(start, stop, block_size):
+            yield self.hashes(block_start, min(block_start + block_size, stop))
+
+    def record_at(self, index):
+        """
+        Return certificate `index` as a record dict shaped like a certificates_data.csv row.
+
+        Stored records are read from the store. Synthetic records are generated with
+        Faker from (seed, index) and carry the synthetic hash as `certificate_hash`,
+        so the hash identifies the record but is not a digest of its fields.
+        """
+        if index < self.stored:
+            return self.store.frame(index, index + 1).iloc[0].to_dict()
+        if self._fake is None:
+            from faker import Faker  # Only needed when full records are requested
+            self._fake = Faker()
+        from generate_dataset import generate_record
+        record, _ = generate_record(self._fake, self.seed, index)
+        record['certificate_hash'] = Web3.to_hex(self._synthetic_hash(index))
+        return record
@@ -0,0 +1,200 @@
+"""
+Chain-State Snapshot Fixtures
+
+Experiments that need a populated contract (N certificates issued, M revoked)
+used to deploy and mine that state from scratch every time. ChainFixtures
+builds each state once, takes an `evm_snapshot` of it under a name and later
+restores it with `evm_revert`, which takes milliseconds on Hardhat.
+
+Fixtures can be chained: a fixture with a parent is built on top of the
+parent's restored state, so a sequence of growing states (1, 10, 100, ...)
+only mines the difference between neighbours. Each fixture carries a JSON
+metadata dict (e.g. contract addresses) that is returned on restore.
+
+Hardhat consumes a snapshot when it is reverted to and drops every snapshot
+taken after it. The cache mirrors that: a restored fixture is snapshotted
+again under the same name and later fixtures are invalidated. Restoring a
+chain of fixtures from the smallest one up therefore throws the cached larger
+states away; visit_order() gives the order that uses every cached state
+before it is dropped (the newest cached one first, build upward from it,
+then restore the older ones from the newest down). With a persist
+path the cache is written to disk, so another process (or a rerun) on the
+same node can restore fixtures instead of rebuilding them; entries whose
+block is no longer in the chain (e.g. after a node restart) are discarded.
+"""
+
+import os
+import json
+import time
+import logging
+
+from rpc_batch import RpcBatchError
+
+class FixtureError(Exception):
+    pass
+
+def _snapshot_order(snapshot_id):
+    """Snapshot ids increase with creation time; Hardhat returns them as hex quantities."""
+    return int(snapshot_id, 16) if isinstance(snapshot_id, str) else int(snapshot_id)
+
+class ChainFixtures:
+    """Named, cached chain-state snapshots built on evm_snapshot/evm_revert."""
+
+    def __init__(self, rpc, persist_path=None, on_restore=None):
+        """
+        Initialize the ChainFixtures.
+
+        Args:
+            rpc (BatchRpcClient): Client of the node
+            persist_path (str): Optional JSON file the snapshot cache is kept in
+            on_restore (list): Callables invoked after every revert, e.g. to reset
+                local nonce managers
+        """
+        self.rpc = rpc
+        self.persist_path = persist_path
+        self.on_restore = list(on_restore or [])
+        self._fixtures = {}  # name -> {'id', 'block_number', 'block_hash', 'metadata', 'build_seconds'}
+        self.hits = 0
+        self.builds = 0
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+    def _load(self):
+        with open(self.persist_path) as f:
+            stored = json.load(f)
+        for name, entry in stored.items():
+            try:
+                block = self.rpc.request('eth_getBlockByNumber', [hex(entry['block_number']), False])
+            except Exception:
+                block = None
+            if block and block['hash'] == entry['block_hash']:
+                self._fixtures[name] = entry
+            else:
+                logging.info(f"Discarding fixture '{name}': its block is no longer in the chain")
+        self._save()
+
+    def _save(self):
+        if self.persist_path:
+            with open(self.persist_path, 'w') as f:
+                json.dump(self._fixtures, f, indent=2)
+
+    def has(self, name):
+        return name in self._fixtures
+
+    def metadata(self, name):
+        """Return the metadata stored with a fixture."""
+        return self._fixtures[name]['metadata']
+
+    def snapshot(self, name, metadata=None, build_seconds=None):
+        """
+        Snapshot the current chain state under `name`.
+
+        Args:
+            name (str): Fixture name; an existing fixture of that name is replaced
+            metadata (dict): JSON-serializable data returned by restore()
+            build_seconds (float): Optional time it took to build the state
+
+        Returns:
+            dict: The fixture metadata
+        """
+        snapshot_id = self.rpc.request('evm_snapshot', [])
+        head = self.rpc.request('eth_getBlockByNumber', ['latest', False])
+        self._fixtures[name] = {
+            'id': snapshot_id,
+            'block_number': int(head['number'], 16),
+            'block_hash': head['hash'],
+            'metadata': metadata or {},
+            'build_seconds': build_seconds,
+        }
+        self._save()
+        return self._fixtures[name]['metadata']
+
+    def restore(self, name):
+        """
+        Revert the chain to a fixture.
+
+        Args:
+            name (str): Fixture name
+
+        Returns:
+            dict: The fixture metadata
+
+        Raises:
+            FixtureError: If the fixture is unknown or the node rejected the revert
+        """
+        if name not in self._fixtures:
+            raise FixtureError(f"Unknown fixture '{name}'")
+        entry = self._fixtures[name]
+        start_time = time.time()
+        try:
+            reverted = self.rpc.request('evm_revert', [entry['id']])
+        except RpcBatchError:
+            reverted = False
+        if reverted is False:
+            del self._fixtures[name]
+            self._save()
+            raise FixtureError(f"Node rejected evm_revert to fixture '{name}'")
+        # The node dropped this snapshot and every later one
+        reverted_id = _snapshot_order(entry['id'])
+        for other in [n for n, e in self._fixtures.items() if _snapshot_order(e['id']) > reverted_id]:
+            del self._fixtures[other]
+        self.snapshot(name, entry['metadata'], entry['build_seconds'])
+        for callback in self.on_restore:
+            callback()
+        self.hits += 1
+        logging.info(f"Restored fixture '{name}' in {time.time() - start_time:.3f}s")
+        return entry['metadata']
+
+    def fixture(self, name, build, parent=None):
+        """
+        Restore a fixture, building and snapshotting it first if it is not cached.
+
+        Args:
+            name (str): Fixture name
+            build (callable): Called with the parent's metadata (or None) on the state
+                to build on; mines the fixture's state and returns its metadata dict
+            parent (str): Optional fixture the state is built on top of; it must
+                exist and is restored first
+
+        Returns:
+            dict: The fixture metadata
+        """
+        if name in self._fixtures:
+            try:
+                return self.restore(name)
+            except FixtureError as e:
+                logging.warning(f"{e}; rebuilding")
+        parent_metadata = self.restore(parent) if parent is not None else None
+        logging.info(f"Building fixture '{name}'" + (f" on top of '{parent}'" if parent else ""))
+        start_time = time.time()
+        metadata = build(parent_metadata)
+        self.builds += 1
+        return self.snapshot(name, metadata, time.time() - start_time)
+
+    def visit_order(self, chain):
+        """
+        Order a chain of fixtures so that no cached one is dropped before it is visited.
+
+        Each fixture of `chain` is built on top of the one before it, so the cached ones
+        form a prefix of the chain, in snapshot order. Reverting to a fixture drops every
+        newer snapshot; the newest cached fixture is therefore visited first, the missing
+        ones are built upward from it (each parent is the newest snapshot when it is
+        restored), and the older cached fixtures are restored last, newest first.
+
+        Args:
+            chain (list): Fixture names, each built on top of the previous one
+
+        Returns:
+            list: The names of `chain` in the order they should be restored or built
+        """
+        cached = [index for index, name in enumerate(chain) if name in self._fixtures]
+        newest = max(cached, key=lambda index: _snapshot_order(self._fixtures[chain[index]]['id'])) if cached else 0
+        return chain[newest:] + chain[:newest][::-1]
+
+    def invalidate(self, name=None):
+        """Forget one fixture, or all of them. The node's snapshots are left to expire."""
+        if name is None:
+            self._fixtures.clear()
+        else:
+            self._fixtures.pop(name, None)
+        self._save()
@@ -0,0 +1,134 @@
+"""
+Pooled Web3 Client Factory
+
+This module hands out Web3 clients for one RPC endpoint that share a single
+keep-alive `requests` session. The session's connection pool is sized for the
+expected concurrency, readiness is established by probing the node rather than
+sleeping a fixed time, and contract objects are cached per address so workers
+can be started at almost no cost.
+"""
+
+import time
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+
+from rpc_batch import BatchRpcClient
+
+DEFAULT_POOL_SIZE = 16
+MAX_POOL_SIZE = 256
+
+def pool_size_for(concurrency):
+    """Return a connection pool size that fits `concurrency` simultaneous requests."""
+    return min(max(concurrency, DEFAULT_POOL_SIZE), MAX_POOL_SIZE)
+
+def wait_until_ready(w3, timeout=30, interval=0.1):
+    """
+    Block until the node answers JSON-RPC requests.
+
+    Args:
+        w3 (Web3): Client of the node
+        timeout (float): Seconds to keep probing before giving up
+        interval (float): Seconds between probes
+
+    Returns:
+        float: Seconds it took for the node to become ready
+
+    Raises:
+        ConnectionError: If the node did not answer within `timeout`
+    """
+    start_time = time.monotonic()
+    last_error = None
+    while time.monotonic() - start_time < timeout:
+        try:
+            w3.eth.block_number
+            return time.monotonic() - start_time
+        except Exception as e:  # Connection refused while the node is still starting
+            last_error = e
+            time.sleep(interval)
+    raise ConnectionError(f"RPC node did not become ready within {timeout} seconds: {last_error}")
+
+class ClientFactory:
+    """Creates Web3 clients, batch clients and contract objects on one pooled HTTP session."""
+
+    def __init__(self, rpc_url, pool_size=DEFAULT_POOL_SIZE, timeout=120, poa=True):
+        """
+        Initialize the ClientFactory.
+
+        Args:
+            rpc_url (str): The HTTP JSON-RPC endpoint
+            pool_size (int): Keep-alive connections kept open to the node
+            timeout (int): Timeout in seconds for a single HTTP request
+            poa (bool): Inject the PoA middleware into every Web3 client
+        """
+        self.rpc_url = rpc_url
+        self.timeout = timeout
+        self.poa = poa
+        self.session = requests.Session()
+        self.pool_size = None
+        self.resize(pool_size)
+        self._lock = threading.RLock()
+        self._w3 = None
+        self._contracts = {}
+
+    def resize(self, pool_size):
+        """
+        Remount the session's adapter with a new connection pool size.
+
+        Args:
+            pool_size (int): Keep-alive connections kept open to the node
+        """
+        if pool_size == self.pool_size:
+            return
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.pool_size = pool_size
+
+    def web3(self):
+        """Return the shared Web3 client, creating it on first use."""
+        with self._lock:
+            if self._w3 is None:
+                provider = Web3.HTTPProvider(
+                    self.rpc_url, request_kwargs={'timeout': self.timeout}, session=self.session
+                )
+                w3 = Web3(provider)
+                if self.poa:
+                    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                self._w3 = w3
+            return self._w3
+
+    def wait_until_ready(self, timeout=30):
+        """Probe the node until it answers; see wait_until_ready()."""
+        elapsed = wait_until_ready(self.web3(), timeout=timeout)
+        logging.info(f"RPC node at {self.rpc_url} ready after {elapsed:.2f}s")
+        return elapsed
+
+    def batch_client(self, **kwargs):
+        """Return a BatchRpcClient that reuses the pooled session."""
+        return BatchRpcClient(self.rpc_url, session=self.session, timeout=self.timeout, **kwargs)
+
+    def contract(self, address, abi):
+        """
+        Return the cached contract object for an address.
+
+        Args:
+            address (str): The contract address
+            abi (list): The contract ABI, used on first access only
+
+        Returns:
+            Contract: The contract bound to the shared Web3 client
+        """
+        address = Web3.to_checksum_address(address)
+        with self._lock:
+            if address not in self._contracts:
+                self._contracts[address] = self.web3().eth.contract(address=address, abi=abi)
+            return self._contracts[address]
+
+    def close(self):
+        """Close the pooled session."""
+        self.session.close()
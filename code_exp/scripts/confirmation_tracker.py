@@ -0,0 +1,313 @@
+"""
+Block-Driven Transaction Confirmation
+
+`wait_for_transaction_receipt` polls eth_getTransactionReceipt in a sleep loop
+for every transaction, so the polling load grows with the number of transactions
+in flight. The trackers in this module follow the chain head instead: each poll
+reads the new blocks in one JSON-RPC batch, matches their transaction hashes
+against all waiting transactions and fetches the receipts of the matches in a
+second batch. Confirmation cost therefore scales with blocks, not transactions.
+
+ConfirmationTracker runs in a background thread and hands out
+concurrent.futures.Future objects; AsyncConfirmationTracker runs as an asyncio
+task and hands out asyncio futures.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+
+from rpc_batch import RpcBatchError
+
+RECEIPT_QUANTITY_FIELDS = (
+    'blockNumber', 'status', 'gasUsed', 'cumulativeGasUsed', 'effectiveGasPrice', 'transactionIndex', 'type'
+)
+RECEIPT_HASH_FIELDS = ('transactionHash', 'blockHash')
+
+def format_receipt(raw):
+    """
+    Convert a raw JSON-RPC receipt into the AttributeDict shape web3 returns.
+
+    Quantities become ints and hashes become HexBytes; logs are passed through.
+
+    Args:
+        raw (dict): The `result` of eth_getTransactionReceipt
+
+    Returns:
+        AttributeDict: The receipt
+    """
+    receipt = dict(raw)
+    for field in RECEIPT_QUANTITY_FIELDS:
+        if isinstance(receipt.get(field), str):
+            receipt[field] = int(receipt[field], 16)
+    for field in RECEIPT_HASH_FIELDS:
+        if receipt.get(field) is not None:
+            receipt[field] = HexBytes(receipt[field])
+    return AttributeDict(receipt)
+
+class _TrackerState:
+    """Waiting transactions and the block cursor shared by both trackers."""
+
+    def __init__(self, poll_interval, timeout):
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiting = {}  # tx hash (lower-case hex) -> list of (future, deadline)
+        self._new = []      # hashes registered since the last poll
+        self._last_block = None
+        self.polls = 0
+        self.blocks_scanned = 0
+        self.receipts_fetched = 0
+
+    def _register(self, tx_hash, future, timeout):
+        key = Web3.to_hex(tx_hash)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        with self._lock:
+            self._waiting.setdefault(key, []).append((future, deadline))
+            self._new.append(key)
+
+    def _idle(self):
+        with self._lock:
+            return not self._waiting
+
+    def _take_new(self):
+        with self._lock:
+            new, self._new = self._new, []
+            return new
+
+    def _block_calls(self, head):
+        """Return the eth_getBlockByNumber calls for blocks not yet scanned."""
+        if self._last_block is None:
+            # Nothing was waiting before; freshly registered hashes are looked up directly.
+            self._last_block = head
+        calls = [('eth_getBlockByNumber', [hex(n), False]) for n in range(self._last_block + 1, head + 1)]
+        self._last_block = head
+        self.blocks_scanned += len(calls)
+        return calls
+
+    def _lookup_keys(self, blocks, new):
+        """Return the waiting hashes that were mined in `blocks` or registered since the last poll."""
+        with self._lock:
+            keys = {h for block in blocks if block for h in block['transactions'] if h in self._waiting}
+            # A new hash may have been mined in a block scanned before it was registered.
+            keys.update(k for k in new if k in self._waiting)
+        return list(keys)
+
+    def _resolve(self, keys, replies):
+        for key, reply in zip(keys, replies):
+            if not reply or isinstance(reply, RpcBatchError):
+                continue  # Not mined yet
+            self.receipts_fetched += 1
+            receipt = format_receipt(reply)
+            with self._lock:
+                entries = self._waiting.pop(key, [])
+            for future, _ in entries:
+                if not future.done():
+                    future.set_result(receipt)
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for key, entries in list(self._waiting.items()):
+                expired.extend((key, f) for f, d in entries if d <= now)
+                remaining = [(f, d) for f, d in entries if d > now]
+                if remaining:
+                    self._waiting[key] = remaining
+                else:
+                    del self._waiting[key]
+        for key, future in expired:
+            if not future.done():
+                future.set_exception(TimeExhausted(f"Transaction {key} is not in the chain after {self.timeout} seconds"))
+
+    def _fail_all(self, error):
+        with self._lock:
+            entries = [e for waiting in self._waiting.values() for e in waiting]
+            self._waiting.clear()
+            self._new = []
+        for future, _ in entries:
+            if not future.done():
+                future.set_exception(error)
+
+class ConfirmationTracker(_TrackerState):
+    """Resolves transaction futures from the blocks the node produces, in a background thread."""
+
+    def __init__(self, rpc, poll_interval=0.05, timeout=120):
+        """
+        Initialize the ConfirmationTracker.
+
+        Args:
+            rpc (BatchRpcClient): Batch client of the node
+            poll_interval (float): Seconds between head polls while transactions are waiting
+            timeout (int): Default seconds to wait for a transaction before failing its future
+        """
+        super().__init__(poll_interval, timeout)
+        self.rpc = rpc
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def watch(self, tx_hash, timeout=None):
+        """
+        Start waiting for a transaction.
+
+        Args:
+            tx_hash (bytes): The hash returned when the transaction was sent
+            timeout (int): Seconds before the future fails with TimeExhausted
+
+        Returns:
+            Future: Resolves to the transaction receipt
+        """
+        future = Future()
+        self._register(tx_hash, future, timeout)
+        with self._lock:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return future
+
+    def wait(self, tx_hash, timeout=None):
+        """Block until a transaction is mined and return its receipt."""
+        return self.watch(tx_hash, timeout).result()
+
+    def stop(self):
+        """Stop the tracker thread and fail every transaction still waiting."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._fail_all(TimeExhausted("Confirmation tracker stopped"))
+
+    def _run(self):
+        while not self._stopped:
+            if self._idle():
+                # No RPC traffic while nothing waits; skip the blocks mined in the meantime.
+                self._last_block = None
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                self._poll()
+            except Exception as e:
+                logging.warning(f"Confirmation tracker poll failed: {e}")
+            self._expire()
+            time.sleep(self.poll_interval)
+
+    def _poll(self):
+        self.polls += 1
+        new = self._take_new()
+        head = int(self.rpc.request('eth_blockNumber', []), 16)
+        block_calls = self._block_calls(head)
+        blocks = self.rpc.execute(block_calls) if block_calls else []
+        keys = self._lookup_keys(blocks, new)
+        if keys:
+            replies = self.rpc.execute([('eth_getTransactionReceipt', [k]) for k in keys], allow_errors=True)
+            self._resolve(keys, replies)
+
+class AsyncConfirmationTracker(_TrackerState):
+    """Resolves transaction futures from the blocks the node produces, as an asyncio task."""
+
+    def __init__(self, rpc_url, session, poll_interval=0.05, timeout=120):
+        """
+        Initialize the AsyncConfirmationTracker.
+
+        Args:
+            rpc_url (str): The HTTP JSON-RPC endpoint
+            session (aiohttp.ClientSession): Session whose connection pool is shared with the senders
+            poll_interval (float): Seconds between head polls while transactions are waiting
+            timeout (int): Default seconds to wait for a transaction before failing its future
+        """
+        super().__init__(poll_interval, timeout)
+        self.rpc_url = rpc_url
+        self.session = session
+        self._wakeup = None
+        self._task = None
+
+    def start(self):
+        """Start the tracker task on the running event loop."""
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the tracker task and fail every transaction still waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._fail_all(TimeExhausted("Confirmation tracker stopped"))
+
+    def watch(self, tx_hash, timeout=None):
+        """
+        Start waiting for a transaction.
+
+        Args:
+            tx_hash (bytes): The hash returned when the transaction was sent
+            timeout (int): Seconds before the future fails with TimeExhausted
+
+        Returns:
+            asyncio.Future: Resolves to the transaction receipt
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._register(tx_hash, future, timeout)
+        self._wakeup.set()
+        return future
+
+    async def wait(self, tx_hash, timeout=None):
+        """Wait until a transaction is mined and return its receipt."""
+        return await self.watch(tx_hash, timeout)
+
+    async def _execute(self, calls, allow_errors=False):
+        payload = [{'jsonrpc': '2.0', 'id': i, 'method': m, 'params': p} for i, (m, p) in enumerate(calls)]
+        async with self.session.post(self.rpc_url, json=payload) as response:
+            response.raise_for_status()
+            replies = await response.json()
+        if isinstance(replies, dict):
+            raise RpcBatchError(f"Batch rejected by node: {replies.get('error')}")
+        results = []
+        for reply in sorted(replies, key=lambda r: r['id']):
+            if 'error' in reply:
+                error = RpcBatchError(f"{calls[reply['id']][0]} failed: {reply['error']}")
+                if not allow_errors:
+                    raise error
+                results.append(error)
+            else:
+                results.append(reply['result'])
+        return results
+
+    async def _run(self):
+        while True:
+            if self._idle():
+                self._last_block = None
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                await self._poll()
+            except Exception as e:
+                logging.warning(f"Confirmation tracker poll failed: {e}")
+            self._expire()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self):
+        self.polls += 1
+        new = self._take_new()
+        (head,) = await self._execute([('eth_blockNumber', [])])
+        block_calls = self._block_calls(int(head, 16))
+        blocks = await self._execute(block_calls) if block_calls else []
+        keys = self._lookup_keys(blocks, new)
+        if keys:
+            replies = await self._execute([('eth_getTransactionReceipt', [k]) for k in keys], allow_errors=True)
+            self._resolve(keys, replies)
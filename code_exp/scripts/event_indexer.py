@@ -0,0 +1,297 @@
+"""
+Incremental Certificate Event Indexer
+
+Certificate.sol emits CertificateIssued and CertificateRevoked with the
+certificate hash and institution as indexed topics and the block timestamp as
+data, which is everything getCertificateStatus returns. EventIndexer pulls
+these logs with eth_getLogs and keeps the resulting certificate state in a
+local SQLite database, so verification and analytics can be answered without
+a round trip to the node.
+
+The block range of each eth_getLogs request adapts: it is halved when the
+node rejects a request (many nodes cap the result size) or a range returns
+more than `target_logs` logs, and doubled while ranges come back sparse. The
+logs of a range, its events and the new checkpoint are committed in one
+SQLite transaction, so an interrupted sync resumes from the last complete
+range.
+
+Re-orgs (and node restarts, which replace the whole chain) are detected by
+comparing the checkpoint's block hash with the node's. The hashes of the last
+REORG_WINDOW indexed blocks are kept to find the fork point; everything
+indexed after it is rolled back and the affected certificates are rebuilt from
+the remaining events. If no kept block matches, the index starts over.
+"""
+
+import time
+import sqlite3
+import hashlib
+import logging
+
+from eth_hash.auto import keccak
+from web3 import Web3
+
+from rpc_batch import RpcBatchError
+from state_seeder import STATUS_ISSUED, STATUS_REVOKED
+
+ISSUED_TOPIC = '0x' + keccak(b'CertificateIssued(bytes32,address,uint256)').hex()
+REVOKED_TOPIC = '0x' + keccak(b'CertificateRevoked(bytes32,address,uint256)').hex()
+STATUS_UNISSUED = 0
+ZERO_ADDRESS = '0x' + '00' * 20
+
+DEFAULT_INITIAL_RANGE = 2_000   # Blocks per eth_getLogs request at the start
+DEFAULT_MAX_RANGE = 100_000
+DEFAULT_TARGET_LOGS = 10_000    # Logs per request above which the range is halved
+REORG_WINDOW = 256              # Indexed block hashes kept for finding a fork point
+QUERY_CHUNK_SIZE = 500          # Hashes per SQLite IN (...) lookup
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    cert_hash BLOB NOT NULL,
+    institution TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_hash ON events (cert_hash);
+CREATE TABLE IF NOT EXISTS certificates (
+    cert_hash BLOB PRIMARY KEY,
+    status INTEGER NOT NULL,
+    institution TEXT NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+"""
+
+def _decode_log(log):
+    """Return an events row for a CertificateIssued/CertificateRevoked log."""
+    topics = log['topics']
+    return (
+        int(log['blockNumber'], 16),
+        int(log['logIndex'], 16),
+        log['transactionHash'],
+        STATUS_ISSUED if topics[0] == ISSUED_TOPIC else STATUS_REVOKED,
+        bytes.fromhex(topics[1][2:]),
+        Web3.to_checksum_address('0x' + topics[2][-40:]),
+        int(log['data'], 16),
+    )
+
+class EventIndexer:
+    """Mirrors a Certificate contract's certificate state into SQLite from its event logs."""
+
+    def __init__(self, rpc, contract_address, db_path=':memory:', start_block=0, confirmations=0,
+                 initial_range=DEFAULT_INITIAL_RANGE, max_range=DEFAULT_MAX_RANGE, target_logs=DEFAULT_TARGET_LOGS):
+        """
+        Initialize the EventIndexer.
+
+        Args:
+            rpc (BatchRpcClient): Client of the node
+            contract_address (str): Address of the Certificate contract
+            db_path (str): SQLite file of the index; in memory by default
+            start_block (int): First block to index, e.g. the deployment block
+            confirmations (int): Blocks behind the head that are left unindexed
+            initial_range (int): Blocks per eth_getLogs request to start with
+            max_range (int): Largest block range per request
+            target_logs (int): Logs per request above which the range is halved
+        """
+        self.rpc = rpc
+        self.address = Web3.to_checksum_address(contract_address)
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.range = initial_range
+        self.max_range = max_range
+        self.target_logs = target_logs
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ':memory:':
+            self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        self.log_requests = 0
+        self.rollbacks = 0
+
+        if self._meta('contract') != self.address:
+            if self._meta('contract') is not None:
+                logging.info(f"Index at {db_path} belongs to {self._meta('contract')}; starting over for {self.address}")
+            with self.db:
+                for table in ('meta', 'events', 'certificates', 'blocks'):
+                    self.db.execute(f'DELETE FROM {table}')
+                self._set_meta('contract', self.address)
+                self._set_checkpoint(start_block - 1, None)
+
+    def _meta(self, key):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def _set_checkpoint(self, number, block_hash):
+        self._set_meta('checkpoint', str(number))
+        self._set_meta('checkpoint_hash', block_hash)
+
+    @property
+    def checkpoint(self):
+        """The last block whose events are fully indexed."""
+        return int(self._meta('checkpoint'))
+
+    def sync(self, to_block=None):
+        """
+        Index all events up to `to_block` (default: the head minus `confirmations`).
+
+        Returns:
+            int: Number of events indexed by this call
+        """
+        head = int(self.rpc.request('eth_blockNumber', []), 16) - self.confirmations
+        to_block = head if to_block is None else min(to_block, head)
+        self._check_reorg()
+
+        indexed = 0
+        start_time = time.time()
+        while self.checkpoint < to_block:
+            first = self.checkpoint + 1
+            last = min(first + self.range - 1, to_block)
+            log_filter = {
+                'address': [self.address], 'fromBlock': hex(first), 'toBlock': hex(last),
+                'topics': [[ISSUED_TOPIC, REVOKED_TOPIC]],
+            }
+            self.log_requests += 1
+            try:
+                logs, last_block = self.rpc.execute([
+                    ('eth_getLogs', [log_filter]), ('eth_getBlockByNumber', [hex(last), False])
+                ])
+            except RpcBatchError as e:
+                if self.range == 1:
+                    raise
+                self.range = max(1, self.range // 2)
+                logging.info(f"eth_getLogs over {last - first + 1} blocks rejected ({e}); range lowered to {self.range}")
+                continue
+
+            self._apply(logs, last, last_block['hash'])
+            indexed += len(logs)
+            if len(logs) > self.target_logs:
+                self.range = max(1, self.range // 2)
+            elif len(logs) < self.target_logs // 4:
+                self.range = min(self.max_range, self.range * 2)
+        if indexed:
+            logging.info(f"Indexed {indexed} events of {self.address} up to block {self.checkpoint} in {time.time() - start_time:.3f}s")
+        return indexed
+
+    def _apply(self, logs, last, last_hash):
+        rows = sorted(_decode_log(log) for log in logs)
+        block_hashes = {int(log['blockNumber'], 16): log['blockHash'] for log in logs}
+        block_hashes[last] = last_hash
+        with self.db:
+            self.db.executemany('INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            # A hash is issued once and can only be revoked afterwards, so issues are applied before revocations
+            self.db.executemany(
+                'INSERT OR REPLACE INTO certificates VALUES (?, ?, ?, ?)',
+                [(row[4], STATUS_ISSUED, row[5], row[6]) for row in rows if row[3] == STATUS_ISSUED]
+            )
+            self.db.executemany(
+                'UPDATE certificates SET status = ? WHERE cert_hash = ?',
+                [(STATUS_REVOKED, row[4]) for row in rows if row[3] == STATUS_REVOKED]
+            )
+            self.db.executemany('INSERT OR REPLACE INTO blocks VALUES (?, ?)', block_hashes.items())
+            self.db.execute(
+                'DELETE FROM blocks WHERE number < (SELECT number FROM blocks ORDER BY number DESC LIMIT 1 OFFSET ?)',
+                (REORG_WINDOW,)
+            )
+            self._set_checkpoint(last, last_hash)
+
+    def _check_reorg(self):
+        checkpoint_hash = self._meta('checkpoint_hash')
+        if checkpoint_hash is None:
+            return
+        block = self.rpc.request('eth_getBlockByNumber', [hex(self.checkpoint), False])
+        if block is not None and block['hash'] == checkpoint_hash:
+            return
+
+        # Find the newest kept block the node still agrees with
+        kept = self.db.execute('SELECT number, hash FROM blocks ORDER BY number DESC').fetchall()
+        replies = self.rpc.execute([('eth_getBlockByNumber', [hex(number), False]) for number, _ in kept], allow_errors=True)
+        fork_point, fork_hash = self.start_block - 1, None
+        for (number, block_hash), reply in zip(kept, replies):
+            if isinstance(reply, dict) and reply['hash'] == block_hash:
+                fork_point, fork_hash = number, block_hash
+                break
+        self._rollback(fork_point, fork_hash)
+
+    def _rollback(self, fork_point, fork_hash):
+        """Undo everything indexed after `fork_point` and rebuild the certificates it touched."""
+        with self.db:
+            self.db.execute('DROP TABLE IF EXISTS temp.affected')
+            self.db.execute(
+                'CREATE TEMP TABLE affected AS SELECT DISTINCT cert_hash FROM events WHERE block_number > ?', (fork_point,)
+            )
+            self.db.execute('DELETE FROM certificates WHERE cert_hash IN (SELECT cert_hash FROM temp.affected)')
+            self.db.execute('DELETE FROM events WHERE block_number > ?', (fork_point,))
+            self.db.execute('DELETE FROM blocks WHERE number > ?', (fork_point,))
+            self.db.execute("""
+                INSERT INTO certificates
+                SELECT e.cert_hash,
+                       CASE WHEN EXISTS (SELECT 1 FROM events r WHERE r.cert_hash = e.cert_hash AND r.kind = ?) THEN ? ELSE ? END,
+                       e.institution, e.timestamp
+                FROM events e
+                WHERE e.kind = ? AND e.cert_hash IN (SELECT cert_hash FROM temp.affected)
+            """, (STATUS_REVOKED, STATUS_REVOKED, STATUS_ISSUED, STATUS_ISSUED))
+            rebuilt = self.db.execute('SELECT COUNT(*) FROM temp.affected').fetchone()[0]
+            self.db.execute('DROP TABLE temp.affected')
+            self._set_checkpoint(fork_point, fork_hash)
+        self.rollbacks += 1
+        logging.warning(
+            f"Chain of {self.address} changed below the indexed checkpoint; rolled back to block {fork_point} "
+            f"and rebuilt {rebuilt} certificates"
+        )
+
+    def status(self, cert_hash):
+        """Return (status, institution, timestamp) like getCertificateStatus, from the index."""
+        row = self.db.execute(
+            'SELECT status, institution, timestamp FROM certificates WHERE cert_hash = ?', (bytes(cert_hash),)
+        ).fetchone()
+        return row if row else (STATUS_UNISSUED, ZERO_ADDRESS, 0)
+
+    def statuses(self, cert_hashes):
+        """Return (status, institution, timestamp) for every hash, in order."""
+        keys = [bytes(h) for h in cert_hashes]
+        found = {}
+        for i in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[i:i + QUERY_CHUNK_SIZE]
+            found.update(
+                (row[0], row[1:]) for row in self.db.execute(
+                    f"SELECT cert_hash, status, institution, timestamp FROM certificates "
+                    f"WHERE cert_hash IN ({','.join('?' * len(chunk))})", chunk
+                )
+            )
+        return [found.get(key, (STATUS_UNISSUED, ZERO_ADDRESS, 0)) for key in keys]
+
+    def counts(self):
+        """Return the number of issued certificates (revoked ones included) and of revoked ones."""
+        total, revoked = self.db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(status = ?), 0) FROM certificates', (STATUS_REVOKED,)
+        ).fetchone()
+        return {'certificates': total, 'revoked': revoked}
+
+    def state_digest(self):
+        """Return a SHA-256 over the complete certificate state, for comparing indexes of different nodes."""
+        digest = hashlib.sha256()
+        for cert_hash, status, institution, timestamp in self.db.execute(
+            'SELECT cert_hash, status, institution, timestamp FROM certificates ORDER BY cert_hash'
+        ):
+            digest.update(cert_hash + bytes([status]) + bytes.fromhex(institution[2:]) + timestamp.to_bytes(32, 'big'))
+        return digest.hexdigest()
+
+    def stats(self):
+        """Return the checkpoint, event and certificate counts, requests, rollbacks and current range."""
+        return {
+            'checkpoint': self.checkpoint,
+            'events': self.db.execute('SELECT COUNT(*) FROM events').fetchone()[0],
+            **self.counts(),
+            'log_requests': self.log_requests,
+            'rollbacks': self.rollbacks,
+            'block_range': self.range,
+        }
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,173 @@
+"""
+In-Process EVM Backend
+
+Gas measurements do not need a networked node. InProcessBackend runs the
+compiled artifacts on eth-tester's py-evm chain inside the Python process and
+exposes the same interface as ClientFactory (web3(), batch_client(),
+contract(), wait_until_ready(), close()), so BlockchainHelper can use either
+one. No Node.js process is started and no request goes over HTTP.
+
+InProcessRpcClient stands in for BatchRpcClient: calls are dispatched
+through the Web3 request manager and the results are re-encoded as JSON-RPC
+values (hex quantities and data), so callers written against a real node
+keep working. Hardhat-only methods (hardhat_setStorageAt, evm_setAutomine,
+...) raise RpcBatchError.
+
+Requires the `eth-tester[py-evm]` package listed in requirements.txt.
+"""
+
+import threading
+from collections.abc import Mapping
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.providers.eth_tester import EthereumTesterProvider
+
+from rpc_batch import RpcBatchError
+
+FUNDING_WEI = 10_000 * 10**18  # Balance given to the deployer account
+
+def _to_rpc(value):
+    """Encode a Web3-formatted result the way a JSON-RPC node returns it."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray, HexBytes)):
+        return '0x' + bytes(value).hex()
+    if isinstance(value, Mapping):  # Includes web3's AttributeDict
+        return {k: _to_rpc(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_rpc(v) for v in value]
+    return value
+
+class _SerializedTesterProvider(EthereumTesterProvider):
+    """EthereumTesterProvider that serializes requests; the py-evm chain is not thread-safe."""
+
+    def __init__(self, ethereum_tester):
+        super().__init__(ethereum_tester)
+        self._request_lock = threading.RLock()
+
+    def make_request(self, method, params):
+        with self._request_lock:
+            return super().make_request(method, params)
+
+class InProcessRpcClient:
+    """A BatchRpcClient replacement that executes calls on an in-process Web3 instance."""
+
+    def __init__(self, w3):
+        """
+        Initialize the InProcessRpcClient.
+
+        Args:
+            w3 (Web3): Web3 client on an EthereumTesterProvider
+        """
+        self.w3 = w3
+        self.posts_sent = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def request(self, method, params):
+        """
+        Execute a single JSON-RPC request.
+
+        Returns:
+            The result, encoded as a JSON-RPC node would return it
+        """
+        try:
+            result = self.w3.manager.request_blocking(method, params)
+        except Exception as e:
+            raise RpcBatchError(f"{method} failed: {e}") from e
+        return _to_rpc(result)
+
+    def execute(self, calls, allow_errors=False):
+        """
+        Execute many JSON-RPC requests; see BatchRpcClient.execute.
+
+        Returns:
+            list: The results in the same order as `calls`
+        """
+        results = []
+        for method, params in calls:
+            try:
+                results.append(self.request(method, params))
+            except RpcBatchError as e:
+                if not allow_errors:
+                    raise
+                results.append(e)
+        self.posts_sent += 1
+        return results
+
+    def eth_call_many(self, transactions, block='latest'):
+        """Run many eth_call requests and return their raw return data as bytes."""
+        replies = self.execute([('eth_call', [tx, block]) for tx in transactions])
+        return [bytes.fromhex(reply[2:]) for reply in replies]
+
+    def estimate_gas_many(self, transactions):
+        """Run many eth_estimateGas requests and return the gas estimates as ints."""
+        replies = self.execute([('eth_estimateGas', [tx]) for tx in transactions])
+        return [int(reply, 16) for reply in replies]
+
+class InProcessBackend:
+    """Provides Web3 clients, batch clients and contracts on an in-process py-evm chain."""
+
+    rpc_url = 'in-process'
+
+    def __init__(self, private_key=None):
+        """
+        Initialize the InProcessBackend.
+
+        Args:
+            private_key (str): Optional key to import and fund, so the deployer
+                configured for the networked runs can be used unchanged
+        """
+        try:
+            from eth_tester import EthereumTester, PyEVMBackend
+        except ImportError as e:
+            raise ImportError("The in-process backend requires eth-tester: pip install 'eth-tester[py-evm]'") from e
+
+        self.tester = EthereumTester(backend=PyEVMBackend())
+        self._w3 = Web3(_SerializedTesterProvider(self.tester))
+        self._lock = threading.RLock()
+        self._contracts = {}
+        if private_key:
+            self.add_account(private_key)
+
+    def add_account(self, private_key):
+        """
+        Import a private key into the chain and fund it from the first test account.
+
+        Returns:
+            str: The checksum address of the account
+        """
+        address = self._w3.eth.account.from_key(private_key).address
+        if address not in self.tester.get_accounts():
+            self.tester.add_account(Web3.to_hex(HexBytes(private_key)))
+        funder = self._w3.eth.accounts[0]
+        if address != funder:
+            tx_hash = self._w3.eth.send_transaction({'from': funder, 'to': address, 'value': FUNDING_WEI})
+            self._w3.eth.wait_for_transaction_receipt(tx_hash)
+        return address
+
+    def web3(self):
+        """Return the shared Web3 client."""
+        return self._w3
+
+    def wait_until_ready(self, timeout=30):
+        """The chain lives in this process and is always ready."""
+        return 0.0
+
+    def batch_client(self, **kwargs):
+        """Return an InProcessRpcClient; BatchRpcClient options (e.g. tuner) are ignored."""
+        return InProcessRpcClient(self._w3)
+
+    def contract(self, address, abi):
+        """Return the cached contract object for an address."""
+        address = Web3.to_checksum_address(address)
+        with self._lock:
+            if address not in self._contracts:
+                self._contracts[address] = self._w3.eth.contract(address=address, abi=abi)
+            return self._contracts[address]
+
+    def close(self):
+        pass
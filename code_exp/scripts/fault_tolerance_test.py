@@ -14,9 +14,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
 from dotenv import load_dotenv
 from node_manager import NodeManager
+from latency_recorder import LatencyRecorder
+from client_factory import ClientFactory
+from event_indexer import EventIndexer
 import json
 import sys
 
@@ -34,6 +36,7 @@ ARTIFACTS_DIR = os.path.join(ROOT_DIR, 'artifacts', 'contracts')
 CERTIFICATE_ARTIFACT_PATH = os.path.join(ARTIFACTS_DIR, 'Certificate.sol', 'Certificate.json')
 DATA_DIR = os.path.join(ROOT_DIR, 'data')
 LOG_DIR = os.path.join(ROOT_DIR, 'log')
+INDEXER_DIR = os.path.join(DATA_DIR, 'indexer')
 
 # --- Ensure directories exist ---
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -58,9 +61,13 @@ class FaultToleranceTest:
     def __init__(self):
         """Initialize the fault tolerance test."""
         self.node_manager = NodeManager(base_port=BASE_PORT, node_count=NODE_COUNT)
+        self.client_factories = {}
         self.web3_connections = {}
         self.contracts = {}
+        self.indexers = {}
+        self.sent_hashes = {}  # Node ID -> certificate hashes sent to that node
         self.results = []
+        self.latency_results = []
         
     def setup(self):
         """Set up the test environment by starting all nodes."""
@@ -108,12 +115,13 @@ class FaultToleranceTest:
             return False
         
         try:
-            # Connect to the node
-            w3 = Web3(Web3.HTTPProvider(node_url, request_kwargs={'timeout': 30}))
-            w3.middleware_onion.inject(geth_poa_middleware, layer=0)
-            
-            if not w3.is_connected():
-                logging.error(f"Failed to connect to node {node_id} at {node_url}")
+            # Connect to the node through a pooled client, waiting until it answers requests
+            clients = ClientFactory(node_url, timeout=30)
+            w3 = clients.web3()
+            try:
+                clients.wait_until_ready(timeout=30)
+            except ConnectionError as e:
+                logging.error(f"Failed to connect to node {node_id} at {node_url}: {e}")
                 return False
             
             # Set up account
@@ -129,13 +137,14 @@ class FaultToleranceTest:
             tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
             contract_address = tx_receipt.contractAddress
             
-            contract = w3.eth.contract(address=contract_address, abi=contract_json['abi'])
+            contract = clients.contract(contract_address, contract_json['abi'])
             
             # Add institution
             tx_hash = contract.functions.addInstitution(account.address).transact({'from': account.address})
             w3.eth.wait_for_transaction_receipt(tx_hash)
             
             # Store connections
+            self.client_factories[node_id] = clients
             self.web3_connections[node_id] = w3
             self.contracts[node_id] = contract
             
@@ -192,6 +201,7 @@ class FaultToleranceTest:
         start_time = time.time()
         successful_txs = 0
         failed_txs = 0
+        recorder = LatencyRecorder()
         
         for i in range(transaction_count):
             # Select a random active node for this transaction
@@ -215,14 +225,17 @@ class FaultToleranceTest:
                 cert_hash = w3.keccak(text=f"certificate-fault-test-{scenario_name}-{i}")
                 
                 # Issue the certificate
+                tx_start_time = time.time()
                 tx_hash = contract.functions.issueCertificate(cert_hash).transact({
                     'from': w3.eth.default_account
                 })
+                self.sent_hashes.setdefault(node_id, []).append(cert_hash)
                 
                 # Wait for transaction receipt with timeout
                 try:
                     tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=10)
                     successful_txs += 1
+                    recorder.record('issueCertificate', time.time() - tx_start_time)
                     logging.info(f"Transaction {i+1}/{transaction_count} successful on node {node_id}")
                 except Exception as e:
                     failed_txs += 1
@@ -288,6 +301,7 @@ class FaultToleranceTest:
         
         # Verify data consistency
         consistency_check_passed = self._verify_data_consistency()
+        full_state_consistent = self._verify_full_state()
         
         # Record results
         result = {
@@ -300,10 +314,12 @@ class FaultToleranceTest:
             'failed_txs': failed_txs,
             'recovery_time': recovery_time,
             'sync_complete': sync_complete,
-            'data_consistent': consistency_check_passed
+            'data_consistent': consistency_check_passed,
+            'full_state_consistent': full_state_consistent
         }
         
         self.results.append(result)
+        self.latency_results.extend(recorder.summary(scenario=scenario_name, active_nodes=active_node_count))
         logging.info(f"Test scenario complete: {scenario_name}")
         logging.info(f"Results: {result}")
         
@@ -363,10 +379,63 @@ class FaultToleranceTest:
         logging.info("Data consistency check passed")
         return True
     
+    def _verify_full_state(self):
+        """
+        Check every running node's event index against that node's own contract state.
+
+        The nodes do not replicate each other, so each node is checked on its own: its
+        index, rebuilt from its event logs, must answer getCertificateStatus exactly like
+        its contract for every certificate hash sent to it.
+
+        Returns:
+            bool: True if every node's index matches its contract, False otherwise
+        """
+        logging.info("Checking each node's indexed certificate state against its contract...")
+        os.makedirs(INDEXER_DIR, exist_ok=True)
+        checked = 0
+        consistent = True
+        for node_id in self.node_manager.get_running_nodes():
+            if node_id not in self.contracts:
+                continue
+            contract = self.contracts[node_id]
+            sent = self.sent_hashes.get(node_id, [])
+            try:
+                indexer = self.indexers.get(node_id)
+                if indexer is None or indexer.address != contract.address:
+                    indexer = EventIndexer(
+                        self.client_factories[node_id].batch_client(), contract.address,
+                        db_path=os.path.join(INDEXER_DIR, f'fault_node_{node_id}.sqlite')
+                    )
+                    self.indexers[node_id] = indexer
+                indexer.sync()
+                indexed = indexer.statuses(sent)
+                on_chain = [tuple(contract.functions.getCertificateStatus(cert_hash).call()) for cert_hash in sent]
+            except Exception as e:
+                logging.error(f"Error indexing certificates on node {node_id}: {e}")
+                return False
+
+            mismatches = [
+                cert_hash.hex() for cert_hash, index_state, chain_state in zip(sent, indexed, on_chain)
+                if tuple(index_state) != chain_state
+            ]
+            checked += 1
+            logging.info(f"Node {node_id}: {indexer.counts()}, {len(sent)} sent hashes checked")
+            if mismatches:
+                logging.warning(f"Node {node_id}: index differs from the contract for {len(mismatches)} hashes, e.g. {mismatches[:3]}")
+                consistent = False
+
+        if not checked:
+            logging.error("No node could be indexed")
+            return False
+        if consistent:
+            logging.info("Full state consistency check passed")
+        return consistent
+
     def run_all_tests(self):
         """Run all test scenarios."""
         logging.info("Starting fault tolerance test suite...")
         self.results = []  # Clear previous results
+        self.latency_results = []
         
         # Define test scenarios
         scenarios = [
@@ -406,6 +475,11 @@ class FaultToleranceTest:
         output_path = os.path.join(DATA_DIR, 'fault_tolerance_test.csv')
         df.to_csv(output_path, index=False)
         logging.info(f"Results saved to {output_path}")
+
+        if self.latency_results:
+            latency_path = os.path.join(DATA_DIR, 'fault_tolerance_latency.csv')
+            pd.DataFrame(self.latency_results).to_csv(latency_path, index=False)
+            logging.info(f"Transaction latency percentiles saved to {latency_path}")
     
     def cleanup(self):
         """Clean up resources by stopping all nodes."""
@@ -0,0 +1,177 @@
+"""
+Memoized Gas Estimation
+
+The gas of a call depends on the code that runs and the path it takes, not on
+the particular certificate hash: every revoked hash costs the same to look
+up, as does every unissued one. GasCache estimates each (contract code hash,
+function selector, state class) once and answers later queries from memory.
+The state class is declared by the caller ('revoked', 'unissued', ...) and
+must name everything the path depends on.
+
+Calldata is charged per byte (4 gas for a zero byte, 16 otherwise), so
+hashes with different numbers of zero bytes differ by a few gas. The cache
+stores the estimate minus the calldata charge and adds the charge of each
+query back, which keeps answers exact to within a gas or two.
+
+A fraction of the hits (`sample_rate`) is estimated anyway. If the real value
+differs from the cached one by more than `tolerance` (relative), the entry is
+flagged as drifted and from then on every query for it is estimated for real.
+"""
+
+import random
+import logging
+import threading
+
+import pandas as pd
+from eth_hash.auto import keccak
+from web3 import Web3
+
+DEFAULT_SAMPLE_RATE = 0.05       # Fraction of cache hits that are validated against a real estimate
+DEFAULT_DRIFT_TOLERANCE = 0.001  # Relative drift above which a cached value is flagged; estimators may be off by a gas or two
+
+def calldata_gas(data):
+    """Return the intrinsic gas charged for a transaction's calldata (hex string)."""
+    payload = bytes.fromhex(data[2:] if data.startswith('0x') else data)
+    zeros = payload.count(0)
+    return 4 * zeros + 16 * (len(payload) - zeros)
+
+class GasCache:
+    """Caches eth_estimateGas results per (code hash, selector, state class), with sampled validation."""
+
+    def __init__(self, rpc, sample_rate=DEFAULT_SAMPLE_RATE, tolerance=DEFAULT_DRIFT_TOLERANCE, seed=0):
+        """
+        Initialize the GasCache.
+
+        Args:
+            rpc (BatchRpcClient): Client used for eth_getCode and eth_estimateGas
+            sample_rate (float): Fraction of hits that are re-estimated to validate the cached value
+            tolerance (float): Relative drift allowed before a cached value is flagged
+            seed (int): Seed of the validation sampling
+        """
+        self.rpc = rpc
+        self.sample_rate = sample_rate
+        self.tolerance = tolerance
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._code_hashes = {}  # address -> keccak of the runtime code
+        self._entries = {}      # key -> {'gas', 'samples', 'drifted', 'max_drift', 'hits'}
+        self.hits = 0
+        self.misses = 0
+        self.validations = 0
+        self.drifts = 0
+
+    def code_hash(self, address):
+        """Return the keccak256 of the runtime code at `address` as a hex string."""
+        address = Web3.to_checksum_address(address)
+        if address not in self._code_hashes:
+            code = self.rpc.request('eth_getCode', [address, 'latest'])
+            self._code_hashes[address] = '0x' + keccak(bytes.fromhex(code[2:])).hex()
+        return self._code_hashes[address]
+
+    def forget_code(self):
+        """Drop the cached code hashes, e.g. after evm_revert may have changed what lives at an address."""
+        self._code_hashes.clear()
+
+    def key(self, transaction, state_class):
+        """Return the cache key of a transaction dict ('to', 'data') under a state class."""
+        return (self.code_hash(transaction['to']), transaction['data'][:10], state_class)
+
+    def estimate_many(self, transactions, state_classes):
+        """
+        Estimate gas for many transactions, answering cached (key, state class) pairs from memory.
+
+        Keys seen for the first time are estimated in one JSON-RPC batch; sampled hits
+        and drifted keys in a second one.
+
+        Args:
+            transactions (list): Transaction dicts with 'from', 'to' and hex 'data'
+            state_classes (list or str): State class of every transaction, or one for all of them
+
+        Returns:
+            list: Gas estimates as ints, in the order of `transactions`
+        """
+        if isinstance(state_classes, str):
+            state_classes = [state_classes] * len(transactions)
+        keys = [self.key(tx, state_class) for tx, state_class in zip(transactions, state_classes)]
+
+        # New keys are estimated once, from their first transaction, before anything is answered
+        with self._lock:
+            first_seen = {}
+            for i, key in enumerate(keys):
+                if key not in self._entries and key not in first_seen:
+                    first_seen[key] = i
+        if first_seen:
+            estimates = self.rpc.estimate_gas_many([transactions[i] for i in first_seen.values()])
+            with self._lock:
+                for (key, i), gas in zip(first_seen.items(), estimates):
+                    execution_gas = gas - calldata_gas(transactions[i]['data'])
+                    self._entries[key] = {'gas': execution_gas, 'samples': 1, 'drifted': False, 'max_drift': 0, 'hits': 0}
+                self.misses += len(first_seen)
+
+        results = [None] * len(transactions)
+        to_estimate = []  # Positions answered by a real estimate: sampled hits and drifted keys
+        with self._lock:
+            for i, (tx, key) in enumerate(zip(transactions, keys)):
+                if first_seen.get(key) == i:
+                    results[i] = self._entries[key]['gas'] + calldata_gas(tx['data'])
+                    continue
+                entry = self._entries[key]
+                if entry['drifted']:
+                    to_estimate.append(i)
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                entry['hits'] += 1
+                if self._random.random() < self.sample_rate:
+                    to_estimate.append(i)
+                else:
+                    results[i] = entry['gas'] + calldata_gas(tx['data'])
+
+        if to_estimate:
+            estimates = self.rpc.estimate_gas_many([transactions[i] for i in to_estimate])
+            with self._lock:
+                for i, gas in zip(to_estimate, estimates):
+                    results[i] = gas
+                    self._validate(keys[i], self._entries[keys[i]], gas - calldata_gas(transactions[i]['data']))
+        return results
+
+    def _validate(self, key, entry, execution_gas):
+        entry['samples'] += 1
+        self.validations += 1
+        drift = execution_gas - entry['gas']
+        entry['max_drift'] = max(entry['max_drift'], abs(drift))
+        if abs(drift) > self.tolerance * entry['gas'] and not entry['drifted']:
+            entry['drifted'] = True
+            self.drifts += 1
+            logging.warning(
+                f"Cached gas for selector {key[1]} ({key[2]}) drifted by {drift}: {entry['gas']} cached; "
+                f"the state class does not determine the cost, estimating every query from now on"
+            )
+
+    def estimate(self, transaction, state_class):
+        """Estimate gas for one transaction; see estimate_many()."""
+        return self.estimate_many([transaction], [state_class])[0]
+
+    def stats(self):
+        """Return hit, miss, validation and drift counters and the hit rate as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'validations': self.validations,
+            'drifts': self.drifts,
+        }
+
+    def entries(self):
+        """Return one dict per cached key with its gas (calldata excluded), samples and drift flag."""
+        with self._lock:
+            return [
+                {'code_hash': code_hash, 'selector': selector, 'state_class': state_class, **entry}
+                for (code_hash, selector, state_class), entry in self._entries.items()
+            ]
+
+    def to_csv(self, path):
+        """Write entries() to a CSV file."""
+        pd.DataFrame(self.entries()).to_csv(path, index=False)
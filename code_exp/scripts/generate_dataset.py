@@ -1,66 +1,253 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 from faker import Faker
 from tqdm import tqdm
-import os
-import hashlib
-import random
 from web3 import Web3
+from hash_store import STORE_DIR, HashStore, allocate_store, finalize_store
 
 # --- Configuration ---
 NUM_RECORDS = 100_000  # Full dataset size as specified in requirements
+DEFAULT_SEED = 42
+CHUNK_SIZE = 20_000  # Records generated and written per step; bounds the memory of each worker
 # Use an absolute path to ensure the file is saved in the correct location
 OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset'))
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'certificates_data.csv')
+SHARDS_DIR = os.path.join(OUTPUT_DIR, 'shards')
+MANIFEST_FILE = 'manifest.json'
+SHARD_CSV_FILE = 'records.csv'
+# Fixed issue-date window; relative dates ('today') would make the records depend on the run date
+ISSUE_DATE_START = date(2021, 1, 1)
+ISSUE_DATE_END = date(2025, 12, 31)
 
-# --- Main Function ---
-def generate_dataset():
+# Fixed widths let every shard be written into preallocated, memory-mapped columns.
+RECORD_FIELD_DTYPES = {
+    'record_id': 'i8',
+    'student_name': 'U64',
+    'degree_type': 'U40',
+    'institution_name': 'U40',
+    'major': 'U40',
+    'gpa': 'f8',
+    'graduation_year': 'i4',
+    'issue_date': 'U10',
+}
+RECORD_FIELDS = list(RECORD_FIELD_DTYPES)
+
+DEGREE_TYPES = [
+    "Bachelor of Science",
+    "Master of Engineering",
+    "Doctor of Philosophy",
+    "Bachelor of Arts",
+    "Master of Business Administration"
+]
+INSTITUTIONS = [
+    "University of Tech", "Global Science Institute", "National Research University",
+    "State College of Engineering", "Metropolis Business School"
+]
+MAJORS = ['Computer Science', 'Data Science', 'Electrical Engineering', 'Mechanical Engineering', 'Business Administration', 'Economics', 'Art History']
+
+def shard_bounds(num_records, shard_count):
+    """Split [0, num_records) into `shard_count` contiguous (start, stop) ranges."""
+    step, extra = divmod(num_records, shard_count)
+    bounds, start = [], 0
+    for i in range(shard_count):
+        stop = start + step + (1 if i < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+def generate_record(fake, seed, record_id):
     """
-    Generates a large, realistic dataset of academic certificates and saves it to a CSV file.
-    The dataset includes a pre-computed keccak256 hash for each certificate record, which
-    will be used for on-chain transactions in the simulation.
+    Generate one certificate record.
+
+    The random state is derived from (seed, record_id) alone, so a record does not
+    depend on the shard layout or on the records generated before it.
     """
-    print(f"Starting dataset generation for {NUM_RECORDS} records...")
+    fake.seed_instance((seed << 40) | record_id)
+    rng = fake.random
+    record = {
+        'record_id': record_id,
+        'student_name': fake.name(),
+        'degree_type': rng.choice(DEGREE_TYPES),
+        'institution_name': rng.choice(INSTITUTIONS),
+        'major': rng.choice(MAJORS),
+        'gpa': round(rng.uniform(3.0, 4.0), 2),
+        'graduation_year': rng.randint(2020, 2025),
+        'issue_date': fake.date_between(start_date=ISSUE_DATE_START, end_date=ISSUE_DATE_END).isoformat()
+    }
+    # The record id is part of the hashed string, so identical field values still give unique hashes.
+    record_string = f"{record['record_id']},{record['student_name']},{record['degree_type']},{record['institution_name']},{record['major']},{record['gpa']},{record['graduation_year']},{record['issue_date']}"
+    return record, Web3.keccak(record_string.encode('utf-8'))
 
+def shard_dir(shards_dir, index):
+    return os.path.join(shards_dir, f"shard-{index:05d}")
+
+def generate_shard(index, start, stop, seed, shards_dir, chunk_size=CHUNK_SIZE):
+    """
+    Generate records [start, stop) into shard directory `index`.
+
+    The shard is a hash store (see hash_store.py) plus a CSV of the same records. Both
+    are streamed to disk one chunk at a time. The store's meta.json is written last and
+    marks the shard as complete.
+
+    Returns:
+        dict: The manifest entry of the shard
+    """
+    directory = shard_dir(shards_dir, index)
+    csv_path = os.path.join(directory, SHARD_CSV_FILE)
+    hashes, fields = allocate_store(directory, stop - start, RECORD_FIELD_DTYPES)
     fake = Faker()
 
-    degree_types = [
-        "Bachelor of Science",
-        "Master of Engineering",
-        "Doctor of Philosophy",
-        "Bachelor of Arts",
-        "Master of Business Administration"
-    ]
-    institutions = [
-        "University of Tech", "Global Science Institute", "National Research University",
-        "State College of Engineering", "Metropolis Business School"
+    with open(csv_path, 'w', newline='') as csv_file:
+        for chunk_start in range(start, stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, stop)
+            rows = []
+            offset = chunk_start - start
+            for record_id in range(chunk_start, chunk_stop):
+                record, digest = generate_record(fake, seed, record_id)
+                hashes[offset + len(rows)] = np.frombuffer(digest, dtype=np.uint8)
+                record['certificate_hash'] = digest.hex()
+                rows.append(record)
+
+            chunk = pd.DataFrame(rows)
+            for name in RECORD_FIELDS:
+                fields[name][offset:offset + len(rows)] = chunk[name].to_numpy()
+            chunk.to_csv(csv_file, index=False, header=(chunk_start == start))
+
+    finalize_store(directory, hashes, fields, source=csv_path)
+    return {'index': index, 'start': start, 'stop': stop, 'directory': os.path.basename(directory)}
+
+def _shard_is_complete(shards_dir, entry):
+    directory = shard_dir(shards_dir, entry['index'])
+    return HashStore.exists(directory) and len(HashStore.open(directory)) == entry['stop'] - entry['start']
+
+def write_manifest(shards_dir, manifest):
+    with open(os.path.join(shards_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def load_manifest(shards_dir):
+    with open(os.path.join(shards_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def generate_shards(num_records, shard_count, seed, shards_dir=SHARDS_DIR, workers=None, chunk_size=CHUNK_SIZE, only_shard=None):
+    """
+    Generate all (or one) shards in a process pool and record them in the manifest.
+
+    Shards that are already complete for the same seed and layout are kept, so an
+    interrupted run resumes where it stopped.
+
+    Returns:
+        dict: The manifest
+    """
+    os.makedirs(shards_dir, exist_ok=True)
+    manifest = {'num_records': num_records, 'shard_count': shard_count, 'seed': seed, 'shards': []}
+    manifest_path = os.path.join(shards_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        previous = load_manifest(shards_dir)
+        if {k: previous[k] for k in ('num_records', 'shard_count', 'seed')} == {k: manifest[k] for k in ('num_records', 'shard_count', 'seed')}:
+            manifest['shards'] = [e for e in previous['shards'] if _shard_is_complete(shards_dir, e)]
+
+    done = {e['index'] for e in manifest['shards']}
+    todo = [
+        (i, start, stop) for i, (start, stop) in enumerate(shard_bounds(num_records, shard_count))
+        if i not in done and (only_shard is None or i == only_shard)
     ]
-    majors = ['Computer Science', 'Data Science', 'Electrical Engineering', 'Mechanical Engineering', 'Business Administration', 'Economics', 'Art History']
+    if not todo:
+        print("All requested shards are already complete.")
+        return manifest
+
+    print(f"Generating {len(todo)} of {shard_count} shards ({num_records} records, seed {seed})...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_shard, i, start, stop, seed, shards_dir, chunk_size) for i, start, stop in todo]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Generating Shards"):
+            manifest['shards'].append(future.result())
+            manifest['shards'].sort(key=lambda e: e['index'])
+            write_manifest(shards_dir, manifest)
+    return manifest
+
+def merge_shards(shards_dir=SHARDS_DIR, output_file=OUTPUT_FILE, store_dir=STORE_DIR):
+    """
+    Concatenate the shards of the manifest into the dataset CSV and hash store.
+
+    Shards are copied one at a time, so memory use does not depend on the dataset size.
+    """
+    manifest = load_manifest(shards_dir)
+    entries = sorted(manifest['shards'], key=lambda e: e['index'])
+    if len(entries) != manifest['shard_count']:
+        raise RuntimeError(f"Only {len(entries)} of {manifest['shard_count']} shards are complete; generate the rest first")
 
+    hashes, fields = allocate_store(store_dir, manifest['num_records'], RECORD_FIELD_DTYPES)
+    with open(output_file, 'wb') as out:
+        for position, entry in enumerate(tqdm(entries, desc="Merging Shards")):
+            directory = shard_dir(shards_dir, entry['index'])
+            shard = HashStore.open(directory)
+            hashes[entry['start']:entry['stop']] = shard.raw()
+            for name in RECORD_FIELDS:
+                fields[name][entry['start']:entry['stop']] = shard.field(name)
+            with open(os.path.join(directory, SHARD_CSV_FILE), 'rb') as shard_csv:
+                if position > 0:
+                    shard_csv.readline()  # Keep only the first shard's header
+                shutil.copyfileobj(shard_csv, out)
+    finalize_store(store_dir, hashes, fields, source=output_file)
+
+# --- Main Function ---
+def generate_dataset(num_records=NUM_RECORDS, shard_count=None, seed=DEFAULT_SEED, workers=None,
+                     chunk_size=CHUNK_SIZE, only_shard=None, merge=True, keep_shards=False):
+    """
+    Generates a large, realistic dataset of academic certificates and saves it to a CSV file.
+    The dataset includes a pre-computed keccak256 hash for each certificate record, which
+    will be used for on-chain transactions in the simulation.
+
+    Alongside the CSV, a memory-mapped hash store (see hash_store.py) is written with the
+    raw 32-byte hashes and one column file per record field.
+
+    Records are generated in seeded shards by a process pool; each shard streams to
+    disk in chunks and is reproducible on its own. A merge step concatenates them.
+    """
+    shard_count = shard_count or max(os.cpu_count() or 1, 1)
+    shard_count = min(shard_count, num_records)
+    print(f"Starting dataset generation for {num_records} records...")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    data = []
-    for _ in tqdm(range(NUM_RECORDS), desc="Generating Records"):
-        record = {
-            'student_name': fake.name(),
-            'degree_type': random.choice(degree_types),
-            'institution_name': random.choice(institutions),
-            'major': random.choice(majors),
-            'gpa': round(random.uniform(3.0, 4.0), 2),
-            'graduation_year': random.randint(2020, 2025),
-            'issue_date': fake.date_between(start_date='-4y', end_date='today').isoformat()
-        }
-
-        record_string = f"{record['student_name']},{record['degree_type']},{record['institution_name']},{record['major']},{record['gpa']},{record['graduation_year']},{record['issue_date']}"
-        record['certificate_hash'] = Web3.keccak(record_string.encode('utf-8')).hex()
-        data.append(record)
-
-    df = pd.DataFrame(data)
-    print(f"\nSaving dataset to {OUTPUT_FILE}...")
-    df.to_csv(OUTPUT_FILE, index=False)
+    generate_shards(num_records, shard_count, seed, SHARDS_DIR, workers, chunk_size, only_shard)
+    if not merge or only_shard is not None:
+        print(f"Shards written to {SHARDS_DIR}; run with --merge-only to build the dataset.")
+        return
+
+    print(f"\nMerging shards into {OUTPUT_FILE} and {STORE_DIR}...")
+    merge_shards(SHARDS_DIR, OUTPUT_FILE, STORE_DIR)
+    if not keep_shards:
+        shutil.rmtree(SHARDS_DIR)
 
     print("\nDataset generation complete!")
-    print(f"Total records: {len(df)}")
+    print(f"Total records: {num_records}")
     print(f"File saved at: {os.path.abspath(OUTPUT_FILE)}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the synthetic certificate dataset.")
+    parser.add_argument('--records', type=int, default=NUM_RECORDS, help="Number of records to generate")
+    parser.add_argument('--shards', type=int, default=None, help="Number of shards (default: CPU count)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed; the same seed gives the same records")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Records written per chunk")
+    parser.add_argument('--only-shard', type=int, default=None, help="Generate only this shard index")
+    parser.add_argument('--merge-only', action='store_true', help="Merge previously generated shards")
+    parser.add_argument('--keep-shards', action='store_true', help="Keep the shard directory after merging")
+    return parser.parse_args()
+
 if __name__ == '__main__':
-    generate_dataset()
+    args = parse_args()
+    if args.merge_only:
+        merge_shards(SHARDS_DIR, OUTPUT_FILE, STORE_DIR)
+        if not args.keep_shards:
+            shutil.rmtree(SHARDS_DIR)
+        print(f"Merged shards into {OUTPUT_FILE}")
+    else:
+        generate_dataset(args.records, args.shards, args.seed, args.workers, args.chunk_size,
+                         args.only_shard, keep_shards=args.keep_shards)
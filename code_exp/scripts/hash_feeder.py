@@ -0,0 +1,157 @@
+"""
+Background Unique-Hash Feeder
+
+Load tests need a fresh certificate hash for every transaction. Computing it on
+the hot path (sampling a DataFrame, formatting a string, hashing it) adds client
+work to every measured request. HashFeeder moves that work into a separate
+process: the producer fills a bounded multiprocessing queue with blocks of
+hashes drawn from a CertificateSource (see certificate_source.py), so every
+hash is unique by construction, and the consumer takes one block per queue
+operation and then hands out hashes from memory. When the queue runs dry the
+consumer waits for the producer and counts the stall, so results measured
+while the feeder could not keep up can be identified. The wait is bounded:
+next_hash() is called from the load loop (including the asyncio event loop),
+so a dead or stuck producer raises RuntimeError instead of hanging the test.
+"""
+
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+
+from certificate_source import CertificateSource, DEFAULT_SEED
+from hash_store import HASH_SIZE
+
+DEFAULT_FEED_BLOCK_SIZE = 4096  # Hashes per queue item
+DEFAULT_PREFETCH_BLOCKS = 64    # Blocks the producer may run ahead of the consumer
+DEFAULT_STALL_TIMEOUT = 10      # Seconds the consumer waits for a block before giving up
+STALL_POLL_INTERVAL = 0.1       # Seconds between producer liveness checks while waiting
+
+def _produce(blocks, stop_event, label, seed, start_index, block_size):
+    """Producer process: put consecutive blocks of source hashes on the queue until stopped."""
+    source = CertificateSource(seed=seed, label=label)
+    index = start_index
+    block = None
+    while not stop_event.is_set():
+        if block is None:
+            block = b''.join(source.hashes(index, index + block_size))
+            index += block_size
+        try:
+            blocks.put(block, timeout=0.1)
+            block = None
+        except queue.Full:
+            continue
+
+class HashFeeder:
+    """Hands out pre-computed, guaranteed-unique bytes32 hashes produced in a background process."""
+
+    def __init__(self, label='load', seed=DEFAULT_SEED, start_index=0,
+                 block_size=DEFAULT_FEED_BLOCK_SIZE, prefetch_blocks=DEFAULT_PREFETCH_BLOCKS,
+                 stall_timeout=DEFAULT_STALL_TIMEOUT):
+        """
+        Initialize the HashFeeder.
+
+        Args:
+            label (str): Namespace of the hashes; use a label no other experiment issues from
+            seed (int): Seed of the hashes
+            start_index (int): First source index to hand out
+            block_size (int): Hashes per queue item
+            prefetch_blocks (int): Maximum blocks buffered ahead of the consumer
+            stall_timeout (float): Seconds next_hash() waits for the producer before raising RuntimeError
+        """
+        self.label = label
+        self.seed = seed
+        self.start_index = start_index
+        self.block_size = block_size
+        self.prefetch_blocks = prefetch_blocks
+        self.stall_timeout = stall_timeout
+        self._lock = threading.Lock()
+        self._block = b''
+        self._offset = 0
+        self._blocks = None
+        self._stop_event = None
+        self._process = None
+        self.served = 0
+        self.stalls = 0
+        self.stall_seconds = 0.0
+
+    def start(self, timeout=30):
+        """
+        Start the producer process and wait for the first block.
+
+        Args:
+            timeout (float): Seconds to wait for the first block
+        """
+        if self._process is not None:
+            return
+        self._blocks = multiprocessing.Queue(maxsize=self.prefetch_blocks)
+        self._stop_event = multiprocessing.Event()
+        self._process = multiprocessing.Process(
+            target=_produce,
+            args=(self._blocks, self._stop_event, self.label, self.seed, self.start_index, self.block_size),
+            daemon=True,
+        )
+        self._process.start()
+        with self._lock:
+            self._block = self._blocks.get(timeout=timeout)
+            self._offset = 0
+        logging.info(f"Hash feeder started (label '{self.label}', {self.block_size} hashes per block)")
+
+    def stop(self):
+        """Stop the producer process."""
+        if self._process is None:
+            return
+        self._stop_event.set()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._blocks.close()
+        self._blocks.cancel_join_thread()  # Buffered blocks are discarded
+        self._process = None
+        logging.info(f"Hash feeder stopped: {self.served} hashes served, {self.stalls} stalls ({self.stall_seconds:.3f}s)")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _next_block(self):
+        try:
+            return self._blocks.get_nowait()
+        except queue.Empty:
+            pass
+        # The producer fell behind: wait for it and record the stall
+        start_time = time.perf_counter()
+        deadline = start_time + self.stall_timeout
+        while True:
+            try:
+                block = self._blocks.get(timeout=STALL_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError(f"Hash feeder producer exited with code {self._process.exitcode}") from None
+                if time.perf_counter() >= deadline:
+                    raise RuntimeError(f"Hash feeder produced no block within {self.stall_timeout}s") from None
+        self.stalls += 1
+        self.stall_seconds += time.perf_counter() - start_time
+        if self.stalls == 1 or self.stalls % 100 == 0:
+            logging.warning(f"Hash feeder cannot keep up: {self.stalls} stalls, {self.stall_seconds:.3f}s spent waiting")
+        return block
+
+    def next_hash(self):
+        """Return the next unique hash as a 32-byte `bytes` value."""
+        with self._lock:
+            if self._offset >= len(self._block):
+                self._block = self._next_block()
+                self._offset = 0
+            value = self._block[self._offset:self._offset + HASH_SIZE]
+            self._offset += HASH_SIZE
+            self.served += 1
+            return value
+
+    def stats(self):
+        """Return the served hash count and stall counters as a dict."""
+        return {'served': self.served, 'stalls': self.stalls, 'stall_seconds': self.stall_seconds}
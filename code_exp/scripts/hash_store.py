@@ -0,0 +1,203 @@
+"""
+Columnar, Memory-Mapped Certificate Hash Store
+
+`generate_dataset.py` writes this store next to the CSV: the raw certificate
+hashes as one contiguous N x 32 uint8 `.npy` array, one `.npy` array per record
+field and a `meta.json` describing them. Opening the store memory-maps the
+arrays, so startup does not depend on the number of records and slices are
+views into the file rather than parsed copies of hex strings.
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dataset', 'certificates_store'))
+HASHES_FILE = 'hashes.npy'
+META_FILE = 'meta.json'
+HASH_SIZE = 32
+
+def hashes_from_hex(hex_values):
+    """
+    Convert hex-encoded hashes (with or without a 0x prefix) into an N x 32 uint8 array.
+
+    Args:
+        hex_values (iterable): Hex strings of 32-byte hashes
+
+    Returns:
+        numpy.ndarray: The raw hashes, one row per hash
+    """
+    raw = b''.join(bytes.fromhex(h[2:] if h.startswith('0x') else h) for h in hex_values)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, HASH_SIZE)
+
+def write_store(store_dir, hashes, fields=None, source=None):
+    """
+    Write a hash store.
+
+    Args:
+        store_dir (str): Directory of the store; created if missing
+        hashes (numpy.ndarray): N x 32 uint8 array of raw hashes
+        fields (dict): Optional column name -> array-like of N record values
+        source (str): Optional path of the CSV the store belongs to
+    """
+    hashes = np.ascontiguousarray(hashes, dtype=np.uint8)
+    if hashes.ndim != 2 or hashes.shape[1] != HASH_SIZE:
+        raise ValueError(f"Expected an N x {HASH_SIZE} hash array, got shape {hashes.shape}")
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(os.path.join(store_dir, HASHES_FILE), hashes)
+
+    columns = {}
+    for name, values in (fields or {}).items():
+        array = np.asarray(values)
+        if array.dtype == object:
+            array = array.astype(str)  # Fixed-width unicode can be memory-mapped, objects cannot
+        if len(array) != len(hashes):
+            raise ValueError(f"Field '{name}' has {len(array)} values for {len(hashes)} hashes")
+        file_name = f"{name}.npy"
+        np.save(os.path.join(store_dir, file_name), array)
+        columns[name] = {'file': file_name, 'dtype': array.dtype.str}
+
+    _write_meta(store_dir, len(hashes), columns, source)
+
+def _write_meta(store_dir, count, columns, source):
+    # meta.json is written last; a store without it is incomplete.
+    meta = {'count': count, 'hash_file': HASHES_FILE, 'fields': columns, 'source': source}
+    with open(os.path.join(store_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+def allocate_store(store_dir, count, field_dtypes=None):
+    """
+    Create a store of `count` records as writable memory-mapped arrays, for filling in chunks.
+
+    The store is not readable until finalize_store() has been called.
+
+    Args:
+        store_dir (str): Directory of the store; created if missing
+        count (int): Number of records
+        field_dtypes (dict): Column name -> numpy dtype (strings need a fixed width, e.g. 'U64')
+
+    Returns:
+        tuple: (N x 32 uint8 hash array, dict of column name -> array)
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    meta_path = os.path.join(store_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    hashes = np.lib.format.open_memmap(
+        os.path.join(store_dir, HASHES_FILE), mode='w+', dtype=np.uint8, shape=(count, HASH_SIZE)
+    )
+    fields = {
+        name: np.lib.format.open_memmap(os.path.join(store_dir, f"{name}.npy"), mode='w+', dtype=dtype, shape=(count,))
+        for name, dtype in (field_dtypes or {}).items()
+    }
+    return hashes, fields
+
+def finalize_store(store_dir, hashes, fields, source=None):
+    """
+    Flush the arrays of allocate_store() and mark the store complete.
+
+    Args:
+        store_dir (str): Directory of the store
+        hashes (numpy.memmap): The hash array returned by allocate_store()
+        fields (dict): The field arrays returned by allocate_store()
+        source (str): Optional path of the CSV the store belongs to
+    """
+    hashes.flush()
+    for array in fields.values():
+        array.flush()
+    columns = {name: {'file': f"{name}.npy", 'dtype': array.dtype.str} for name, array in fields.items()}
+    _write_meta(store_dir, len(hashes), columns, source)
+
+class HashStore:
+    """Read access to certificate hashes and record fields held in (memory-mapped) arrays."""
+
+    def __init__(self, hashes, fields=None):
+        """
+        Initialize the HashStore.
+
+        Args:
+            hashes (numpy.ndarray): N x 32 uint8 array of raw hashes
+            fields (dict): Optional column name -> array of N record values
+        """
+        self._hashes = hashes
+        self._fields = fields or {}
+
+    @staticmethod
+    def exists(store_dir=STORE_DIR):
+        """Return True if a store has been written to `store_dir`."""
+        return os.path.exists(os.path.join(store_dir, META_FILE))
+
+    @classmethod
+    def open(cls, store_dir=STORE_DIR):
+        """
+        Memory-map a store written by write_store().
+
+        Args:
+            store_dir (str): Directory of the store
+
+        Returns:
+            HashStore: The store; no record data is read until it is accessed
+        """
+        with open(os.path.join(store_dir, META_FILE)) as f:
+            meta = json.load(f)
+        hashes = np.load(os.path.join(store_dir, meta['hash_file']), mmap_mode='r')
+        fields = {
+            name: np.load(os.path.join(store_dir, column['file']), mmap_mode='r')
+            for name, column in meta['fields'].items()
+        }
+        return cls(hashes, fields)
+
+    @classmethod
+    def from_hex(cls, hex_values):
+        """Build an in-memory store from hex-encoded hashes (e.g. a CSV column)."""
+        return cls(hashes_from_hex(hex_values))
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @property
+    def field_names(self):
+        return list(self._fields)
+
+    def head(self, count):
+        """Return a store restricted to the first `count` records (views, no copy)."""
+        return HashStore(self._hashes[:count], {name: values[:count] for name, values in self._fields.items()})
+
+    def raw(self, start=0, stop=None):
+        """Return the hashes in [start, stop) as an N x 32 uint8 view into the store."""
+        return self._hashes[start:stop]
+
+    def hash_at(self, index):
+        """Return one hash as a 32-byte `bytes` value."""
+        return self._hashes[index].tobytes()
+
+    def hashes(self, start=0, stop=None):
+        """
+        Return the hashes in [start, stop) as `bytes32` values ready for contract calls.
+
+        Args:
+            start (int): First record
+            stop (int): End of the range (exclusive); the store length if None
+
+        Returns:
+            list: 32-byte `bytes` values
+        """
+        block = self._hashes[start:stop].tobytes()
+        return [block[i:i + HASH_SIZE] for i in range(0, len(block), HASH_SIZE)]
+
+    def field(self, name, start=0, stop=None):
+        """Return a record field in [start, stop) as a view into the store."""
+        return self._fields[name][start:stop]
+
+    def frame(self, start=0, stop=None):
+        """
+        Materialize records in [start, stop) as a DataFrame shaped like certificates_data.csv.
+
+        Returns:
+            pandas.DataFrame: The record fields plus a hex `certificate_hash` column
+        """
+        df = pd.DataFrame({name: np.asarray(values[start:stop]) for name, values in self._fields.items()})
+        df['certificate_hash'] = ['0x' + h.hex() for h in self.hashes(start, stop)]
+        return df
@@ -0,0 +1,234 @@
+"""
+Latency Recording with Log-Linear (HDR-Style) Histograms
+
+This module records latencies into fixed-size histograms whose buckets double in
+width while keeping a constant number of linear sub-buckets, as in HdrHistogram.
+Memory does not grow with the number of samples, any percentile is reported
+within the configured relative precision, and histograms with the same layout
+can be merged, so samples taken in several threads or processes add up to one
+distribution. LatencyRecorder keeps one histogram per named operation.
+"""
+
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+
+class LatencyHistogram:
+    """Log-linear histogram of durations, stored as integer microseconds."""
+
+    def __init__(self, highest_seconds=3600, significant_digits=2):
+        """
+        Initialize the LatencyHistogram.
+
+        Args:
+            highest_seconds (float): Largest trackable duration; longer samples are clamped to it
+            significant_digits (int): Decimal digits of precision kept for every value (1-5)
+        """
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.highest_seconds = highest_seconds
+        self.significant_digits = significant_digits
+        self.highest_value = max(int(highest_seconds * 1e6), 2)
+
+        # Each bucket holds `sub_bucket_count` linear slots; bucket k covers values up to sub_bucket_count << k.
+        self._sub_bucket_half_magnitude = math.ceil(math.log2(2 * 10 ** significant_digits)) - 1
+        self._sub_bucket_count = 1 << (self._sub_bucket_half_magnitude + 1)
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+        bucket_count = 1
+        while (self._sub_bucket_count << (bucket_count - 1)) <= self.highest_value:
+            bucket_count += 1
+        self.counts = [0] * ((bucket_count + 1) * self._sub_bucket_half_count)
+
+        self.total_count = 0
+        self.total_microseconds = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def _index(self, value):
+        bucket = max((value | self._sub_bucket_mask).bit_length() - (self._sub_bucket_half_magnitude + 1), 0)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self._sub_bucket_half_magnitude) + (sub_bucket - self._sub_bucket_half_count)
+
+    def _highest_equivalent_value(self, index):
+        bucket = (index >> self._sub_bucket_half_magnitude) - 1
+        sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket < 0:
+            bucket, sub_bucket = 0, sub_bucket - self._sub_bucket_half_count
+        # Every value in the slot rounds down to the same index; report the top of the slot.
+        return ((sub_bucket + 1) << bucket) - 1
+
+    def record(self, seconds, count=1):
+        """
+        Record a duration.
+
+        Args:
+            seconds (float): The duration in seconds
+            count (int): Number of identical samples to add
+        """
+        value = min(max(int(round(seconds * 1e6)), 0), self.highest_value)
+        self.counts[self._index(value)] += count
+        self.total_count += count
+        self.total_microseconds += value * count
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+        self.max_value = max(self.max_value, value)
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram with the same layout.
+
+        Args:
+            other (LatencyHistogram): Histogram created with the same parameters
+        """
+        if (other.highest_seconds, other.significant_digits) != (self.highest_seconds, self.significant_digits):
+            raise ValueError("Cannot merge histograms with different highest_seconds or significant_digits")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.total_microseconds += other.total_microseconds
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+    def percentile(self, percentile):
+        """
+        Return the duration at a percentile, in seconds (0 for an empty histogram).
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+        """
+        if self.total_count == 0:
+            return 0.0
+        target = max(math.ceil(percentile / 100 * self.total_count), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent_value(index), self.max_value) / 1e6
+        return self.max_value / 1e6
+
+    def mean(self):
+        """Return the mean duration in seconds (0 for an empty histogram)."""
+        return self.total_microseconds / self.total_count / 1e6 if self.total_count else 0.0
+
+    def max(self):
+        """Return the largest recorded duration in seconds."""
+        return self.max_value / 1e6
+
+    def to_dict(self):
+        """Serialize the histogram to a JSON-compatible dict with sparse counts."""
+        return {
+            'highest_seconds': self.highest_seconds,
+            'significant_digits': self.significant_digits,
+            'counts': {str(i): c for i, c in enumerate(self.counts) if c},
+            'total_count': self.total_count,
+            'total_microseconds': self.total_microseconds,
+            'min_value': self.min_value,
+            'max_value': self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a histogram serialized with to_dict()."""
+        histogram = cls(data['highest_seconds'], data['significant_digits'])
+        for index, count in data['counts'].items():
+            histogram.counts[int(index)] = count
+        histogram.total_count = data['total_count']
+        histogram.total_microseconds = data['total_microseconds']
+        histogram.min_value = data['min_value']
+        histogram.max_value = data['max_value']
+        return histogram
+
+class LatencyRecorder:
+    """Thread-safe collection of latency histograms, one per operation."""
+
+    def __init__(self, highest_seconds=3600, significant_digits=2):
+        """
+        Initialize the LatencyRecorder.
+
+        Args:
+            highest_seconds (float): Largest trackable duration of every histogram
+            significant_digits (int): Precision of every histogram
+        """
+        self.highest_seconds = highest_seconds
+        self.significant_digits = significant_digits
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, operation):
+        """Return the histogram of an operation, creating it on first use."""
+        with self._lock:
+            if operation not in self.histograms:
+                self.histograms[operation] = LatencyHistogram(self.highest_seconds, self.significant_digits)
+            return self.histograms[operation]
+
+    def record(self, operation, seconds, count=1):
+        """Record a duration for an operation."""
+        histogram = self.histogram(operation)
+        with self._lock:
+            histogram.record(seconds, count)
+
+    @contextmanager
+    def time(self, operation):
+        """Context manager that records the wall-clock duration of its body."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(operation, time.perf_counter() - start_time)
+
+    def merge(self, other):
+        """Add all histograms of another recorder (e.g. from a worker thread or process)."""
+        for operation, histogram in other.histograms.items():
+            target = self.histogram(operation)
+            with self._lock:
+                target.merge(histogram)
+
+    def summary(self, **labels):
+        """
+        Summarize every operation.
+
+        Args:
+            **labels: Extra columns added to every row (e.g. total_records=10000)
+
+        Returns:
+            list: One dict per operation with count, mean, p50/p90/p99/p99.9 and max in seconds
+        """
+        rows = []
+        with self._lock:
+            for operation, histogram in self.histograms.items():
+                row = dict(labels)
+                row['operation'] = operation
+                row['count'] = histogram.total_count
+                row['mean_latency_seconds'] = histogram.mean()
+                for percentile in SUMMARY_PERCENTILES:
+                    row[f"p{percentile:g}_latency_seconds".replace('.', '_')] = histogram.percentile(percentile)
+                row['max_latency_seconds'] = histogram.max()
+                rows.append(row)
+        return rows
+
+    def to_csv(self, path, **labels):
+        """Write summary() to a CSV file."""
+        pd.DataFrame(self.summary(**labels)).to_csv(path, index=False)
+
+    def to_dict(self):
+        """Serialize all histograms to a JSON-compatible dict."""
+        with self._lock:
+            return {operation: histogram.to_dict() for operation, histogram in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a recorder serialized with to_dict()."""
+        recorder = cls()
+        for operation, histogram_data in data.items():
+            histogram = LatencyHistogram.from_dict(histogram_data)
+            recorder.highest_seconds = histogram.highest_seconds
+            recorder.significant_digits = histogram.significant_digits
+            recorder.histograms[operation] = histogram
+        return recorder
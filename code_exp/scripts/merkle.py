@@ -0,0 +1,105 @@
+"""
+Merkle Batch Anchoring
+
+A graduation batch can be committed on-chain as a single Merkle root
+(Certificate.anchorBatch) instead of one storage record per certificate.
+MerkleTree builds the tree the contract verifies against, following
+OpenZeppelin's MerkleProof conventions:
+
+- the leaf of a certificate is keccak256(certificate hash); hashing the
+  32-byte value once more keeps leaves distinct from the 64-byte preimages of
+  inner nodes, so an inner node can never be presented as a certificate;
+- pairs are hashed in sorted order (keccak256(min || max)), so a proof is just
+  the list of sibling hashes, with no left/right flags;
+- an unpaired node at the end of a level is promoted unchanged.
+
+Each certificate holder keeps its proof, ceil(log2(batch size)) hashes of 32
+bytes; encode_proof() packs one into that many bytes for storage or transfer.
+"""
+
+from eth_hash.auto import keccak
+
+HASH_SIZE = 32
+
+def leaf_hash(cert_hash):
+    """Return the Merkle leaf of a certificate hash."""
+    return keccak(bytes(cert_hash))
+
+def hash_pair(a, b):
+    """Hash two nodes in sorted order, as OpenZeppelin's Hashes.commutativeKeccak256 does."""
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+def process_proof(proof, cert_hash):
+    """Return the root reached from a certificate hash and its proof."""
+    node = leaf_hash(cert_hash)
+    for sibling in proof:
+        node = hash_pair(node, bytes(sibling))
+    return node
+
+def verify_proof(proof, root, cert_hash):
+    """True if `proof` links `cert_hash` to `root`; the check MerkleProof.verify performs on-chain."""
+    return process_proof(proof, cert_hash) == bytes(root)
+
+def encode_proof(proof):
+    """Pack a proof into len(proof) * 32 bytes."""
+    return b''.join(bytes(sibling) for sibling in proof)
+
+def decode_proof(data):
+    """Unpack a proof packed by encode_proof()."""
+    if len(data) % HASH_SIZE:
+        raise ValueError(f"A packed proof is a multiple of {HASH_SIZE} bytes, got {len(data)}")
+    return [data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)]
+
+class MerkleTree:
+    """Merkle tree over a batch of certificate hashes, with sorted-pair hashing."""
+
+    def __init__(self, cert_hashes):
+        """
+        Build the tree.
+
+        Args:
+            cert_hashes (list): 32-byte certificate hashes of the batch; they must be unique
+        """
+        if not cert_hashes:
+            raise ValueError("A Merkle batch needs at least one certificate")
+        self._index = {bytes(cert_hash): i for i, cert_hash in enumerate(cert_hashes)}
+        if len(self._index) != len(cert_hashes):
+            raise ValueError("Certificate hashes in a Merkle batch must be unique")
+
+        level = [leaf_hash(cert_hash) for cert_hash in cert_hashes]
+        self.levels = [level]
+        while len(level) > 1:
+            parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            level = parents
+            self.levels.append(level)
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def __contains__(self, cert_hash):
+        return bytes(cert_hash) in self._index
+
+    def proof(self, cert_hash):
+        """
+        Return the proof of a certificate in the batch.
+
+        Returns:
+            list: Sibling hashes from the leaf up to the root, as 32-byte `bytes`
+        """
+        try:
+            index = self._index[bytes(cert_hash)]
+        except KeyError:
+            raise KeyError(f"Certificate 0x{bytes(cert_hash).hex()} is not in this batch") from None
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling])
+            index //= 2
+        return proof
@@ -0,0 +1,170 @@
+"""
+Hardhat Mining-Mode Control
+
+Under Hardhat's default automine every transaction gets its own block, so
+measurements say nothing about blocks that pack many transactions. This
+module switches a node between three modes:
+
+    automine  one block per transaction (evm_setAutomine true)
+    interval  a block every `interval_ms` milliseconds (evm_setIntervalMining)
+    manual    automine off; a miner thread calls evm_mine once `batch_size`
+              transactions are pending, or once the oldest has waited `max_wait`
+              seconds so a partial batch is not stranded
+
+block_stats() summarizes how many transactions each block of a run carried.
+"""
+
+import time
+import logging
+import threading
+
+MINING_MODES = ('automine', 'interval', 'manual')
+DEFAULT_INTERVAL_MS = 1000
+DEFAULT_MANUAL_BATCH_SIZE = 50
+DEFAULT_MANUAL_MAX_WAIT = 1.0
+
+def mode_label(mode, interval_ms=DEFAULT_INTERVAL_MS, batch_size=DEFAULT_MANUAL_BATCH_SIZE, **_):
+    """Return a short label for a mining configuration, e.g. 'interval-1000ms' or 'manual-50'."""
+    if mode == 'interval':
+        return f"interval-{interval_ms}ms"
+    if mode == 'manual':
+        return f"manual-{batch_size}"
+    return mode
+
+class ManualMiner:
+    """Mines a block whenever enough transactions are pending, in a background thread."""
+
+    def __init__(self, rpc, batch_size=DEFAULT_MANUAL_BATCH_SIZE, max_wait=DEFAULT_MANUAL_MAX_WAIT, poll_interval=0.01):
+        """
+        Initialize the ManualMiner.
+
+        Args:
+            rpc (BatchRpcClient): Client of the node
+            batch_size (int): Pending transactions that trigger a block
+            max_wait (float): Seconds a pending transaction may wait before a block is mined anyway
+            poll_interval (float): Seconds between pending-pool checks
+        """
+        self.rpc = rpc
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.blocks_mined = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def pending_count(self):
+        return int(self.rpc.request('eth_getBlockTransactionCountByNumber', ['pending']), 16)
+
+    def mine(self):
+        self.rpc.request('evm_mine', [])
+        self.blocks_mined += 1
+
+    def _run(self):
+        waiting_since = None
+        while not self._stop_event.is_set():
+            try:
+                pending = self.pending_count()
+                if pending == 0:
+                    waiting_since = None
+                else:
+                    waiting_since = waiting_since or time.monotonic()
+                    if pending >= self.batch_size or time.monotonic() - waiting_since >= self.max_wait:
+                        self.mine()
+                        waiting_since = None
+                        continue
+            except Exception as e:
+                logging.warning(f"Manual miner poll failed: {e}")
+            self._stop_event.wait(self.poll_interval)
+
+class MiningController:
+    """Switches one node between automine, interval and manual batch mining."""
+
+    def __init__(self, rpc):
+        """
+        Initialize the MiningController.
+
+        Args:
+            rpc (BatchRpcClient): Client of the node
+        """
+        self.rpc = rpc
+        self.mode = 'automine'
+        self.label = 'automine'
+        self.miner = None
+
+    def set_mode(self, mode, interval_ms=DEFAULT_INTERVAL_MS, batch_size=DEFAULT_MANUAL_BATCH_SIZE,
+                 max_wait=DEFAULT_MANUAL_MAX_WAIT):
+        """
+        Switch the node's mining mode.
+
+        Args:
+            mode (str): 'automine', 'interval' or 'manual'
+            interval_ms (int): Block interval of the 'interval' mode
+            batch_size (int): Pending transactions per block in the 'manual' mode
+            max_wait (float): Longest wait for a partial batch in the 'manual' mode
+
+        Returns:
+            str: The label of the new mode (see mode_label())
+        """
+        if mode not in MINING_MODES:
+            raise ValueError(f"Unknown mining mode '{mode}'; expected one of {MINING_MODES}")
+        if self.miner is not None:
+            self.miner.stop()
+            self.miner = None
+
+        if mode == 'automine':
+            self.rpc.execute([('evm_setIntervalMining', [0]), ('evm_setAutomine', [True])])
+            # Transactions left in the pool by the previous mode are not mined by automine
+            if int(self.rpc.request('eth_getBlockTransactionCountByNumber', ['pending']), 16):
+                self.rpc.request('evm_mine', [])
+        elif mode == 'interval':
+            self.rpc.execute([('evm_setAutomine', [False]), ('evm_setIntervalMining', [interval_ms])])
+        else:
+            self.rpc.execute([('evm_setAutomine', [False]), ('evm_setIntervalMining', [0])])
+            self.miner = ManualMiner(self.rpc, batch_size=batch_size, max_wait=max_wait)
+            self.miner.start()
+
+        self.mode = mode
+        self.label = mode_label(mode, interval_ms=interval_ms, batch_size=batch_size)
+        logging.info(f"Mining mode set to {self.label}")
+        return self.label
+
+    def head(self):
+        """Return the current block number."""
+        return int(self.rpc.request('eth_blockNumber', []), 16)
+
+    def block_stats(self, first_block, last_block):
+        """
+        Summarize the transactions per block in [first_block, last_block].
+
+        Empty blocks (e.g. interval blocks with nothing pending) are counted as blocks
+        but excluded from the per-block averages.
+
+        Returns:
+            dict: blocks, non_empty_blocks, transactions, mean_tx_per_block and max_tx_per_block
+        """
+        if last_block < first_block:
+            counts = []
+        else:
+            replies = self.rpc.execute([
+                ('eth_getBlockTransactionCountByNumber', [hex(n)]) for n in range(first_block, last_block + 1)
+            ])
+            counts = [int(r, 16) for r in replies]
+        non_empty = [c for c in counts if c]
+        return {
+            'blocks': len(counts),
+            'non_empty_blocks': len(non_empty),
+            'transactions': sum(counts),
+            'mean_tx_per_block': sum(non_empty) / len(non_empty) if non_empty else 0,
+            'max_tx_per_block': max(non_empty, default=0),
+        }
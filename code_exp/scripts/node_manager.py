@@ -15,6 +15,9 @@ import json
 import requests
 from web3 import Web3
 
+from rpc_batch import BatchRpcClient
+from mining_modes import MiningController
+
 class NodeManager:
     """Manages multiple Hardhat nodes for fault tolerance testing."""
     
@@ -30,6 +33,7 @@ class NodeManager:
         self.node_count = node_count
         self.nodes = {}  # Dictionary to store node processes
         self.node_urls = {}  # Dictionary to store node URLs
+        self.mining = {}  # Dictionary to store each node's MiningController
         self.log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'log')
         os.makedirs(self.log_dir, exist_ok=True)
         
@@ -105,6 +109,11 @@ class NodeManager:
             
         logging.info(f"Stopping node {node_id}...")
         
+        # A restarted node starts in automine; stop any manual miner polling this one
+        controller = self.mining.pop(node_id, None)
+        if controller is not None and controller.miner is not None:
+            controller.miner.stop()
+        
         try:
             # Send SIGTERM to the process
             self.nodes[node_id].terminate()
@@ -207,6 +216,22 @@ class NodeManager:
         """
         return self.node_urls.get(node_id)
     
+    def set_mining_mode(self, node_id, mode, **kwargs):
+        """
+        Switch a node between automine, interval and manual batch mining.
+        
+        Args:
+            node_id (int): The ID of the node
+            mode (str): 'automine', 'interval' or 'manual'
+            **kwargs: interval_ms, batch_size or max_wait, see MiningController.set_mode
+            
+        Returns:
+            str: The label of the new mode
+        """
+        if node_id not in self.mining:
+            self.mining[node_id] = MiningController(BatchRpcClient(self.node_urls[node_id]))
+        return self.mining[node_id].set_mode(mode, **kwargs)
+    
     def _is_port_in_use(self, port):
         """
         Check if a port is in use.
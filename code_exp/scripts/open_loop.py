@@ -0,0 +1,164 @@
+"""
+Open-Loop Load Generator for the Throughput Experiment
+
+Closed-loop virtual users wait for their receipt before sending again, so the
+offered load falls as soon as latency rises and slow periods go unmeasured
+(coordinated omission). This module instead sends issueCertificate transactions
+on a fixed arrival schedule, constant or Poisson, regardless of how many are
+still outstanding. Each request keeps its intended send time, so latency can be
+measured both from the actual send and from the time it should have been sent.
+"""
+
+import time
+import random
+import asyncio
+import logging
+
+from latency_recorder import LatencyHistogram
+
+ARRIVAL_PROCESSES = ('constant', 'poisson')
+
+def arrival_offsets(rate, duration, process='poisson', seed=None):
+    """
+    Build the intended send times of an arrival schedule.
+
+    Args:
+        rate (float): Target arrival rate in transactions per second
+        duration (float): Length of the schedule in seconds
+        process (str): 'constant' for evenly spaced arrivals, 'poisson' for exponential gaps
+        seed (int): Optional seed for the Poisson gaps
+
+    Returns:
+        list: Offsets in seconds from the start of the run
+    """
+    if process not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Unknown arrival process '{process}', expected one of {ARRIVAL_PROCESSES}")
+    if rate <= 0:
+        return []
+    if process == 'constant':
+        return [i / rate for i in range(int(rate * duration))]
+    rng = random.Random(seed)
+    offsets = []
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        offsets.append(offset)
+        offset += rng.expovariate(rate)
+    return offsets
+
+class OpenLoopStats:
+    """Counters and latency histograms of one open-loop run."""
+
+    def __init__(self, offered_rate, process):
+        self.offered_rate = offered_rate
+        self.process = process
+        self.sent_tx = 0
+        self.successful_tx = 0
+        self.total_send_lag = 0.0
+        self.service_latency = LatencyHistogram()
+        self.corrected_latency = LatencyHistogram()
+        self.duration = 0.0
+
+    def record(self, intended, sent, completed, success):
+        self.sent_tx += 1
+        self.total_send_lag += sent - intended
+        if success:
+            self.successful_tx += 1
+            self.service_latency.record(completed - sent)
+            self.corrected_latency.record(completed - intended)
+
+    def summary(self):
+        """
+        Summarize the run as one row of the latency-versus-load table.
+
+        `service` latency runs from the actual send to the receipt; `corrected`
+        latency runs from the intended send time, so it also charges the time a
+        request spent waiting behind a stalled generator.
+
+        Returns:
+            dict: Offered and achieved rates with service and corrected latency percentiles
+        """
+        return {
+            'offered_rate': self.offered_rate,
+            'arrival_process': self.process,
+            'sent_tx': self.sent_tx,
+            'successful_tx': self.successful_tx,
+            'failed_tx': self.sent_tx - self.successful_tx,
+            'achieved_tps': self.successful_tx / self.duration if self.duration > 0 else 0,
+            'mean_send_lag_seconds': self.total_send_lag / self.sent_tx if self.sent_tx else 0,
+            'p50_service_latency_seconds': self.service_latency.percentile(50),
+            'p99_service_latency_seconds': self.service_latency.percentile(99),
+            'p50_corrected_latency_seconds': self.corrected_latency.percentile(50),
+            'p90_corrected_latency_seconds': self.corrected_latency.percentile(90),
+            'p99_corrected_latency_seconds': self.corrected_latency.percentile(99),
+            'p99_9_corrected_latency_seconds': self.corrected_latency.percentile(99.9),
+            'max_corrected_latency_seconds': self.corrected_latency.max(),
+        }
+
+class OpenLoopGenerator:
+    """Sends transactions through an AsyncLoadEngine on a fixed arrival schedule."""
+
+    def __init__(self, engine, process='poisson', seed=None):
+        """
+        Initialize the OpenLoopGenerator.
+
+        Args:
+            engine (AsyncLoadEngine): Provides the connection pool, senders and nonce streams
+            process (str): 'constant' or 'poisson' arrivals
+            seed (int): Optional seed for the Poisson schedule
+        """
+        self.engine = engine
+        self.process = process
+        self.seed = seed
+
+    async def _request(self, intended, sender, cert_hash, stats):
+        sent = time.monotonic()
+        try:
+            receipt = await self.engine.send_and_confirm(cert_hash, sender)
+            success = receipt.status == 1
+        except Exception:
+            # Failures are counted; under overload timeouts are expected.
+            success = False
+        stats.record(intended, sent, time.monotonic(), success)
+
+    async def run_rate(self, rate, duration, next_hash):
+        """
+        Offer `rate` transactions per second for `duration` seconds.
+
+        Requests are started at their scheduled time whether or not earlier ones
+        have completed; the run ends once all of them have a receipt or timed out.
+
+        Args:
+            rate (float): Target arrival rate in transactions per second
+            duration (float): Length of the arrival schedule in seconds
+            next_hash (callable): Returns a fresh, unique bytes32 certificate hash
+
+        Returns:
+            OpenLoopStats: Counters and latency histograms, with `duration` set
+        """
+        offsets = arrival_offsets(rate, duration, self.process, self.seed)
+        senders = self.engine.senders
+        await self.engine.start()
+        try:
+            await self.engine.prepare(next_hash)
+            stats = OpenLoopStats(rate, self.process)
+            tasks = []
+            start_time = time.monotonic()
+            for i, offset in enumerate(offsets):
+                intended = start_time + offset
+                delay = intended - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(
+                    self._request(intended, senders[i % len(senders)], next_hash(), stats)
+                ))
+            await asyncio.gather(*tasks)
+            stats.duration = max(time.monotonic() - start_time, duration)
+        finally:
+            await self.engine.close()
+
+        summary = stats.summary()
+        logging.info(
+            f"Offered {rate} tx/s ({self.process}): achieved {summary['achieved_tps']:.2f} TPS, "
+            f"p99 corrected latency {summary['p99_corrected_latency_seconds']:.3f}s"
+        )
+        return stats
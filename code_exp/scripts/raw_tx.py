@@ -0,0 +1,215 @@
+"""
+Raw Signed-Transaction Fast Path for the Certificate Contract
+
+This module bypasses web3's contract machinery for the hot Certificate calls.
+Calldata is built from fixed selector + bytes32 templates, transactions are signed
+locally with the deployer key and sent with eth_sendRawTransaction. The chain id
+and per-function gas limits are looked up once and cached. Fee parameters are
+cached too, but reloaded once the chain has moved FEE_REFRESH_BLOCKS blocks on
+(checked every FEE_CHECK_INTERVAL sends) and whenever the node rejects a
+transaction as underpriced, so a rising base fee cannot strand the sender.
+"""
+
+import logging
+
+from eth_abi import decode
+from eth_account import Account
+from web3 import Web3
+
+from tx_pipeline import NonceManager
+
+FEE_REFRESH_BLOCKS = 10  # Blocks after which the cached fee parameters are reloaded
+FEE_CHECK_INTERVAL = 50  # Sends between checks of the block number (one eth_blockNumber call each)
+UNDERPRICED_MARKERS = ('underpriced', 'too low', 'fee cap')  # Node errors that ask for higher fees
+
+class CalldataTemplate:
+    """Fixed selector + single bytes32 argument calldata for a contract function."""
+
+    def __init__(self, signature):
+        """
+        Initialize the CalldataTemplate.
+
+        Args:
+            signature (str): The canonical function signature, e.g. 'issueCertificate(bytes32)'
+        """
+        self.signature = signature
+        self.selector = bytes(Web3.keccak(text=signature)[:4])
+
+    def encode(self, arg):
+        """
+        Build the calldata for one call.
+
+        Args:
+            arg (bytes): The 32-byte argument
+
+        Returns:
+            bytes: selector || arg
+        """
+        if len(arg) != 32:
+            raise ValueError(f"{self.signature} expects a 32-byte argument, got {len(arg)} bytes")
+        return self.selector + bytes(arg)
+
+CERTIFICATE_TEMPLATES = {
+    'issueCertificate': CalldataTemplate('issueCertificate(bytes32)'),
+    'revokeCertificate': CalldataTemplate('revokeCertificate(bytes32)'),
+    'getCertificateStatus': CalldataTemplate('getCertificateStatus(bytes32)'),
+}
+CERTIFICATE_STATUS_TYPES = ['uint8', 'address', 'uint256']
+
+BASELINE_REVOCATION_TEMPLATES = {
+    'revoke': CalldataTemplate('revoke(bytes32)'),
+    'isRevoked': CalldataTemplate('isRevoked(bytes32)'),
+}
+
+class RawTransactionSender:
+    """Signs Certificate transactions locally and sends them as raw transactions."""
+
+    def __init__(self, w3, private_key, contract_address, nonce_manager=None, gas_margin=1.2,
+                 fee_refresh_blocks=FEE_REFRESH_BLOCKS, fee_check_interval=FEE_CHECK_INTERVAL):
+        """
+        Initialize the RawTransactionSender.
+
+        Args:
+            w3 (Web3): The Web3 instance used to reach the node
+            private_key (str): Key of the sending account (the deployer key from .env)
+            contract_address (str): Address of the deployed Certificate contract
+            nonce_manager (NonceManager): Shared nonce source; a new one is created if None
+            gas_margin (float): Multiplier applied to the cached gas estimates
+            fee_refresh_blocks (int): Blocks after which the fee parameters are reloaded
+            fee_check_interval (int): Sends between checks of the block number
+        """
+        self.w3 = w3
+        self.account = Account.from_key(private_key)
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.nonce_manager = nonce_manager or NonceManager(w3, self.account.address)
+        self.gas_margin = gas_margin
+        self.fee_refresh_blocks = fee_refresh_blocks
+        self.fee_check_interval = fee_check_interval
+        self._gas_limits = {}
+        self.chain_id = None
+        self._fee_fields = None
+        self._fee_block = None
+        self._sends_since_check = 0
+        self.fee_refreshes = 0
+        self.refresh_chain_params()
+
+    def refresh_chain_params(self):
+        """Reload the chain id and fee parameters from the node."""
+        self.chain_id = self.w3.eth.chain_id
+        self.refresh_fees()
+        logging.info(f"Raw sender chain parameters: chainId={self.chain_id}, fees={self._fee_fields}")
+
+    def refresh_fees(self):
+        """Reload the fee parameters from the latest block."""
+        latest = self.w3.eth.get_block('latest')
+        self._fee_block = latest.number
+        self._sends_since_check = 0
+        self.fee_refreshes += 1
+        base_fee = latest.get('baseFeePerGas')
+        if base_fee is None:
+            self._fee_fields = {'gasPrice': self.w3.eth.gas_price}
+        else:
+            priority_fee = self.w3.eth.max_priority_fee
+            # Twice the current base fee leaves room for several full blocks of fee increases.
+            self._fee_fields = {
+                'maxFeePerGas': 2 * base_fee + priority_fee,
+                'maxPriorityFeePerGas': priority_fee,
+            }
+
+    def _maybe_refresh_fees(self):
+        """Reload the fees if the chain moved at least fee_refresh_blocks blocks since they were fetched."""
+        self._sends_since_check += 1
+        if self._sends_since_check < self.fee_check_interval:
+            return
+        self._sends_since_check = 0
+        if self.w3.eth.block_number - self._fee_block >= self.fee_refresh_blocks:
+            self.refresh_fees()
+
+    def gas_limit(self, function_name, arg):
+        """
+        Return the cached gas limit for a function, estimating it on first use.
+
+        Args:
+            function_name (str): One of the keys of CERTIFICATE_TEMPLATES
+            arg (bytes): A representative 32-byte argument for the estimate
+
+        Returns:
+            int: The gas limit to use
+        """
+        if function_name not in self._gas_limits:
+            estimate = self.w3.eth.estimate_gas({
+                'from': self.account.address,
+                'to': self.contract_address,
+                'data': CERTIFICATE_TEMPLATES[function_name].encode(arg),
+            })
+            self._gas_limits[function_name] = int(estimate * self.gas_margin)
+        return self._gas_limits[function_name]
+
+    def build_transaction(self, function_name, arg, nonce):
+        """Build the unsigned transaction dict for one templated call."""
+        tx = {
+            'chainId': self.chain_id,
+            'nonce': nonce,
+            'to': self.contract_address,
+            'value': 0,
+            'data': CERTIFICATE_TEMPLATES[function_name].encode(arg),
+            'gas': self.gas_limit(function_name, arg),
+        }
+        tx.update(self._fee_fields)
+        return tx
+
+    def send(self, function_name, arg):
+        """
+        Sign and send a state-changing templated call.
+
+        Args:
+            function_name (str): 'issueCertificate' or 'revokeCertificate'
+            arg (bytes): The 32-byte certificate hash
+
+        Returns:
+            HexBytes: The transaction hash
+        """
+        self._maybe_refresh_fees()
+        nonce = self.nonce_manager.allocate()
+        try:
+            try:
+                return self._send_signed(function_name, arg, nonce)
+            except Exception as e:
+                if not any(marker in str(e).lower() for marker in UNDERPRICED_MARKERS):
+                    raise
+                # The base fee outgrew the cached fee cap: reload it and send again with the same nonce
+                logging.warning(f"Raw transaction rejected as underpriced, refreshing fees: {e}")
+                self.refresh_fees()
+                return self._send_signed(function_name, arg, nonce)
+        except Exception:
+            self.nonce_manager.release(nonce)
+            raise
+
+    def _send_signed(self, function_name, arg, nonce):
+        signed = self.account.sign_transaction(self.build_transaction(function_name, arg, nonce))
+        return self.w3.eth.send_raw_transaction(signed.rawTransaction)
+
+    def issue(self, cert_hash):
+        """Issue a certificate through the fast path."""
+        return self.send('issueCertificate', cert_hash)
+
+    def revoke(self, cert_hash):
+        """Revoke a certificate through the fast path."""
+        return self.send('revokeCertificate', cert_hash)
+
+    def get_status(self, cert_hash):
+        """
+        Query a certificate with a templated eth_call.
+
+        Args:
+            cert_hash (bytes): The 32-byte certificate hash
+
+        Returns:
+            tuple: (status, issuing institution, timestamp)
+        """
+        data = self.w3.eth.call({
+            'to': self.contract_address,
+            'data': CERTIFICATE_TEMPLATES['getCertificateStatus'].encode(cert_hash),
+        })
+        status, institution, timestamp = decode(CERTIFICATE_STATUS_TYPES, data)
+        return status, Web3.to_checksum_address(institution), timestamp
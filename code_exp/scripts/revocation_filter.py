@@ -0,0 +1,182 @@
+"""
+Off-Chain Revocation Filter
+
+A Bloom filter over the revoked certificate hashes, built from the contract's
+CertificateRevoked events and extended incrementally as new blocks arrive.
+It answers "definitely not revoked" locally; only a positive, which is either
+a revocation or a false positive at the configured rate, needs an on-chain
+check. The filter serializes to a small file (a fixed header followed by the
+bit array) that verifiers download once and load.
+
+Bloom filters never give false negatives, but they only grow: the filter must
+be rebuilt if the chain it was built from is reverted, or revocations mined
+at the reused block numbers would be missed.
+"""
+
+import math
+import struct
+import hashlib
+import logging
+
+from web3 import Web3
+
+from event_indexer import REVOKED_TOPIC
+
+MAGIC = b'RVBF'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('>4sBQIQQqd')  # magic, version, bits, hash count, capacity, items, through block, fp rate
+DEFAULT_FP_RATE = 0.01
+LOG_RANGE = 10_000  # Blocks per eth_getLogs request while syncing
+
+def optimal_parameters(capacity, fp_rate):
+    """Return (bits, hash count) of a Bloom filter holding `capacity` items at false-positive rate `fp_rate`."""
+    bits = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+class RevocationFilter:
+    """Bloom filter of revoked certificate hashes that can be synced from events and saved to a file."""
+
+    def __init__(self, capacity, fp_rate=DEFAULT_FP_RATE):
+        """
+        Initialize an empty RevocationFilter.
+
+        Args:
+            capacity (int): Number of revocations the filter is sized for
+            fp_rate (float): False-positive rate at full capacity
+        """
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.bits, self.hash_count = optimal_parameters(capacity, fp_rate)
+        self._array = bytearray((self.bits + 7) // 8)
+        self.items = 0
+        self.through_block = -1  # Last block whose revocations are included
+
+    def _positions(self, cert_hash):
+        digest = hashlib.blake2b(bytes(cert_hash), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hash_count)]
+
+    def add(self, cert_hash):
+        for position in self._positions(cert_hash):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+        if self.items == self.capacity + 1:
+            logging.warning(f"Revocation filter holds more than its capacity of {self.capacity}; false positives will exceed {self.fp_rate}")
+
+    def update(self, cert_hashes):
+        for cert_hash in cert_hashes:
+            self.add(cert_hash)
+
+    def __contains__(self, cert_hash):
+        """True if the hash may be revoked; False means it is definitely not revoked."""
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(cert_hash))
+
+    def expected_fp_rate(self):
+        """Return the false-positive rate expected at the current number of items."""
+        return (1 - math.exp(-self.hash_count * self.items / self.bits)) ** self.hash_count
+
+    def sync(self, rpc, contract_address, to_block=None, topic=REVOKED_TOPIC):
+        """
+        Add the revocations mined after `through_block` from the contract's events.
+
+        Args:
+            rpc (BatchRpcClient): Client of the node
+            contract_address (str): Contract emitting the revocation events
+            to_block (int): Last block to include; the head if None
+            topic (str): Event signature topic; the certificate hash must be the first indexed argument
+
+        Returns:
+            int: Number of revocations added
+        """
+        address = Web3.to_checksum_address(contract_address)
+        head = int(rpc.request('eth_blockNumber', []), 16)
+        to_block = head if to_block is None else min(to_block, head)
+        added = 0
+        while self.through_block < to_block:
+            first = self.through_block + 1
+            last = min(first + LOG_RANGE - 1, to_block)
+            logs = rpc.request('eth_getLogs', [{
+                'address': [address], 'fromBlock': hex(first), 'toBlock': hex(last), 'topics': [topic],
+            }])
+            for log in logs:
+                self.add(bytes.fromhex(log['topics'][1][2:]))
+            added += len(logs)
+            self.through_block = last
+        return added
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.bits, self.hash_count, self.capacity,
+                             self.items, self.through_block, self.fp_rate)
+        return header + bytes(self._array)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, bits, hash_count, capacity, items, through_block, fp_rate = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a revocation filter file (or an unsupported version)")
+        revocation_filter = cls(capacity, fp_rate)
+        if (revocation_filter.bits, revocation_filter.hash_count) != (bits, hash_count):
+            raise ValueError("Revocation filter parameters do not match its capacity and false-positive rate")
+        revocation_filter._array = bytearray(data[HEADER.size:])
+        revocation_filter.items = items
+        revocation_filter.through_block = through_block
+        return revocation_filter
+
+    def save(self, path):
+        """Write the filter to a file and return its size in bytes."""
+        data = self.to_bytes()
+        with open(path, 'wb') as f:
+            f.write(data)
+        return len(data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+class FilteredVerifier:
+    """Answers revocation checks from a RevocationFilter and goes on-chain only for filter positives."""
+
+    def __init__(self, revocation_filter, check_on_chain):
+        """
+        Initialize the FilteredVerifier.
+
+        Args:
+            revocation_filter (RevocationFilter): Filter of the revoked hashes
+            check_on_chain (callable): Called with a list of hashes; returns whether each is revoked
+        """
+        self.filter = revocation_filter
+        self.check_on_chain = check_on_chain
+        self.queries = 0
+        self.chain_checks = 0
+        self.false_positives = 0
+
+    def is_revoked_many(self, cert_hashes):
+        """
+        Return whether each hash is revoked, checking only the filter positives on-chain.
+
+        Returns:
+            list: Booleans in the order of `cert_hashes`
+        """
+        results = [False] * len(cert_hashes)
+        positives = [i for i, cert_hash in enumerate(cert_hashes) if cert_hash in self.filter]
+        if positives:
+            for i, revoked in zip(positives, self.check_on_chain([cert_hashes[i] for i in positives])):
+                results[i] = revoked
+                self.false_positives += not revoked
+        self.queries += len(cert_hashes)
+        self.chain_checks += len(positives)
+        return results
+
+    def is_revoked(self, cert_hash):
+        return self.is_revoked_many([cert_hash])[0]
+
+    def stats(self):
+        """Return query, on-chain check and false-positive counters as a dict."""
+        return {
+            'queries': self.queries,
+            'chain_checks': self.chain_checks,
+            'false_positives': self.false_positives,
+            'chain_check_rate': self.chain_checks / self.queries if self.queries else 0.0,
+        }
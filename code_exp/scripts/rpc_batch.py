@@ -0,0 +1,180 @@
+"""
+JSON-RPC Batch Client for Read-Heavy Loops
+
+This module packs many eth_call / eth_estimateGas requests into single JSON-RPC
+batch POSTs. The batch size is tuned automatically from the observed per-item
+throughput, and request/response byte counts are tracked for reporting.
+"""
+
+import json
+import time
+import logging
+
+import requests
+
+class RpcBatchError(Exception):
+    """Raised when one or more requests inside a batch returned a JSON-RPC error."""
+
+class BatchSizeTuner:
+    """Hill-climbs the batch size on observed items/second and backs off on failures."""
+
+    def __init__(self, initial=64, minimum=1, maximum=4096, tolerance=0.05):
+        """
+        Initialize the BatchSizeTuner.
+
+        Args:
+            initial (int): Starting batch size
+            minimum (int): Smallest batch size the tuner will fall back to
+            maximum (int): Largest batch size the tuner will try
+            tolerance (float): Relative throughput drop that ends the growth phase
+        """
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self._growing = True
+        self._best_rate = 0.0
+        self._best_size = initial
+
+    def record(self, item_count, elapsed):
+        """
+        Record the outcome of a successful batch.
+
+        Args:
+            item_count (int): Number of requests in the batch
+            elapsed (float): Wall-clock seconds the batch took
+        """
+        if item_count < self.size or elapsed <= 0:
+            return  # Partial (final) batches say little about the chosen size
+        rate = item_count / elapsed
+        if rate > self._best_rate:
+            self._best_rate = rate
+            self._best_size = self.size
+        if self._growing:
+            if rate >= self._best_rate * (1 - self.tolerance) and self.size < self.maximum:
+                self.size = min(self.size * 2, self.maximum)
+            else:
+                self._growing = False
+                self.size = self._best_size
+                logging.info(f"JSON-RPC batch size settled at {self.size} ({self._best_rate:.0f} requests/s)")
+
+    def failed(self):
+        """Shrink the batch size after a failed or timed-out batch."""
+        self._growing = False
+        self.size = max(self.size // 2, self.minimum)
+        self._best_size = min(self._best_size, self.size)
+
+class BatchRpcClient:
+    """Sends JSON-RPC requests to a node in automatically sized batches."""
+
+    def __init__(self, rpc_url, session=None, timeout=120, tuner=None):
+        """
+        Initialize the BatchRpcClient.
+
+        Args:
+            rpc_url (str): The HTTP JSON-RPC endpoint
+            session (requests.Session): Session to reuse; a new one is created if None
+            timeout (int): Timeout in seconds for a single batch POST
+            tuner (BatchSizeTuner): Batch size policy; a default tuner is created if None
+        """
+        self.rpc_url = rpc_url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.tuner = tuner or BatchSizeTuner()
+        self.posts_sent = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _post(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        response = self.session.post(
+            self.rpc_url, data=body, headers={'Content-Type': 'application/json'}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        self.posts_sent += 1
+        self.bytes_sent += len(body)
+        self.bytes_received += len(response.content)
+        return response.json()
+
+    def request(self, method, params):
+        """
+        Send a single (non-batched) JSON-RPC request.
+
+        Returns:
+            The `result` field of the response
+        """
+        reply = self._post({'jsonrpc': '2.0', 'id': 0, 'method': method, 'params': params})
+        if 'error' in reply:
+            raise RpcBatchError(f"{method} failed: {reply['error']}")
+        return reply['result']
+
+    def execute(self, calls, allow_errors=False):
+        """
+        Execute many JSON-RPC requests in as few POSTs as the tuned batch size allows.
+
+        Args:
+            calls (list): (method, params) tuples
+            allow_errors (bool): Return per-item errors as RpcBatchError instances instead of raising
+
+        Returns:
+            list: The results in the same order as `calls`
+        """
+        results = []
+        position = 0
+        while position < len(calls):
+            chunk = calls[position:position + self.tuner.size]
+            payload = [
+                {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                for i, (method, params) in enumerate(chunk)
+            ]
+            start_time = time.time()
+            try:
+                replies = self._post(payload)
+            except (requests.RequestException, ValueError) as e:
+                if len(chunk) <= self.tuner.minimum:
+                    raise
+                logging.warning(f"JSON-RPC batch of {len(chunk)} failed ({e}); shrinking batch size")
+                self.tuner.failed()
+                continue
+            self.tuner.record(len(chunk), time.time() - start_time)
+
+            if isinstance(replies, dict):
+                # Some nodes answer a rejected batch with a single error object.
+                raise RpcBatchError(f"Batch rejected by node: {replies.get('error')}")
+            for reply in sorted(replies, key=lambda r: r['id']):
+                if 'error' in reply:
+                    error = RpcBatchError(f"{chunk[reply['id']][0]} failed: {reply['error']}")
+                    if not allow_errors:
+                        raise error
+                    results.append(error)
+                else:
+                    results.append(reply['result'])
+            position += len(chunk)
+        return results
+
+    def eth_call_many(self, transactions, block='latest'):
+        """
+        Run many eth_call requests.
+
+        Args:
+            transactions (list): Call objects with hex-encoded 'to' and 'data' fields
+            block (str): Block tag to execute against
+
+        Returns:
+            list: Raw return data of each call as bytes
+        """
+        replies = self.execute([('eth_call', [tx, block]) for tx in transactions])
+        return [bytes.fromhex(reply[2:]) for reply in replies]
+
+    def estimate_gas_many(self, transactions):
+        """
+        Run many eth_estimateGas requests.
+
+        Args:
+            transactions (list): Transaction objects with hex-encoded fields
+
+        Returns:
+            list: Gas estimates as ints
+        """
+        replies = self.execute([('eth_estimateGas', [tx]) for tx in transactions])
+        return [int(reply, 16) for reply in replies]
@@ -87,7 +87,7 @@ def create_temp_experiment_script(experiment_number, experiment_function_name, w
         # 通用的初始化代码
         common_init = """
         from dotenv import load_dotenv
-        from simulation import BlockchainHelper, DATASET_PATH
+        from simulation import BlockchainHelper, load_dataset
         import pandas as pd
         import asyncio
 
@@ -108,14 +108,21 @@ def create_temp_experiment_script(experiment_number, experiment_function_name, w
         import simulation
 
         logging.info("Loading dataset...")
-        dataset = pd.read_csv(DATASET_PATH, nrows=10000)
+        dataset = load_dataset(nrows=10000)
         logging.info("Creating contract factory...")
         cert_factory = helper.get_contract_factory(CERTIFICATE_ARTIFACT_PATH)
-        logging.info("Deploying contract...")
-        contract, _ = helper.deploy_contract("Certificate_Exp123", cert_factory, helper.account.address)
-        logging.info(f"Contract deployed at {{contract.address}}.")
-        helper.authorize_institution(contract)
-        logging.info("Institution authorized.")
+
+        def deploy(_):
+            logging.info("Deploying contract...")
+            contract, _ = helper.deploy_contract("Certificate_Exp123", cert_factory, helper.account.address)
+            logging.info(f"Contract deployed at {{contract.address}}.")
+            helper.authorize_institution(contract)
+            logging.info("Institution authorized.")
+            return {{'certificate': contract.address}}
+
+        # Every experiment starts from the same freshly deployed contract, restored from a snapshot
+        state = helper.fixtures.fixture("separate-exp123-deployed", deploy)
+        contract = helper.clients.contract(state['certificate'], cert_factory.abi)
         
         logging.info("Starting experiment function: {experiment_function_name}...")
         if {experiment_number == 2}:
@@ -128,17 +135,28 @@ def create_temp_experiment_script(experiment_number, experiment_function_name, w
         from simulation import CERTIFICATE_ARTIFACT_PATH, CERTIFICATE_ONCHAIN_ARTIFACT_PATH
         import simulation
 
-        dataset = pd.read_csv(DATASET_PATH, nrows=1000)
+        dataset = load_dataset(nrows=1000)
         cert_factory = helper.get_contract_factory(CERTIFICATE_ARTIFACT_PATH)
         cert_onchain_factory = helper.get_contract_factory(CERTIFICATE_ONCHAIN_ARTIFACT_PATH)
         
-        logging.info("Deploying contracts...")
-        cert_contract, deploy_gas_hybrid = helper.deploy_contract("Certificate_Exp4", cert_factory, helper.account.address)
-        cert_onchain_contract, deploy_gas_onchain = helper.deploy_contract("CertOnChain_Exp4", cert_onchain_factory, helper.account.address)
-        logging.info(f"Contracts deployed at {{cert_contract.address}} and {{cert_onchain_contract.address}}.")
+        def deploy(_):
+            logging.info("Deploying contracts...")
+            cert_contract, deploy_gas_hybrid = helper.deploy_contract("Certificate_Exp4", cert_factory, helper.account.address)
+            cert_onchain_contract, deploy_gas_onchain = helper.deploy_contract("CertOnChain_Exp4", cert_onchain_factory, helper.account.address)
+            logging.info(f"Contracts deployed at {{cert_contract.address}} and {{cert_onchain_contract.address}}.")
+            return {{
+                'certificate': cert_contract.address, 'deploy_gas_hybrid': deploy_gas_hybrid,
+                'onchain': cert_onchain_contract.address, 'deploy_gas_onchain': deploy_gas_onchain,
+            }}
+
+        state = helper.fixtures.fixture("separate-exp4-deployed", deploy)
+        cert_contract = helper.clients.contract(state['certificate'], cert_factory.abi)
+        cert_onchain_contract = helper.clients.contract(state['onchain'], cert_onchain_factory.abi)
+        deploy_gas_hybrid, deploy_gas_onchain = state['deploy_gas_hybrid'], state['deploy_gas_onchain']
 
         logging.info("Starting experiment function: {experiment_function_name}...")
         simulation.{experiment_function_name}(helper, cert_contract, cert_onchain_contract, dataset, deploy_gas_hybrid, deploy_gas_onchain)
+        simulation.run_experiment_4_batch_anchoring(helper, cert_contract, cert_onchain_contract, dataset)
 """
         elif experiment_number == 5:
             init_and_call_code = common_init + f"""
@@ -152,6 +170,7 @@ def create_temp_experiment_script(experiment_number, experiment_function_name, w
 
         logging.info("Starting experiment function: {experiment_function_name}...")
         simulation.{experiment_function_name}(helper, cert_factory, baseline_revocation_factory)
+        simulation.run_experiment_5_registry(helper)
 """
     else:
         init_and_call_code = f"{experiment_function_name}()"
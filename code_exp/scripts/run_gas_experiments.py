@@ -0,0 +1,75 @@
+"""
+Gas-Only Experiments on the In-Process EVM
+
+Runs the experiments whose results are gas figures only (the gas part of
+Exp1, Exp4 with the Merkle batch comparison, and the gas columns of Exp5 and
+of its sparse Merkle registry variant) on an in-process py-evm chain (see
+evm_backend.py) instead of a Hardhat node: no node process is started and no
+request goes over HTTP. Timing results are not produced, since they would not
+describe a networked node. Results are written to data/inprocess/, next to and
+not over the files of the networked runs.
+
+Usage: python scripts/run_gas_experiments.py
+"""
+
+import os
+import logging
+
+from web3 import Web3
+
+from evm_backend import InProcessBackend
+from hash_store import HashStore, STORE_DIR as HASH_STORE_DIR
+from simulation import (
+    BlockchainHelper, load_dataset, run_experiment_1_gas, run_experiment_4_storage, run_experiment_4_batch_anchoring,
+    run_experiment_5_revocation, run_experiment_5_registry,
+    DEPLOYER_PRIVATE_KEY, DATA_DIR, DATASET_PATH, CERTIFICATE_ARTIFACT_PATH, CERTIFICATE_ONCHAIN_ARTIFACT_PATH,
+    BASELINE_REVOCATION_ARTIFACT_PATH,
+)
+
+# Hardhat's first default account, used when no PRIVATE_KEY is configured; it only ever holds test ether
+FALLBACK_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+INPROCESS_DATA_DIR = os.path.join(DATA_DIR, 'inprocess')  # Kept apart from the Hardhat results of the same names
+
+def main():
+    """Deploy the contracts on the in-process chain and run the gas experiments."""
+    logging.info("====== STARTING GAS EXPERIMENTS (IN-PROCESS EVM) ======")
+    os.makedirs(INPROCESS_DATA_DIR, exist_ok=True)
+
+    private_key = DEPLOYER_PRIVATE_KEY or FALLBACK_PRIVATE_KEY
+    backend = InProcessBackend(private_key)
+    helper = BlockchainHelper(backend.rpc_url, private_key, backend=backend)
+
+    cert_factory = helper.get_contract_factory(CERTIFICATE_ARTIFACT_PATH)
+    cert_onchain_factory = helper.get_contract_factory(CERTIFICATE_ONCHAIN_ARTIFACT_PATH)
+    baseline_revocation_factory = helper.get_contract_factory(BASELINE_REVOCATION_ARTIFACT_PATH)
+
+    cert_contract, deploy_gas_hybrid = helper.deploy_contract("Certificate (Gas)", cert_factory, helper.account.address)
+    helper.authorize_institution(cert_contract)
+    cert_onchain_contract, deploy_gas_onchain = helper.deploy_contract("CertOnChain (Gas)", cert_onchain_factory, helper.account.address)
+    helper.authorize_institution(cert_onchain_contract, is_onchain=True)
+
+    run_experiment_1_gas(
+        helper, cert_contract, Web3.keccak(text="gas-exp1-issue"), Web3.keccak(text="gas-exp1-revoke"),
+        data_dir=INPROCESS_DATA_DIR
+    )
+
+    if os.path.exists(DATASET_PATH) or HashStore.exists(HASH_STORE_DIR):
+        dataset = load_dataset(nrows=1)
+        run_experiment_4_storage(
+            helper, cert_contract, cert_onchain_contract, dataset, deploy_gas_hybrid, deploy_gas_onchain,
+            data_dir=INPROCESS_DATA_DIR
+        )
+        run_experiment_4_batch_anchoring(
+            helper, cert_contract, cert_onchain_contract, dataset, gas_only=True, data_dir=INPROCESS_DATA_DIR
+        )
+    else:
+        logging.warning("Dataset not found; skipping Experiment 4. Run generate_dataset.py first.")
+
+    run_experiment_5_revocation(helper, cert_factory, baseline_revocation_factory, gas_only=True, data_dir=INPROCESS_DATA_DIR)
+    run_experiment_5_registry(helper, gas_only=True, data_dir=INPROCESS_DATA_DIR)
+
+    backend.close()
+    logging.info(f"====== GAS EXPERIMENTS FINISHED (results in {INPROCESS_DATA_DIR}) ======")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Multi-Account Sender Pool
+
+All load-test workers sending from the deployer account race on one nonce
+sequence. This module authorizes several of the node's unlocked accounts as
+institutions so that each worker can send from its own account with its own
+nonce stream.
+"""
+
+import logging
+
+from tx_pipeline import NonceManager, TransactionPipeline
+
+class SenderPool:
+    """Authorizes node accounts as institutions and assigns them to workers."""
+
+    def __init__(self, w3, contract, owner, nonce_manager=None, tracker=None):
+        """
+        Initialize the SenderPool.
+
+        Args:
+            w3 (Web3): The Web3 instance used to reach the node
+            contract (Contract): A deployed Certificate contract
+            owner (str): The contract owner, allowed to call addInstitution
+            nonce_manager (NonceManager): Nonce source of the owner; a new one is created if None
+            tracker (ConfirmationTracker): Optional block-driven receipt source for the pipeline
+        """
+        self.w3 = w3
+        self.contract = contract
+        self.owner = owner
+        self.nonce_manager = nonce_manager or NonceManager(w3, owner)
+        self.tracker = tracker
+        self.accounts = []
+
+    def authorize(self, count):
+        """
+        Make the first `count` unlocked node accounts authorized institutions.
+
+        Args:
+            count (int): Number of sender accounts wanted
+
+        Returns:
+            list: The sender accounts
+        """
+        available = self.w3.eth.accounts
+        if count > len(available):
+            raise ValueError(f"Requested {count} sender accounts but the node only unlocks {len(available)}")
+        accounts = available[:count]
+        missing = [a for a in accounts if not self.contract.functions.isInstitution(a).call()]
+        if missing:
+            logging.info(f"Authorizing {len(missing)} additional sender accounts as institutions...")
+            pipeline = TransactionPipeline(self.w3, self.nonce_manager, tracker=self.tracker)
+            results = pipeline.run(lambda a: self.contract.functions.addInstitution(a), missing)
+            failed = [r for r in results if r['status'] != 1]
+            if failed:
+                raise RuntimeError(f"Failed to authorize {len(failed)} sender accounts: {failed[0]['error']}")
+        self.accounts = accounts
+        return accounts
+
@@ -1,18 +1,43 @@
 import os
 import json
 import time
+import random
 import logging
 import asyncio
+import itertools
 from datetime import datetime
-import threading
-import random
 
 import pandas as pd
 from tqdm import tqdm
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from eth_abi import decode
 from dotenv import load_dotenv
 
+from tx_pipeline import NonceManager, TransactionPipeline
+from raw_tx import (
+    RawTransactionSender, CERTIFICATE_TEMPLATES, CERTIFICATE_STATUS_TYPES, BASELINE_REVOCATION_TEMPLATES
+)
+from confirmation_tracker import ConfirmationTracker
+from client_factory import ClientFactory, pool_size_for
+from hash_store import HashStore, STORE_DIR as HASH_STORE_DIR
+from certificate_source import CertificateSource
+from hash_feeder import HashFeeder
+from chain_fixtures import ChainFixtures
+from state_seeder import StateSeeder, DEFAULT_VERIFY_SAMPLE, STATUS_ISSUED, STATUS_REVOKED
+from rpc_batch import BatchSizeTuner
+from mining_modes import MiningController
+from certificate_batch import CertificateBatchClient, require_functions
+from async_load import AsyncLoadEngine
+from sender_pool import SenderPool
+from open_loop import OpenLoopGenerator
+from latency_recorder import LatencyRecorder
+from gas_cache import GasCache
+from event_indexer import EventIndexer
+from verification_cache import VerificationCache
+from revocation_filter import RevocationFilter, FilteredVerifier
+from merkle import MerkleTree, encode_proof, verify_proof as verify_merkle_proof
+from sparse_merkle import SparseMerkleTree, ZERO, encode_proof as encode_registry_proof, verify_proof as verify_registry_proof
+
 # --- Configuration & Setup ---
 load_dotenv()
 
@@ -26,19 +51,55 @@ ARTIFACTS_DIR = os.path.join(ROOT_DIR, 'artifacts', 'contracts')
 CERTIFICATE_ARTIFACT_PATH = os.path.join(ARTIFACTS_DIR, 'Certificate.sol', 'Certificate.json')
 CERTIFICATE_ONCHAIN_ARTIFACT_PATH = os.path.join(ARTIFACTS_DIR, 'CertificateOnChain.sol', 'CertificateOnChain.json')
 BASELINE_REVOCATION_ARTIFACT_PATH = os.path.join(ARTIFACTS_DIR, 'BaselineRevocation.sol', 'BaselineRevocation.json')
+REVOCATION_REGISTRY_ARTIFACT_PATH = os.path.join(ARTIFACTS_DIR, 'RevocationRegistry.sol', 'RevocationRegistry.json')
 DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'dataset', 'certificates_data.csv')
 
 # --- Output Directories ---
 CODE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DATA_DIR = os.path.join(CODE_DIR, 'data')
 LOG_DIR = os.path.join(CODE_DIR, 'log')
+INDEXER_DIR = os.path.join(DATA_DIR, 'indexer')  # SQLite event indexes, one per contract address
+REVOCATION_FILTER_PATH = os.path.join(DATA_DIR, 'exp5_revocation_filter.bin')  # Serialized filter verifiers would download
+FIXTURE_CACHE_PATH = os.path.join(DATA_DIR, 'chain_fixtures.json')  # Snapshot ids of built chain states, valid while the node runs
 
 # --- Experiment Parameters ---
 LATENCY_TEST_RECORDS = 1000
-THROUGHPUT_CONCURRENCY_LEVELS = [1, 10, 50, 100, 200, 500, 1000]
+THROUGHPUT_CONCURRENCY_LEVELS = [1, 10, 50, 100, 200, 500, 1000, 5000, 10000]
 THROUGHPUT_TEST_DURATION_SECONDS = 60
+THROUGHPUT_ACCOUNT_COUNTS = [1, 10, 50, 200]  # Sender accounts (hardhat.config.js provisions 200)
+THROUGHPUT_MATRIX = 'sweeps'  # 'sweeps' runs the two sweeps below (~12 min); 'full' every (accounts, concurrency) pair (~36 min)
+THROUGHPUT_SWEEP_ACCOUNTS = 200  # Sender accounts of the concurrency sweep
+THROUGHPUT_SWEEP_CONCURRENCY = 1000  # Virtual users of the account-count sweep
+OPEN_LOOP_ARRIVAL_RATES = [10, 25, 50, 100, 200, 400, 800]  # Offered load in transactions per second
+OPEN_LOOP_ARRIVAL_PROCESS = 'poisson'  # 'poisson' or 'constant'
+OPEN_LOOP_TEST_DURATION_SECONDS = 30
 SCALABILITY_LEVELS = [10000, 50000, 100000, 500000, 1000000]
 SCALABILITY_VERIFICATION_QUERIES = 1000
+SCALABILITY_ISSUE_BLOCK_SIZE = 50000  # Hashes materialized per issuance step; past the dataset they are synthesized
+SCALABILITY_FILL_MODE = 'transactions'  # 'transactions' mines issuance; 'storage' writes the mapping with hardhat_setStorageAt
+SCALABILITY_SEEDED_LEVELS = [10000, 100000, 1000000, 5000000, 10000000]  # Levels used when filling storage directly
+SYNTHETIC_SEED = 42  # Seed of the synthetic certificate hashes beyond the dataset
+VERIFICATION_CACHE_REQUESTS = 10000  # Repeated lookups per Exp3 level through the verification cache
+VERIFICATION_ZIPF_EXPONENT = 1.1  # Popularity skew of the repeated lookups over the level's query hashes
+VERIFICATION_CACHE_MAX_STALENESS = 1.0  # Seconds a cached status may lag behind the chain
+VERIFICATION_CACHE_REVOCATIONS = 10  # Most popular certificates revoked to check that no stale status is served
+REVOCATION_FILTER_FP_RATE = 0.01  # False-positive rate of the off-chain revocation filter in Exp5
+REGISTRY_REVOCATION_SIZES = [1, 10, 100, 1000, 10000, 100000]  # Revoked hashes in the sparse Merkle registry variant of Exp5
+REGISTRY_UPDATE_BATCH = 1000  # Revocations published per registry root update (32 KB of calldata)
+REGISTRY_VERIFY_QUERIES = 100  # Proofs checked per registry size, half of them for revoked hashes
+REGISTRY_ROOT_TRUST = 'owner-published, not recomputed on-chain'  # Reported with every registry result row
+PIPELINE_WINDOW = 64  # Max in-flight transactions for pipelined bulk issuance/revocation
+MINING_MODES_TESTED = [  # Mining configurations Exp1 and Exp2 are repeated under
+    {'mode': 'automine'},
+    {'mode': 'interval', 'interval_ms': 1000},
+    {'mode': 'manual', 'batch_size': 50, 'max_wait': 1.0},
+]
+MINING_MODE_TEST_RECORDS = 500  # Pipelined issuances per mining mode in Exp1
+MINING_MODE_CONCURRENCY = 100  # Virtual users per mining mode in Exp2
+BATCH_GAS_SAMPLE_SIZE = 100  # Certificates per batch when measuring per-certificate gas of the batch entry points
+GAS_CACHE_SAMPLE_RATE = 0.05  # Fraction of cached gas estimates re-checked against a real eth_estimateGas
+MERKLE_BATCH_SIZES = [10, 100, 1000, 10000, 100000]  # Certificates per anchored batch in Exp4
+MERKLE_VERIFY_SAMPLES = 100  # Certificates verified per mode and batch size in Exp4
 
 # --- Logging Setup ---
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -54,19 +115,53 @@ logging.basicConfig(
 )
 
 # --- Web3 Helper Class ---
+def _raise_on_failed(results):
+    """Raises if any transaction of a pipeline run did not succeed."""
+    failed = [r for r in results if r['status'] != 1]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(results)} pipelined transactions failed. First error: {failed[0]['error']}")
+    return results
+
 class BlockchainHelper:
     """A helper class to manage interaction with the blockchain."""
 
-    def __init__(self, rpc_url, private_key):
-        self.w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={'timeout': 120}))
-        time.sleep(5) # Add a 5-second delay to allow the node to initialize
-        if not self.w3.is_connected():
-            raise ConnectionError("Failed to connect to the Hardhat RPC node after delay.")
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+    def __init__(self, rpc_url, private_key, backend=None):
+        """
+        Args:
+            rpc_url (str): The HTTP JSON-RPC endpoint of the node
+            private_key (str): Key of the deployer account
+            backend: Optional client source with the ClientFactory interface, e.g. an
+                evm_backend.InProcessBackend for gas-only runs; rpc_url is ignored if given
+        """
+        # One keep-alive pool shared by the Web3 client, the batch client and the pipelines
+        self.clients = backend or ClientFactory(rpc_url, pool_size=pool_size_for(PIPELINE_WINDOW), timeout=120)
+        self.rpc_url = self.clients.rpc_url
+        self.w3 = self.clients.web3()
+        self.clients.wait_until_ready()
         self.account = self.w3.eth.account.from_key(private_key)
         self.w3.eth.default_account = self.account.address
+        self.nonce_manager = NonceManager(self.w3, self.account.address)
+        self._raw_senders = {}
+        self.rpc_batch = self.clients.batch_client()
+        self.confirmations = ConfirmationTracker(self.rpc_batch)
+        self._batch_clients = {}
+        # Gas per (code hash, selector, state class), so path-determined costs are estimated once
+        self.gas_cache = GasCache(self.rpc_batch, sample_rate=GAS_CACHE_SAMPLE_RATE)
+        # Named evm_snapshot states; local nonces and code hashes are reloaded whenever the chain is reverted
+        # Snapshot ids are only persisted for a networked node that outlives this process
+        self.fixtures = ChainFixtures(
+            self.rpc_batch, persist_path=FIXTURE_CACHE_PATH if backend is None else None,
+            on_restore=[self.nonce_manager.reset, self.gas_cache.forget_code]
+        )
+        self.mining = MiningController(self.rpc_batch)
+        self._indexers = {}
+        self._indexer_dir = INDEXER_DIR if backend is None else None
         logging.info(f"Connected to Web3. Default account: {self.account.address}")
 
+    def set_mining_mode(self, mode, **kwargs):
+        """Switches the node between automine, interval and manual batch mining; returns the mode label."""
+        return self.mining.set_mode(mode, **kwargs)
+
     def get_contract_factory(self, artifact_path):
         with open(artifact_path, 'r') as f:
             artifact = json.load(f)
@@ -78,7 +173,7 @@ class BlockchainHelper:
         tx_hash = contract_factory.constructor(*args).transact({'from': self.account.address})
         tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
         contract_address = tx_receipt.contractAddress
-        contract = self.w3.eth.contract(address=contract_address, abi=contract_factory.abi)
+        contract = self.clients.contract(contract_address, contract_factory.abi)
         logging.info(f"{contract_name} deployed at {contract_address}. Gas used: {tx_receipt.gasUsed}")
         return contract, tx_receipt.gasUsed
 
@@ -93,173 +188,497 @@ class BlockchainHelper:
         self.w3.eth.wait_for_transaction_receipt(tx_hash)
         logging.info("Authorization successful.")
 
+    def transact_pipelined(self, build_call, items, desc=None, window=PIPELINE_WINDOW, raise_on_failure=True):
+        """
+        Sends one transaction per item with local nonces and up to `window` transactions in flight.
+
+        With `raise_on_failure=False` the per-item results are returned even if some
+        transactions failed, for callers that count failures instead of aborting.
+        """
+        pipeline = TransactionPipeline(self.w3, self.nonce_manager, window=window, tracker=self.confirmations)
+        results = pipeline.run(build_call, items, desc=desc)
+        return _raise_on_failed(results) if raise_on_failure else results
+
+    def issue_certificates_batched(self, contract, cert_hashes, desc=None):
+        """Issues certificates through issueCertificates, one gas-sized chunk per transaction."""
+        return _raise_on_failed(self.get_batch_client(contract).issue_many(cert_hashes, desc=desc))
+
+    def revoke_certificates_batched(self, contract, cert_hashes, desc=None):
+        """Revokes certificates through revokeCertificates, one gas-sized chunk per transaction."""
+        return _raise_on_failed(self.get_batch_client(contract).revoke_many(cert_hashes, desc=desc))
+
+    def get_raw_sender(self, contract):
+        """Returns the cached raw signed-transaction fast path for a Certificate contract."""
+        if contract.address not in self._raw_senders:
+            self._raw_senders[contract.address] = RawTransactionSender(
+                self.w3, self.account.key, contract.address, nonce_manager=self.nonce_manager
+            )
+        return self._raw_senders[contract.address]
+
+    def event_indexer(self, contract):
+        """Returns the cached event indexer of a Certificate contract; call sync() before querying it."""
+        if contract.address not in self._indexers:
+            db_path = ':memory:'
+            if self._indexer_dir is not None:
+                os.makedirs(self._indexer_dir, exist_ok=True)
+                db_path = os.path.join(self._indexer_dir, f"{contract.address}.sqlite")
+            self._indexers[contract.address] = EventIndexer(self.rpc_batch, contract.address, db_path=db_path)
+        return self._indexers[contract.address]
+
+    def get_batch_client(self, contract):
+        """Returns the cached array-call client for a Certificate contract."""
+        if contract.address not in self._batch_clients:
+            self._batch_clients[contract.address] = CertificateBatchClient(
+                self.w3, contract, nonce_manager=self.nonce_manager, tracker=self.confirmations
+            )
+        return self._batch_clients[contract.address]
+
+    def call_templated_batched(self, contract, template, args, output_types, block='latest'):
+        """Runs one templated eth_call per argument in JSON-RPC batches and decodes the results."""
+        transactions = [
+            {'from': self.account.address, 'to': contract.address, 'data': '0x' + template.encode(arg).hex()}
+            for arg in args
+        ]
+        return [decode(output_types, data) for data in self.rpc_batch.eth_call_many(transactions, block=block)]
+
+    def estimate_gas_batched(self, contract, template, args, state_classes=None):
+        """
+        Runs one templated eth_estimateGas per argument in JSON-RPC batches.
+
+        With `state_classes` (one per argument, or one for all) the estimates go through the gas cache,
+        so only the first query of every (function, state class) pair and sampled hits reach the node.
+        """
+        transactions = [
+            {'from': self.account.address, 'to': contract.address, 'data': '0x' + template.encode(arg).hex()}
+            for arg in args
+        ]
+        if state_classes is not None:
+            return self.gas_cache.estimate_many(transactions, state_classes)
+        return self.rpc_batch.estimate_gas_many(transactions)
+
+    def estimate_gas_cached(self, contract, fn_name, args, state_class):
+        """Estimates the gas of one contract call through the gas cache; `state_class` names the path it takes."""
+        transaction = {
+            'from': self.account.address, 'to': contract.address, 'data': contract.encodeABI(fn_name=fn_name, args=args)
+        }
+        return self.gas_cache.estimate(transaction, state_class)
+
+    def get_certificate_statuses_batched(self, contract, cert_hashes, block='latest'):
+        """Returns (status, institution, timestamp) for every hash using batched getCertificateStatus calls."""
+        return self.call_templated_batched(
+            contract, CERTIFICATE_TEMPLATES['getCertificateStatus'], cert_hashes, CERTIFICATE_STATUS_TYPES, block=block
+        )
+
+    def verify_batch_members_batched(self, contract, members, block='latest'):
+        """Returns (status, institution, timestamp) for every (Merkle root, hash, proof) using batched verifyBatchMember calls."""
+        transactions = [
+            {'from': self.account.address, 'to': contract.address,
+             'data': contract.encodeABI(fn_name='verifyBatchMember', args=[root, cert_hash, proof])}
+            for root, cert_hash, proof in members
+        ]
+        return [decode(CERTIFICATE_STATUS_TYPES, data) for data in self.rpc_batch.eth_call_many(transactions, block=block)]
+
+    def is_revoked_batched(self, baseline_contract, cert_hashes):
+        """Returns the BaselineRevocation.isRevoked flag for every hash using batched calls."""
+        results = self.call_templated_batched(
+            baseline_contract, BASELINE_REVOCATION_TEMPLATES['isRevoked'], cert_hashes, ['bool']
+        )
+        return [revoked for (revoked,) in results]
+
+def load_dataset(nrows=None):
+    """Loads the first `nrows` certificate records, from the memory-mapped hash store if it was generated."""
+    if HashStore.exists(HASH_STORE_DIR):
+        logging.info(f"Loading dataset from hash store {HASH_STORE_DIR}...")
+        return HashStore.open(HASH_STORE_DIR).frame(0, nrows)
+    logging.info(f"Loading dataset from {DATASET_PATH}...")
+    return pd.read_csv(DATASET_PATH, nrows=nrows)
+
+def open_hash_store():
+    """Opens the certificate hashes of the whole dataset as a HashStore, without materializing the records."""
+    if HashStore.exists(HASH_STORE_DIR):
+        logging.info(f"Opening hash store {HASH_STORE_DIR}...")
+        return HashStore.open(HASH_STORE_DIR)
+    logging.info(f"Loading certificate hashes from {DATASET_PATH}...")
+    return HashStore.from_hex(pd.read_csv(DATASET_PATH, usecols=['certificate_hash'])['certificate_hash'])
+
+def certificate_hashes(dataset):
+    """
+    Returns a HashStore over the certificate hashes of `dataset`.
+
+    A HashStore (see open_hash_store()) is returned as is. For a DataFrame, the
+    memory-mapped store is used when it covers the dataset, so experiments slice
+    raw bytes32 values instead of converting hex strings; otherwise the store is
+    built from the dataset's `certificate_hash` column.
+    """
+    if isinstance(dataset, HashStore):
+        return dataset
+    if HashStore.exists(HASH_STORE_DIR):
+        store = HashStore.open(HASH_STORE_DIR)
+        if len(store) >= len(dataset):
+            return store.head(len(dataset))
+    return HashStore.from_hex(dataset['certificate_hash'])
+
 # --- Simulation Experiments ---
 
+def zipf_requests(items, count, exponent, seed):
+    """Draws `count` items with Zipf popularity: the item at rank k is requested with weight 1 / k**exponent."""
+    weights = [1 / (rank ** exponent) for rank in range(1, len(items) + 1)]
+    return random.Random(seed).choices(items, weights=weights, k=count)
+
 def run_experiment_1_baseline(helper, contract, dataset):
     """Experiment 1: Baseline Performance & Cost Assessment."""
     logging.info("--- Starting Experiment 1: Baseline Performance & Cost ---")
     results = []
+    recorder = LatencyRecorder()
 
     logging.info(f"Measuring latency for {LATENCY_TEST_RECORDS} 'issueCertificate' transactions...")
-    issue_hashes_exp1 = dataset.iloc[0:LATENCY_TEST_RECORDS]['certificate_hash'].tolist()
+    hashes = certificate_hashes(dataset)
+    issue_hashes_exp1 = hashes.hashes(0, LATENCY_TEST_RECORDS)
 
     for cert_hash in tqdm(issue_hashes_exp1, desc="Exp 1: Latency Test"):
         start_time = time.time()
-        tx_hash = contract.functions.issueCertificate(Web3.to_bytes(hexstr=cert_hash)).transact()
+        tx_hash = contract.functions.issueCertificate(cert_hash).transact()
         helper.w3.eth.wait_for_transaction_receipt(tx_hash)
         end_time = time.time()
         latency = end_time - start_time
         results.append({'operation': 'issueCertificate', 'latency_seconds': latency})
+        recorder.record('issueCertificate', latency)
 
     df_latency = pd.DataFrame(results)
     df_latency.to_csv(os.path.join(DATA_DIR, 'exp1_latency.csv'), index=False)
     logging.info(f"Latency results saved to exp1_latency.csv")
+    recorder.to_csv(os.path.join(DATA_DIR, 'exp1_latency_summary.csv'))
+    logging.info(f"Latency percentiles saved to exp1_latency_summary.csv")
+
+    run_experiment_1_gas(helper, contract, hashes.hash_at(LATENCY_TEST_RECORDS), hashes.hash_at(LATENCY_TEST_RECORDS + 1))
+
+    # Confirmation latency and block packing per mining mode, with a window of issuances in flight
+    mode_source = CertificateSource(seed=SYNTHETIC_SEED, label='exp1-mining')
+    mode_rows = []
+    for i, config in enumerate(MINING_MODES_TESTED):
+        label = helper.set_mining_mode(**config)
+        mode_hashes = mode_source.hashes(i * MINING_MODE_TEST_RECORDS, (i + 1) * MINING_MODE_TEST_RECORDS)
+        mode_results = helper.transact_pipelined(
+            lambda h: contract.functions.issueCertificate(h), mode_hashes, desc=f"Exp 1: {label}",
+            raise_on_failure=False
+        )
+        # Failed transactions have no latency or block; they are counted, not measured
+        confirmed = [r for r in mode_results if r['status'] == 1]
+        failed_count = len(mode_results) - len(confirmed)
+        if failed_count:
+            logging.warning(f"{label}: {failed_count} of {len(mode_results)} transactions failed. First error: "
+                            f"{next(r['error'] for r in mode_results if r['status'] != 1)}")
+        if not confirmed:
+            logging.warning(f"{label}: no transaction was confirmed; skipping this mining mode.")
+            continue
+        mode_recorder = LatencyRecorder()
+        for r in confirmed:
+            mode_recorder.record('issueCertificate', r['latency_seconds'])
+        block_numbers = [r['block_number'] for r in confirmed]
+        block_stats = helper.mining.block_stats(min(block_numbers), max(block_numbers))
+        for row in mode_recorder.summary(mining_mode=label, failed_tx=failed_count):
+            row.update(block_stats)
+            mode_rows.append(row)
+        logging.info(f"{label}: {block_stats['mean_tx_per_block']:.1f} transactions per block")
+    helper.set_mining_mode('automine')
+    pd.DataFrame(mode_rows).to_csv(os.path.join(DATA_DIR, 'exp1_mining_modes.csv'), index=False)
+    logging.info(f"Per-mining-mode latency and block packing saved to exp1_mining_modes.csv")
+    logging.info("--- Experiment 1 Finished ---")
+    return LATENCY_TEST_RECORDS
 
-    logging.info("Measuring gas cost for core operations...")
-    gas_issue_hash = dataset.iloc[LATENCY_TEST_RECORDS]['certificate_hash']
-    gas_revoke_hash = dataset.iloc[LATENCY_TEST_RECORDS + 1]['certificate_hash']
+def run_experiment_1_gas(helper, contract, gas_issue_hash, gas_revoke_hash, data_dir=DATA_DIR):
+    """
+    Experiment 1 (gas part): gas cost of the core operations, single and batched. Needs no timing.
 
-    gas_issue = contract.functions.issueCertificate(Web3.to_bytes(hexstr=gas_issue_hash)).estimate_gas()
+    Raises:
+        RuntimeError: If the Certificate ABI lacks the batch entry points it measures
+    """
+    require_functions(contract, 'issueCertificates', 'revokeCertificates')
+    logging.info("Measuring gas cost for core operations...")
+    gas_issue = helper.estimate_gas_cached(contract, 'issueCertificate', [gas_issue_hash], 'unissued')
     
-    tx_hash = contract.functions.issueCertificate(Web3.to_bytes(hexstr=gas_revoke_hash)).transact()
+    tx_hash = contract.functions.issueCertificate(gas_revoke_hash).transact()
     helper.w3.eth.wait_for_transaction_receipt(tx_hash)
-    gas_revoke = contract.functions.revokeCertificate(Web3.to_bytes(hexstr=gas_revoke_hash)).estimate_gas()
+    gas_revoke = helper.estimate_gas_cached(contract, 'revokeCertificate', [gas_revoke_hash], 'issued')
 
-    gas_verify = contract.functions.getCertificateStatus(Web3.to_bytes(hexstr=gas_issue_hash)).estimate_gas()
+    gas_verify = helper.estimate_gas_cached(contract, 'getCertificateStatus', [gas_issue_hash], 'unissued')
 
-    df_gas = pd.DataFrame([
+    rows = [
         {'operation': 'issueCertificate', 'gas_cost': gas_issue},
         {'operation': 'revokeCertificate', 'gas_cost': gas_revoke},
         {'operation': 'verifyCertificate', 'gas_cost': gas_verify}
+    ]
+
+    # Per-certificate gas of the same operations submitted through the batch entry points
+    batch_hashes = [Web3.keccak(text=f"exp1-batch-gas-{i}") for i in range(BATCH_GAS_SAMPLE_SIZE)]
+    gas_issue_batch = contract.functions.issueCertificates(batch_hashes).estimate_gas() / BATCH_GAS_SAMPLE_SIZE
+    helper.issue_certificates_batched(contract, batch_hashes)
+    gas_revoke_batch = contract.functions.revokeCertificates(batch_hashes).estimate_gas() / BATCH_GAS_SAMPLE_SIZE
+    rows.extend([
+        {'operation': 'issueCertificates (per certificate)', 'gas_cost': gas_issue_batch},
+        {'operation': 'revokeCertificates (per certificate)', 'gas_cost': gas_revoke_batch}
     ])
-    df_gas.to_csv(os.path.join(DATA_DIR, 'exp1_gas_cost.csv'), index=False)
+
+    df_gas = pd.DataFrame(rows)
+    df_gas.to_csv(os.path.join(data_dir, 'exp1_gas_cost.csv'), index=False)
     logging.info(f"Gas cost results saved to exp1_gas_cost.csv")
-    logging.info("--- Experiment 1 Finished ---")
-    return LATENCY_TEST_RECORDS
+
+def throughput_runs(matrix=THROUGHPUT_MATRIX):
+    """
+    Return the (account_count, concurrency_level) pairs Experiment 2 runs, sorted by account count.
+
+    Args:
+        matrix (str): 'sweeps' for the concurrency sweep at THROUGHPUT_SWEEP_ACCOUNTS plus the
+            account-count sweep at THROUGHPUT_SWEEP_CONCURRENCY; 'full' for every combination
+    """
+    if matrix == 'full':
+        runs = {(accounts, level) for accounts in THROUGHPUT_ACCOUNT_COUNTS for level in THROUGHPUT_CONCURRENCY_LEVELS}
+    elif matrix == 'sweeps':
+        runs = {(THROUGHPUT_SWEEP_ACCOUNTS, level) for level in THROUGHPUT_CONCURRENCY_LEVELS}
+        runs.update((accounts, THROUGHPUT_SWEEP_CONCURRENCY) for accounts in THROUGHPUT_ACCOUNT_COUNTS)
+    else:
+        raise ValueError(f"Unknown throughput matrix: {matrix}")
+    return sorted(runs)
 
 async def run_experiment_2_throughput(helper, contract, dataset):
     """Experiment 2: Throughput & Stress Test."""
     logging.info("--- Starting Experiment 2: Throughput & Stress Test ---")
     results = []
-
-    # Use a dedicated, non-overlapping subset of data from the end of the dataset
-    # to avoid polluting the state for Experiment 3.
-    test_data_subset = dataset.tail(10000).copy()
-    logging.info(f"Running throughput test with {len(test_data_subset)} unique records from the end of the dataset.")
-
-    for level in THROUGHPUT_CONCURRENCY_LEVELS:
-        logging.info(f"Testing throughput with concurrency level: {level}")
-        
-        # Use a thread-safe counter for successful transactions
-        successful_tx = 0
-        lock = threading.Lock()
-        
-        # Set a fixed duration for the test
-        test_duration = 60  # seconds
-        test_end_time = time.time() + test_duration
-
-        def task_body():
-            nonlocal successful_tx
-            # Each thread gets its own Web3 instance to avoid nonce and connection issues
-            local_helper = BlockchainHelper(helper.w3.provider.endpoint_uri, helper.account.key)
-            local_contract = local_helper.w3.eth.contract(address=contract.address, abi=contract.abi)
-
-            while time.time() < test_end_time:
-                try:
-                    # Sample a random record from the dedicated test set
-                    row = test_data_subset.sample(1).iloc[0]
-                    # Add a random element to the hash to ensure it's unique for every single call
-                    cert_hash = Web3.keccak(text=f"{row['student_name']}{row['degree_type']}{row['institution_name']}{random.random()}")
-                    
-                    tx_hash = local_contract.functions.issueCertificate(cert_hash).transact()
-                    # Wait for receipt to confirm the transaction was actually successful
-                    receipt = local_helper.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
-                    
-                    if receipt.status == 1:
-                        with lock:
-                            successful_tx += 1
-                except Exception as e:
-                    # In a high-concurrency test, some failures (e.g., timeouts, nonce gaps) are expected.
-                    # We log them but continue the test.
-                    logging.warning(f"Transaction failed in thread with error: {e}")
-        
-        try:
-            threads = [threading.Thread(target=task_body) for _ in range(level)]
-            
-            start_time = time.time()
-            for t in threads:
-                t.start()
-            for t in threads:
-                t.join()
-            duration = time.time() - start_time
-
-            # Ensure duration is at least the planned test duration
-            actual_duration = max(duration, test_duration)
-            tps = successful_tx / actual_duration if actual_duration > 0 else 0
-        
-        except RuntimeError as e:
-            if "can't start new thread" in str(e):
-                logging.error(f"Failed to start threads for concurrency level {level}: {e}")
-                tps = 0  # Record TPS as 0 since the test couldn't run
-                actual_duration = test_duration # Use the planned duration
-            else:
-                raise # Re-raise other runtime errors
-        
-        logging.info(f"Level {level}: {successful_tx} successful transactions in {actual_duration:.2f}s. TPS: {tps:.2f}")
-        results.append({'concurrency_level': level, 'tps': tps})
-
-    df = pd.DataFrame(results)
-    df.to_csv(os.path.join(DATA_DIR, 'exp2_throughput.csv'), index=False)
-    logging.info(f"Throughput results saved to exp2_throughput.csv")
+    latency_results = []
+
+    # Hashes come pre-computed from a background process, so the load loop measures the chain only.
+    # The 'exp2' namespace never overlaps the certificates issued by Experiment 3.
+    with HashFeeder(label='exp2', seed=SYNTHETIC_SEED) as feeder:
+        next_hash = feeder.next_hash
+
+        sender_pool = SenderPool(
+            helper.w3, contract, helper.account.address, nonce_manager=helper.nonce_manager, tracker=helper.confirmations
+        )
+
+        runs = throughput_runs()
+        logging.info(f"Running {len(runs)} throughput levels ({THROUGHPUT_MATRIX} matrix) of {THROUGHPUT_TEST_DURATION_SECONDS}s each")
+        for account_count, account_runs in itertools.groupby(runs, key=lambda run: run[0]):
+            # Each sender account gets its own nonce stream; virtual users share accounts round-robin
+            senders = sender_pool.authorize(account_count)
+            # All virtual users are coroutines on this event loop sharing one connection pool
+            engine = AsyncLoadEngine(helper.rpc_url, contract.address, contract.abi, senders)
+
+            for _, level in account_runs:
+                logging.info(f"Testing throughput with concurrency level: {level}, sender accounts: {account_count}")
+                stalls_before = feeder.stalls
+                stats = await engine.run_level(level, THROUGHPUT_TEST_DURATION_SECONDS, next_hash)
+
+                # Ensure duration is at least the planned test duration
+                actual_duration = max(stats.duration, THROUGHPUT_TEST_DURATION_SECONDS)
+                tps = stats.successful_tx / actual_duration if actual_duration > 0 else 0
+
+                logging.info(f"Level {level} ({account_count} accounts): {stats.successful_tx} successful transactions in {actual_duration:.2f}s. TPS: {tps:.2f}")
+                results.append({'concurrency_level': level, 'account_count': account_count, 'tps': tps})
+
+                latency_results.append({
+                    'concurrency_level': level,
+                    'account_count': account_count,
+                    'successful_tx': stats.successful_tx,
+                    'failed_tx': stats.failed_tx,
+                    'mean_latency_seconds': stats.latency.mean(),
+                    'p50_latency_seconds': stats.latency.percentile(50),
+                    'p90_latency_seconds': stats.latency.percentile(90),
+                    'p99_latency_seconds': stats.latency.percentile(99),
+                    'p99_9_latency_seconds': stats.latency.percentile(99.9),
+                    'max_latency_seconds': stats.latency.max(),
+                    'feeder_stalls': feeder.stalls - stalls_before,
+                })
+
+        df = pd.DataFrame(results)
+        df.to_csv(os.path.join(DATA_DIR, 'exp2_throughput.csv'), index=False)
+        logging.info(f"Throughput results saved to exp2_throughput.csv")
+        pd.DataFrame(latency_results).to_csv(os.path.join(DATA_DIR, 'exp2_latency.csv'), index=False)
+        logging.info(f"Throughput latency results saved to exp2_latency.csv")
+
+        # Open-loop run: arrivals follow a fixed schedule, so latency is measured at a known offered load
+        # and corrected for coordinated omission (measured from the intended, not the actual, send time).
+        logging.info(f"Running open-loop load ({OPEN_LOOP_ARRIVAL_PROCESS} arrivals) with {len(senders)} sender accounts")
+        generator = OpenLoopGenerator(engine, process=OPEN_LOOP_ARRIVAL_PROCESS)
+        load_results = []
+        for rate in OPEN_LOOP_ARRIVAL_RATES:
+            stats = await generator.run_rate(rate, OPEN_LOOP_TEST_DURATION_SECONDS, next_hash)
+            load_results.append(stats.summary())
+        pd.DataFrame(load_results).to_csv(os.path.join(DATA_DIR, 'exp2_latency_vs_load.csv'), index=False)
+        logging.info(f"Latency versus offered load saved to exp2_latency_vs_load.csv")
+
+        # The same closed-loop load under each mining mode: throughput, confirmation latency, block packing
+        mode_results = []
+        for config in MINING_MODES_TESTED:
+            label = helper.set_mining_mode(**config)
+            first_block = helper.mining.head() + 1
+            stats = await engine.run_level(MINING_MODE_CONCURRENCY, THROUGHPUT_TEST_DURATION_SECONDS, next_hash)
+            block_stats = helper.mining.block_stats(first_block, helper.mining.head())
+            actual_duration = max(stats.duration, THROUGHPUT_TEST_DURATION_SECONDS)
+            tps = stats.successful_tx / actual_duration if actual_duration > 0 else 0
+            logging.info(f"{label}: TPS {tps:.2f}, {block_stats['mean_tx_per_block']:.1f} transactions per block")
+            mode_results.append({
+                'mining_mode': label,
+                'concurrency_level': MINING_MODE_CONCURRENCY,
+                'account_count': len(senders),
+                'tps': tps,
+                'successful_tx': stats.successful_tx,
+                'failed_tx': stats.failed_tx,
+                'mean_latency_seconds': stats.latency.mean(),
+                'p50_latency_seconds': stats.latency.percentile(50),
+                'p99_latency_seconds': stats.latency.percentile(99),
+                'max_latency_seconds': stats.latency.max(),
+                **block_stats,
+            })
+        helper.set_mining_mode('automine')
+    pd.DataFrame(mode_results).to_csv(os.path.join(DATA_DIR, 'exp2_mining_modes.csv'), index=False)
+    logging.info(f"Per-mining-mode throughput and block packing saved to exp2_mining_modes.csv")
     logging.info("--- Experiment 2 Finished ---")
 
-def run_experiment_3_scalability(helper, contract, dataset, initial_records=0):
-    """Experiment 3: Large-Scale Scalability Test."""
-    logging.info("--- Starting Experiment 3: Scalability Test ---")
+def run_experiment_3_scalability(helper, contract, dataset, initial_records=0, fill_mode=SCALABILITY_FILL_MODE):
+    """
+    Experiment 3: Large-Scale Scalability Test.
+
+    Raises:
+        RuntimeError: If the Certificate ABI lacks the batch entry points it issues and queries through
+    """
+    # Checked up front so a stale artifact fails before any level is filled
+    require_functions(contract, 'issueCertificates', 'revokeCertificates', 'getCertificateStatuses')
+    logging.info(f"--- Starting Experiment 3: Scalability Test (fill mode: {fill_mode}) ---")
     results = []
-    
+    latency_rows = []
+    levels = SCALABILITY_SEEDED_LEVELS if fill_mode == 'storage' else SCALABILITY_LEVELS
+    # Levels past the end of the dataset continue with synthetic hashes instead of short slices
+    source = CertificateSource(certificate_hashes(dataset), seed=SYNTHETIC_SEED)
+    if levels[-1] > source.stored:
+        logging.info(f"Dataset covers {source.stored} records; hashes beyond are generated on demand (seed {SYNTHETIC_SEED})")
+
+    seeder = None
+    if fill_mode == 'storage':
+        # The lookup benchmark only needs a large mapping; write it directly instead of mining issuance
+        seeder = StateSeeder(helper.clients.batch_client(tuner=BatchSizeTuner(initial=1024)), contract.address, helper.account.address)
+        seeder.check_layout(contract.functions.owner().call())
+    # Seeded certificates emit no events, so the local event index only mirrors mined issuance
+    indexer = helper.event_indexer(contract) if seeder is None else None
+
     last_level = initial_records
-    for level in SCALABILITY_LEVELS:
+    for level in levels:
         records_to_issue_count = level - last_level
         if records_to_issue_count <= 0:
             continue
 
-        logging.info(f"Issuing {records_to_issue_count} new certificates to reach {level} total records...")
-        issue_hashes_to_reach_level = dataset.iloc[last_level:level]['certificate_hash'].tolist()
-            
-        for cert_hash in tqdm(issue_hashes_to_reach_level, desc=f"Issuing to reach {level}"):
-            tx_hash = contract.functions.issueCertificate(Web3.to_bytes(hexstr=cert_hash)).transact()
-            helper.w3.eth.wait_for_transaction_receipt(tx_hash)
+        logging.info(f"Adding {records_to_issue_count} new certificates to reach {level} total records...")
+        query_hashes = []
+        if seeder is not None:
+            def blocks():
+                for block in source.iter_blocks(last_level, level, SCALABILITY_ISSUE_BLOCK_SIZE):
+                    query_hashes.extend(block[:SCALABILITY_VERIFICATION_QUERIES - len(query_hashes)])
+                    yield block
+            seeder.seed(blocks(), total=records_to_issue_count, desc=f"Seeding to reach {level}")
+            seeder.verify(contract, query_hashes[:DEFAULT_VERIFY_SAMPLE])
+        else:
+            for block in source.iter_blocks(last_level, level, SCALABILITY_ISSUE_BLOCK_SIZE):
+                helper.issue_certificates_batched(contract, block, desc=f"Issuing to reach {level}")
+                query_hashes.extend(block[:SCALABILITY_VERIFICATION_QUERIES - len(query_hashes)])
 
         # For verification, we query the hashes just added in this batch
         # This measures the query time at the current total number of records
         total_query_time = 0
-        query_hashes = issue_hashes_to_reach_level[:SCALABILITY_VERIFICATION_QUERIES]
+        recorder = LatencyRecorder()
 
         if query_hashes:
             start_query_time = time.time()
             for q_hash in query_hashes:
-                contract.functions.getCertificateStatus(Web3.to_bytes(hexstr=q_hash)).call()
+                with recorder.time('getCertificateStatus'):
+                    contract.functions.getCertificateStatus(q_hash).call()
             end_query_time = time.time()
             total_query_time = end_query_time - start_query_time
         
+        # The same queries packed into JSON-RPC batches, as used for bulk verification
+        total_batched_query_time = 0
+        if query_hashes:
+            start_query_time = time.time()
+            helper.get_certificate_statuses_batched(contract, query_hashes)
+            total_batched_query_time = time.time() - start_query_time
+            recorder.record('getCertificateStatus (JSON-RPC batch, whole set)', total_batched_query_time)
+
+        # The same queries answered by the on-chain getCertificateStatuses view
+        total_multicall_query_time = 0
+        if query_hashes:
+            batch_client = helper.get_batch_client(contract)
+            batch_client.status_chunk_size()  # Gas probing is setup, not query time
+            start_query_time = time.time()
+            batch_client.get_statuses(query_hashes)
+            total_multicall_query_time = time.time() - start_query_time
+            recorder.record('getCertificateStatuses (whole set)', total_multicall_query_time)
+
+        # The same queries answered locally from the event index, after catching it up with the chain
+        indexer_sync_time = avg_indexer_query_time = None
+        if indexer is not None and query_hashes:
+            start_query_time = time.time()
+            indexer.sync()
+            indexer_sync_time = time.time() - start_query_time
+            start_query_time = time.time()
+            for q_hash in query_hashes:
+                with recorder.time('EventIndexer.status'):
+                    indexer.status(q_hash)
+            avg_indexer_query_time = (time.time() - start_query_time) / len(query_hashes)
+
+        # Repeated, skewed verification traffic served through the event-invalidated cache
+        avg_cached_query_time = cache_hit_rate = stale_after_revocation = None
+        if query_hashes:
+            cache = VerificationCache(
+                lambda hashes, block: helper.get_certificate_statuses_batched(contract, hashes, block=block),
+                helper.rpc_batch, contract.address, max_staleness=VERIFICATION_CACHE_MAX_STALENESS
+            )
+            workload = zipf_requests(query_hashes, VERIFICATION_CACHE_REQUESTS, VERIFICATION_ZIPF_EXPONENT, SYNTHETIC_SEED + level)
+            start_query_time = time.time()
+            for q_hash in workload:
+                with recorder.time('VerificationCache.get'):
+                    cache.get(q_hash)
+            avg_cached_query_time = (time.time() - start_query_time) / len(workload)
+            cache_hit_rate = cache.stats()['hit_rate']
+
+            # Revoke the most popular certificates; once the staleness bound has passed none may be served as issued
+            popular = query_hashes[:VERIFICATION_CACHE_REVOCATIONS]
+            helper.revoke_certificates_batched(contract, popular, desc=f"Revoking popular certificates at {level}")
+            time.sleep(VERIFICATION_CACHE_MAX_STALENESS)
+            stale_after_revocation = sum(1 for status, _, _ in cache.get_many(popular) if status != STATUS_REVOKED)
+            logging.info(f"Verification cache: {cache.stats()}; {stale_after_revocation} stale statuses after revocation")
+
         avg_query_time = (total_query_time / len(query_hashes)) if query_hashes else 0
-        logging.info(f"Total Records: {level}, Average Query Time: {avg_query_time:.6f}s")
-        results.append({'total_records': level, 'avg_query_time_seconds': avg_query_time})
+        avg_batched_query_time = (total_batched_query_time / len(query_hashes)) if query_hashes else 0
+        avg_multicall_query_time = (total_multicall_query_time / len(query_hashes)) if query_hashes else 0
+        logging.info(f"Total Records: {level}, Average Query Time: {avg_query_time:.6f}s (batched: {avg_batched_query_time:.6f}s, multicall: {avg_multicall_query_time:.6f}s)")
+        results.append({
+            'total_records': level,
+            'fill_mode': fill_mode,
+            'avg_query_time_seconds': avg_query_time,
+            'avg_batched_query_time_seconds': avg_batched_query_time,
+            'avg_multicall_query_time_seconds': avg_multicall_query_time,
+            'indexer_sync_seconds': indexer_sync_time,
+            'avg_indexer_query_time_seconds': avg_indexer_query_time,
+            'avg_cached_query_time_seconds': avg_cached_query_time,
+            'cache_hit_rate': cache_hit_rate,
+            'cache_stale_after_revocation': stale_after_revocation
+        })
+        latency_rows.extend(recorder.summary(total_records=level))
 
         last_level = level
 
     df_scalability = pd.DataFrame(results)
     df_scalability.to_csv(os.path.join(DATA_DIR, 'exp3_scalability.csv'), index=False)
     logging.info(f"Scalability results saved to exp3_scalability.csv")
+    pd.DataFrame(latency_rows).to_csv(os.path.join(DATA_DIR, 'exp3_latency_summary.csv'), index=False)
+    logging.info(f"Query latency percentiles saved to exp3_latency_summary.csv")
     logging.info("--- Experiment 3 Finished ---")
     return records_to_issue_count
 
-def run_experiment_4_storage(helper, cert_contract, cert_onchain_contract, dataset, deploy_gas_hybrid, deploy_gas_onchain):
+def run_experiment_4_storage(helper, cert_contract, cert_onchain_contract, dataset, deploy_gas_hybrid, deploy_gas_onchain,
+                             data_dir=DATA_DIR):
     """Experiment 4: Storage Cost Comparative Analysis."""
     logging.info("--- Starting Experiment 4: Storage Cost Comparison ---")
     
-    df_gas_hybrid = pd.read_csv(os.path.join(DATA_DIR, 'exp1_gas_cost.csv'))
+    df_gas_hybrid = pd.read_csv(os.path.join(data_dir, 'exp1_gas_cost.csv'))
     gas_hybrid_issue = df_gas_hybrid[df_gas_hybrid['operation'] == 'issueCertificate']['gas_cost'].iloc[0]
 
     record = dataset.iloc[0]
@@ -269,72 +688,265 @@ def run_experiment_4_storage(helper, cert_contract, cert_onchain_contract, datas
         record['institution_name']
     ).estimate_gas()
 
-    df_comparison = pd.DataFrame([
+    rows = [
         {'model': 'Hybrid (Ours)', 'deploy_gas': deploy_gas_hybrid, 'issue_gas': gas_hybrid_issue},
         {'model': 'Full On-Chain (Baseline)', 'deploy_gas': deploy_gas_onchain, 'issue_gas': gas_onchain_issue}
-    ])
-    df_comparison.to_csv(os.path.join(DATA_DIR, 'exp4_storage_comparison.csv'), index=False)
+    ]
+    batched_issue = df_gas_hybrid[df_gas_hybrid['operation'] == 'issueCertificates (per certificate)']['gas_cost']
+    if not batched_issue.empty:
+        rows.insert(1, {'model': 'Hybrid Batched (Ours)', 'deploy_gas': deploy_gas_hybrid, 'issue_gas': batched_issue.iloc[0]})
+    df_comparison = pd.DataFrame(rows)
+    df_comparison.to_csv(os.path.join(data_dir, 'exp4_storage_comparison.csv'), index=False)
     logging.info(f"Storage cost comparison results saved to exp4_storage_comparison.csv")
     logging.info("--- Experiment 4 Finished ---")
 
-def run_experiment_5_revocation(helper, cert_factory, baseline_revocation_factory):
-    """Experiment 5: Revocation Mechanism Efficiency."""
+def run_experiment_4_batch_anchoring(helper, cert_contract, cert_onchain_contract, dataset, gas_only=False, data_dir=DATA_DIR):
+    """
+    Experiment 4 (continued): Merkle-batched anchoring against per-certificate issuance.
+
+    For every size in MERKLE_BATCH_SIZES, compares the issuance gas per certificate and the
+    verification gas and latency of the hybrid model (issueCertificates in chunks of
+    BATCH_GAS_SAMPLE_SIZE), the full on-chain model and one anchorBatch root per batch.
+    With `gas_only`, verification latency is not measured.
+
+    Raises:
+        RuntimeError: If the Certificate ABI lacks the batch or Merkle entry points it compares
+    """
+    require_functions(cert_contract, 'issueCertificates', 'anchorBatch', 'verifyBatchMember')
+    logging.info("--- Starting Experiment 4: Merkle Batch Anchoring ---")
+    account = {'from': helper.account.address}
+    record = dataset.iloc[0]
+    onchain_args = (record['student_name'], record['degree_type'], record['institution_name'])
+    if not cert_contract.functions.isInstitution(helper.account.address).call():
+        helper.authorize_institution(cert_contract)
+
+    # Certificates verified for the per-certificate models do not depend on the batch size
+    hybrid_hashes = CertificateSource(seed=SYNTHETIC_SEED, label='exp4-hybrid').hashes(0, MERKLE_VERIFY_SAMPLES)
+    helper.issue_certificates_batched(cert_contract, hybrid_hashes, desc="Exp 4: Hybrid certificates")
+    first_onchain_id = cert_onchain_contract.functions.getCertificateCount().call()
+    helper.transact_pipelined(
+        lambda _: cert_onchain_contract.functions.issueCertificate(*onchain_args), range(MERKLE_VERIFY_SAMPLES),
+        desc="Exp 4: On-chain certificates"
+    )
+    onchain_ids = list(range(first_onchain_id, first_onchain_id + MERKLE_VERIFY_SAMPLES))
+
+    gas_onchain_issue = cert_onchain_contract.functions.issueCertificate(*onchain_args).estimate_gas(account)
+    hybrid_verify_gas = helper.estimate_gas_cached(cert_contract, 'getCertificateStatus', [hybrid_hashes[0]], 'issued')
+    onchain_verify_gas = cert_onchain_contract.functions.getCertificateData(onchain_ids[0]).estimate_gas(account)
+
+    hybrid_verify_time, onchain_verify_time = None, None
+    recorder = LatencyRecorder()
+    if not gas_only:
+        for cert_hash in hybrid_hashes:
+            with recorder.time('Hybrid: getCertificateStatus'):
+                cert_contract.functions.getCertificateStatus(cert_hash).call()
+        for certificate_id in onchain_ids:
+            with recorder.time('Full On-Chain: getCertificateData'):
+                cert_onchain_contract.functions.getCertificateData(certificate_id).call()
+        hybrid_verify_time = recorder.histogram('Hybrid: getCertificateStatus').mean()
+        onchain_verify_time = recorder.histogram('Full On-Chain: getCertificateData').mean()
+
+    source = CertificateSource(seed=SYNTHETIC_SEED, label='exp4-merkle')
+    rows, latency_rows = [], []
+    offset = 0
+    for size in MERKLE_BATCH_SIZES:
+        logging.info(f"Anchoring a batch of {size} certificates...")
+        batch = source.hashes(offset, offset + size)
+        offset += size
+
+        chunk = batch[:BATCH_GAS_SAMPLE_SIZE]
+        hybrid_issue_gas = cert_contract.functions.issueCertificates(chunk).estimate_gas(account) / len(chunk)
+
+        start_time = time.time()
+        tree = MerkleTree(batch)
+        tree_build_time = time.time() - start_time
+        receipt = helper.w3.eth.wait_for_transaction_receipt(
+            cert_contract.functions.anchorBatch(tree.root, size).transact(account)
+        )
+        if receipt.status != 1:
+            raise RuntimeError(f"anchorBatch failed for the batch of {size}: {receipt.transactionHash.hex()}")
+        members = [batch[i] for i in range(0, size, max(1, size // MERKLE_VERIFY_SAMPLES))][:MERKLE_VERIFY_SAMPLES]
+        proofs = [tree.proof(cert_hash) for cert_hash in members]
+        if not all(verify_merkle_proof(p, tree.root, h) for h, p in zip(members, proofs)):
+            raise RuntimeError(f"A Merkle proof of the batch of {size} does not match its root")
+        merkle_verify_gas = cert_contract.functions.verifyBatchMember(tree.root, members[0], proofs[0]).estimate_gas(account)
+        statuses = helper.verify_batch_members_batched(cert_contract, [(tree.root, h, p) for h, p in zip(members, proofs)])
+        if any(status != STATUS_ISSUED for status, _, _ in statuses):
+            raise RuntimeError(f"verifyBatchMember rejected a member of the anchored batch of {size}")
+
+        merkle_verify_time = None
+        if not gas_only:
+            batch_recorder = LatencyRecorder()
+            for cert_hash, proof in zip(members, proofs):
+                with batch_recorder.time('Merkle Batch: verifyBatchMember'):
+                    cert_contract.functions.verifyBatchMember(tree.root, cert_hash, proof).call()
+            merkle_verify_time = batch_recorder.histogram('Merkle Batch: verifyBatchMember').mean()
+            batch_recorder.merge(recorder)
+            latency_rows.extend(batch_recorder.summary(batch_size=size))
+
+        rows.extend([
+            {'model': 'Hybrid Batched (Ours)', 'batch_size': size, 'issue_gas_per_certificate': hybrid_issue_gas,
+             'verify_gas': hybrid_verify_gas, 'proof_bytes': 0, 'tree_build_seconds': None,
+             'avg_verify_time_seconds': hybrid_verify_time},
+            {'model': 'Full On-Chain (Baseline)', 'batch_size': size, 'issue_gas_per_certificate': gas_onchain_issue,
+             'verify_gas': onchain_verify_gas, 'proof_bytes': 0, 'tree_build_seconds': None,
+             'avg_verify_time_seconds': onchain_verify_time},
+            {'model': 'Merkle Batch (Ours)', 'batch_size': size, 'issue_gas_per_certificate': receipt.gasUsed / size,
+             'verify_gas': merkle_verify_gas, 'proof_bytes': sum(len(encode_proof(p)) for p in proofs) / len(proofs),
+             'tree_build_seconds': tree_build_time, 'avg_verify_time_seconds': merkle_verify_time},
+        ])
+        logging.info(f"Batch of {size}: {receipt.gasUsed / size:.1f} gas per certificate anchored, "
+                     f"{hybrid_issue_gas:.1f} issued individually")
+
+    pd.DataFrame(rows).to_csv(os.path.join(data_dir, 'exp4_batch_anchoring.csv'), index=False)
+    logging.info(f"Batch anchoring comparison saved to exp4_batch_anchoring.csv")
+    if latency_rows:
+        pd.DataFrame(latency_rows).to_csv(os.path.join(data_dir, 'exp4_batch_anchoring_latency.csv'), index=False)
+        logging.info(f"Verification latency percentiles saved to exp4_batch_anchoring_latency.csv")
+    logging.info("--- Experiment 4 (Batch Anchoring) Finished ---")
+
+def run_experiment_5_revocation(helper, cert_factory, baseline_revocation_factory, gas_only=False, data_dir=DATA_DIR):
+    """
+    Experiment 5: Revocation Mechanism Efficiency.
+
+    With gas_only=True the verification timings are skipped and only the gas columns are
+    written, to exp5_revocation_gas.csv (e.g. on the in-process backend).
+    """
     logging.info("--- Starting Experiment 5: Revocation Mechanism ---")
 
-    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(data_dir, exist_ok=True)
 
     revocation_sizes = [1, 10, 100, 1000, 5000]
     num_verifications = 100
     num_hashes_needed = max(revocation_sizes) + num_verifications + 1
-    certificate_hashes = [helper.w3.keccak(text=f"exp5-cert-{i}") for i in range(num_hashes_needed)]
+    certificate_hashes = CertificateSource(seed=SYNTHETIC_SEED, label='exp5').hashes(0, num_hashes_needed)
 
     results = []
+    latency_rows = []
 
-    for size in revocation_sizes:
-        logging.info(f"Deploying new contracts for size {size}...")
-        cert_contract, _ = helper.deploy_contract(f"Certificate_Exp5_{size}", cert_factory, helper.account.address)
+    # Both contracts are deployed once. Each revocation size is a snapshot grown from the previous
+    # size, and restoring it also undoes the extra issuance done while measuring the previous size.
+    # Reverting drops every newer snapshot, so the sizes are visited in ChainFixtures.visit_order.
+    def deploy(_):
+        cert_contract, _ = helper.deploy_contract("Certificate_Exp5", cert_factory, helper.account.address)
         helper.authorize_institution(cert_contract)
-        baseline_contract, _ = helper.deploy_contract(f"BaselineRevocation_Exp5_{size}", baseline_revocation_factory)
+        baseline_contract, _ = helper.deploy_contract("BaselineRevocation_Exp5", baseline_revocation_factory)
+        return {'certificate': cert_contract.address, 'baseline': baseline_contract.address, 'revoked': 0}
+
+    def grow_to(size):
+        def populate(state):
+            cert_contract = helper.clients.contract(state['certificate'], cert_factory.abi)
+            baseline_contract = helper.clients.contract(state['baseline'], baseline_revocation_factory.abi)
+            new_hashes = certificate_hashes[state['revoked']:size]
+
+            # --- OUR MODEL (Certificate Contract) ---
+            logging.info(f"[Our Model] Issuing and revoking {len(new_hashes)} certificates to reach {size}...")
+            # Issue and revoke the new certificates to populate the revocation data
+            helper.issue_certificates_batched(cert_contract, new_hashes, desc=f"[Our Model] Issuing for size {size}")
+            helper.revoke_certificates_batched(cert_contract, new_hashes, desc=f"[Our Model] Revoking for size {size}")
+
+            # --- BASELINE MODEL (On-chain list) ---
+            logging.info(f"[Baseline Model] Revoking {len(new_hashes)} certificates to reach {size}...")
+            helper.transact_pipelined(
+                lambda h: baseline_contract.functions.revoke(h),
+                new_hashes,
+                desc=f"[Baseline Model] Setup for size {size}"
+            )
+            return dict(state, revoked=size)
+        return populate
+
+    fixture_prefix = f"exp5-{SYNTHETIC_SEED}"
+    deployed = f"{fixture_prefix}-deployed"
+    builders = {deployed: (None, deploy, None)}
+    parent = deployed
+    for size in revocation_sizes:
+        name = f"{fixture_prefix}-revoked-{size}"
+        builders[name] = (size, grow_to(size), parent)
+        parent = name
+
+    order = helper.fixtures.visit_order(list(builders))
+    for name in order:
+        size, build, parent = builders[name]
+        if size is None and name != order[0]:
+            continue  # Only needed as the parent of the first size; restoring it now would drop the cached sizes
+        state = helper.fixtures.fixture(name, build, parent=parent)
+        if size is None:
+            continue
         logging.info(f"Testing revocation set size: {size}")
-
-        # --- OUR MODEL (Certificate Contract) ---
-        logging.info(f"[Our Model] Issuing and revoking {size} certificates...")
-        # Issue and revoke `size` certificates to populate the revocation data
-        for i in tqdm(range(size), desc=f"[Our Model] Setup for size {size}"):
-            # Issue
-            tx_hash_issue = cert_contract.functions.issueCertificate(certificate_hashes[i]).transact()
-            helper.w3.eth.wait_for_transaction_receipt(tx_hash_issue)
-            # Revoke
-            tx_hash_revoke = cert_contract.functions.revokeCertificate(certificate_hashes[i]).transact()
-            helper.w3.eth.wait_for_transaction_receipt(tx_hash_revoke)
-
-        # --- BASELINE MODEL (On-chain list) ---
-        logging.info(f"[Baseline Model] Revoking {size} certificates...")
-        for i in tqdm(range(size), desc=f"[Baseline Model] Setup for size {size}"):
-            tx_hash = baseline_contract.functions.revoke(certificate_hashes[i]).transact()
-            helper.w3.eth.wait_for_transaction_receipt(tx_hash)
+        cert_contract = helper.clients.contract(state['certificate'], cert_factory.abi)
+        baseline_contract = helper.clients.contract(state['baseline'], baseline_revocation_factory.abi)
 
         # --- Verification & Gas Measurement (after setup) ---
-        our_verify_gas, our_verify_time = 0, 0
-        baseline_verify_gas, baseline_verify_time = 0, 0
+        our_verify_time, baseline_verify_time = 0, 0
 
         logging.info(f"Measuring verification performance for size {size} ({num_verifications} queries)..." )
-        for i in tqdm(range(num_verifications), desc="Verification Measurement"):
-            # Alternate between revoked and non-revoked hashes for a fair test
-            # A revoked hash (index < size) and a valid hash (index >= size)
-            h = certificate_hashes[i] if i % 2 == 0 else certificate_hashes[size + i]
+        # Alternate between revoked and non-revoked hashes for a fair test
+        # A revoked hash (index < size) and a valid hash (index >= size)
+        verify_indices = [i if i % 2 == 0 else size + i for i in range(num_verifications)]
+        verify_hashes = [certificate_hashes[i] for i in verify_indices]
+
+        # Verification gas depends only on whether the hash is revoked, so it is answered from the gas cache
+        revoked = [i < size for i in verify_indices]
+        our_verify_gas = sum(helper.estimate_gas_batched(
+            cert_contract, CERTIFICATE_TEMPLATES['getCertificateStatus'], verify_hashes,
+            state_classes=['revoked' if r else 'unissued' for r in revoked]
+        ))
+        baseline_verify_gas = sum(helper.estimate_gas_batched(
+            baseline_contract, BASELINE_REVOCATION_TEMPLATES['isRevoked'], verify_hashes,
+            state_classes=['revoked' if r else 'not-revoked' for r in revoked]
+        ))
+
+        if not gas_only:
+            recorder = LatencyRecorder()
+            for h in tqdm(verify_hashes, desc="Verification Measurement"):
+                # Our model verification
+                start_time = time.time()
+                cert_contract.functions.getCertificateStatus(h).call()
+                elapsed = time.time() - start_time
+                our_verify_time += elapsed
+                recorder.record('Our Model: getCertificateStatus', elapsed)
+
+                # Baseline model verification
+                start_time = time.time()
+                baseline_contract.functions.isRevoked(h).call()
+                elapsed = time.time() - start_time
+                baseline_verify_time += elapsed
+                recorder.record('Baseline: isRevoked', elapsed)
+
+            rpc = helper.rpc_batch
+            bytes_before = rpc.bytes_sent + rpc.bytes_received
+            start_time = time.time()
+            helper.get_certificate_statuses_batched(cert_contract, verify_hashes)
+            our_batched_verify_time = time.time() - start_time
+            our_batched_verify_bytes = rpc.bytes_sent + rpc.bytes_received - bytes_before
 
-            # Our model verification
+            bytes_before = rpc.bytes_sent + rpc.bytes_received
             start_time = time.time()
-            our_verify_gas += cert_contract.functions.getCertificateStatus(h).estimate_gas()
-            cert_contract.functions.getCertificateStatus(h).call()
-            our_verify_time += time.time() - start_time
+            helper.is_revoked_batched(baseline_contract, verify_hashes)
+            baseline_batched_verify_time = time.time() - start_time
+            baseline_batched_verify_bytes = rpc.bytes_sent + rpc.bytes_received - bytes_before
 
-            # Baseline model verification
+            # Off-chain revocation filter built from the revocation events; only its positives go on-chain.
+            # It is rebuilt for every size because restoring a fixture reverts the chain under it.
             start_time = time.time()
-            baseline_verify_gas += baseline_contract.functions.isRevoked(h).estimate_gas()
-            baseline_contract.functions.isRevoked(h).call()
-            baseline_verify_time += time.time() - start_time
+            revocation_filter = RevocationFilter(max(revocation_sizes), fp_rate=REVOCATION_FILTER_FP_RATE)
+            revocation_filter.sync(rpc, cert_contract.address)
+            filter_build_time = time.time() - start_time
+            filter_bytes = revocation_filter.save(REVOCATION_FILTER_PATH)
+
+            verifier = FilteredVerifier(
+                RevocationFilter.load(REVOCATION_FILTER_PATH),
+                lambda hashes: [
+                    status == STATUS_REVOKED for status, _, _ in helper.get_certificate_statuses_batched(cert_contract, hashes)
+                ]
+            )
+            bytes_before = rpc.bytes_sent + rpc.bytes_received
+            start_time = time.time()
+            verifier.is_revoked_many(verify_hashes)
+            filter_verify_time = time.time() - start_time
+            filter_verify_bytes = rpc.bytes_sent + rpc.bytes_received - bytes_before
+            recorder.record('Revocation filter + on-chain positives (whole set)', filter_verify_time)
+            latency_rows.extend(recorder.summary(revocation_size=size))
 
         # --- Gas Cost for Adding a new item to Revocation List ---
         # Use a new hash that hasn't been used yet
@@ -342,26 +954,168 @@ def run_experiment_5_revocation(helper, cert_factory, baseline_revocation_factor
         # For our model, we must issue it first before revoking
         tx_hash = cert_contract.functions.issueCertificate(new_hash_to_revoke).transact()
         helper.w3.eth.wait_for_transaction_receipt(tx_hash)
-        our_revoke_gas = cert_contract.functions.revokeCertificate(new_hash_to_revoke).estimate_gas()
-        baseline_revoke_gas = baseline_contract.functions.revoke(new_hash_to_revoke).estimate_gas()
+        our_revoke_gas = helper.estimate_gas_cached(cert_contract, 'revokeCertificate', [new_hash_to_revoke], 'issued')
+        baseline_revoke_gas = helper.estimate_gas_cached(baseline_contract, 'revoke', [new_hash_to_revoke], 'not-revoked')
 
-        results.append({
+        row = {
             'revocation_size': size,
             'our_revoke_gas': our_revoke_gas,
             'baseline_revoke_gas': baseline_revoke_gas,
             'our_avg_verify_gas': our_verify_gas / num_verifications,
             'baseline_avg_verify_gas': baseline_verify_gas / num_verifications,
-            'our_avg_verify_time': our_verify_time / num_verifications,
-            'baseline_avg_verify_time': baseline_verify_time / num_verifications,
-        })
+        }
+        if not gas_only:
+            row.update({
+                'our_avg_verify_time': our_verify_time / num_verifications,
+                'baseline_avg_verify_time': baseline_verify_time / num_verifications,
+                'our_avg_batched_verify_time': our_batched_verify_time / num_verifications,
+                'baseline_avg_batched_verify_time': baseline_batched_verify_time / num_verifications,
+                'filter_avg_verify_time': filter_verify_time / num_verifications,
+                'our_batched_verify_bytes': our_batched_verify_bytes,
+                'baseline_batched_verify_bytes': baseline_batched_verify_bytes,
+                'filter_verify_bytes': filter_verify_bytes,
+                'filter_bytes': filter_bytes,
+                'filter_build_time': filter_build_time,
+                'filter_chain_checks': verifier.chain_checks,
+                'filter_false_positives': verifier.false_positives,
+            })
+        results.append(row)
         logging.info(f"Size {size}: Verification stats collected.")
 
-    df_results = pd.DataFrame(results)
-    results_path = os.path.join(DATA_DIR, "exp5_revocation_scalability.csv")
+    helper.gas_cache.to_csv(os.path.join(data_dir, "exp5_gas_cache.csv"))
+    logging.info(f"Gas cache: {helper.gas_cache.stats()}")
+
+    df_results = pd.DataFrame(results).sort_values('revocation_size')
+    if gas_only:
+        results_path = os.path.join(data_dir, "exp5_revocation_gas.csv")
+        df_results.to_csv(results_path, index=False)
+        logging.info(f"Revocation gas results saved to {results_path}")
+        logging.info("--- Experiment 5 Finished ---")
+        return
+    results_path = os.path.join(data_dir, "exp5_revocation_scalability.csv")
     df_results.to_csv(results_path, index=False)
     logging.info(f"Revocation mechanism efficiency results saved to {results_path}")
+    latency_path = os.path.join(data_dir, "exp5_latency_summary.csv")
+    pd.DataFrame(latency_rows).sort_values('revocation_size', kind='stable').to_csv(latency_path, index=False)
+    logging.info(f"Verification latency percentiles saved to {latency_path}")
     logging.info("--- Experiment 5 Finished ---")
 
+def run_experiment_5_registry(helper, gas_only=False, data_dir=DATA_DIR):
+    """
+    Experiment 5 (registry variant): revocation as a sparse Merkle root.
+
+    Grows a RevocationRegistry to every size in REGISTRY_REVOCATION_SIZES, publishing
+    REGISTRY_UPDATE_BATCH revocations per root update, and measures the revocation gas, the
+    proof sizes and the verification gas of revoked and non-revoked certificates. With
+    `gas_only`, proof generation and verification latency are not measured.
+
+    The registry does not recompute the roots it is given: publishRevocations is owner-only
+    and logs every update, and the measured costs assume that trust (column `root_trust`).
+
+    Raises:
+        RuntimeError: If the RevocationRegistry artifact has not been compiled
+    """
+    logging.info("--- Starting Experiment 5: Sparse Merkle Revocation Registry ---")
+    if not os.path.exists(REVOCATION_REGISTRY_ARTIFACT_PATH):
+        raise RuntimeError(f"{REVOCATION_REGISTRY_ARTIFACT_PATH} not found: run `npx hardhat compile`")
+    logging.info("Registry roots are computed off-chain and published by the owner; the contract does not recompute them")
+    os.makedirs(data_dir, exist_ok=True)
+
+    registry_factory = helper.get_contract_factory(REVOCATION_REGISTRY_ARTIFACT_PATH)
+    registry, deploy_gas = helper.deploy_contract("RevocationRegistry_Exp5", registry_factory, helper.account.address)
+    source = CertificateSource(seed=SYNTHETIC_SEED, label='exp5-registry')
+    samples = REGISTRY_VERIFY_QUERIES // 2
+    # Indices past the largest size are never revoked
+    valid_hashes = source.hashes(max(REGISTRY_REVOCATION_SIZES), max(REGISTRY_REVOCATION_SIZES) + samples)
+
+    def verify_call(proof):
+        """Returns the registry function and arguments that check a proof."""
+        if proof['revoked']:
+            return 'verifyRevoked', [proof['key'], proof['depth'], proof['bitmap'], proof['siblings']]
+        neighbor = proof['neighbor'] if proof['neighbor'] is not None else ZERO
+        return 'verifyNotRevoked', [proof['key'], neighbor, proof['depth'], proof['bitmap'], proof['siblings']]
+
+    tree = SparseMerkleTree()
+    results, latency_rows = [], []
+    revoked = 0
+    for size in REGISTRY_REVOCATION_SIZES:
+        logging.info(f"Publishing revocations up to {size} in the registry...")
+        update_gas, updates, tree_update_time = 0, 0, 0.0
+        for chunk in source.iter_blocks(revoked, size, block_size=REGISTRY_UPDATE_BATCH):
+            previous_root = tree.root
+            start_time = time.time()
+            tree.add_many(chunk)
+            new_root = tree.root
+            tree_update_time += time.time() - start_time
+            receipt = helper.w3.eth.wait_for_transaction_receipt(
+                registry.functions.publishRevocations(previous_root, new_root, chunk).transact()
+            )
+            update_gas += receipt.gasUsed
+            updates += 1
+        new_revocations = size - revoked
+        revoked = size
+        if registry.functions.root().call() != tree.root:
+            raise RuntimeError(f"Registry root diverged from the local tree at {size} revocations")
+
+        revoked_hashes = [source.hash_at(i) for i in range(0, size, max(1, size // samples))][:samples]
+        recorder = LatencyRecorder()
+        proofs = []
+        for cert_hash in revoked_hashes + valid_hashes:
+            with recorder.time('Registry: build proof'):
+                proofs.append(tree.prove(cert_hash))
+        membership = [p for p in proofs if p['revoked']]
+        non_membership = [p for p in proofs if not p['revoked']]
+        if len(membership) != len(revoked_hashes):
+            raise RuntimeError(f"The local tree is missing revocations at {size}")
+
+        transactions = [
+            {'from': helper.account.address, 'to': registry.address, 'data': registry.encodeABI(fn_name=fn_name, args=args)}
+            for fn_name, args in map(verify_call, proofs)
+        ]
+        if not all(decode(['bool'], data)[0] for data in helper.rpc_batch.eth_call_many(transactions)):
+            raise RuntimeError(f"The registry rejected a proof at {size} revocations")
+        verify_gas = helper.rpc_batch.estimate_gas_many(transactions)
+
+        row = {
+            'revocation_size': size,
+            'root_updates': updates,
+            'registry_gas_per_revocation': update_gas / new_revocations,
+            'registry_deploy_gas': deploy_gas,
+            'root_trust': REGISTRY_ROOT_TRUST,
+            'tree_update_seconds': tree_update_time,
+            'membership_proof_bytes': sum(len(encode_registry_proof(p)) for p in membership) / len(membership),
+            'non_membership_proof_bytes': sum(len(encode_registry_proof(p)) for p in non_membership) / len(non_membership),
+            'verify_revoked_gas': sum(verify_gas[:len(membership)]) / len(membership),
+            'verify_not_revoked_gas': sum(verify_gas[len(membership):]) / len(non_membership),
+        }
+        if not gas_only:
+            root = tree.root
+            for proof in proofs:
+                with recorder.time('Registry: local proof check'):
+                    verify_registry_proof(root, proof)
+                fn_name, args = verify_call(proof)
+                with recorder.time(f'Registry: {fn_name}'):
+                    registry.get_function_by_name(fn_name)(*args).call()
+            row.update({
+                'avg_prove_time': recorder.histogram('Registry: build proof').mean(),
+                'avg_local_verify_time': recorder.histogram('Registry: local proof check').mean(),
+                'avg_verify_revoked_time': recorder.histogram('Registry: verifyRevoked').mean(),
+                'avg_verify_not_revoked_time': recorder.histogram('Registry: verifyNotRevoked').mean(),
+            })
+            latency_rows.extend(recorder.summary(revocation_size=size))
+        results.append(row)
+        logging.info(f"Size {size}: {row['registry_gas_per_revocation']:.1f} gas per revocation, "
+                     f"{row['membership_proof_bytes']:.0f}-byte membership proofs")
+
+    results_path = os.path.join(data_dir, "exp5_registry_scalability.csv")
+    pd.DataFrame(results).to_csv(results_path, index=False)
+    logging.info(f"Registry results saved to {results_path}")
+    if latency_rows:
+        latency_path = os.path.join(data_dir, "exp5_registry_latency.csv")
+        pd.DataFrame(latency_rows).to_csv(latency_path, index=False)
+        logging.info(f"Registry verification latency percentiles saved to {latency_path}")
+    logging.info("--- Experiment 5 (Registry) Finished ---")
+
 # --- Main Execution Logic ---
 def main():
     """Main function to run the entire simulation suite."""
@@ -374,12 +1128,13 @@ def main():
     try:
         helper = BlockchainHelper(HARDHAT_RPC_URL, DEPLOYER_PRIVATE_KEY)
 
-        logging.info(f"Loading dataset from {DATASET_PATH}...")
-        if not os.path.exists(DATASET_PATH):
+        if not os.path.exists(DATASET_PATH) and not HashStore.exists(HASH_STORE_DIR):
             logging.error(f"Dataset not found. Please run generate_dataset.py first.")
             return
-        dataset = pd.read_csv(DATASET_PATH)
-        logging.info(f"Dataset loaded with {len(dataset)} records.")
+        # Exp1-3 only read hashes; Exp4 needs one full record
+        dataset = open_hash_store()
+        logging.info(f"Dataset opened with {len(dataset)} records.")
+        record_sample = load_dataset(nrows=1)
 
         # --- Get Contract Factories ---
         cert_factory = helper.get_contract_factory(CERTIFICATE_ARTIFACT_PATH)
@@ -413,9 +1168,11 @@ def main():
         total_issued_certificates = on_chain_certificate_count + newly_issued
         logging.info(f"Total certificates issued after Exp 3: {total_issued_certificates}")
 
-        run_experiment_4_storage(helper, cert_contract_exp1, cert_onchain_contract_exp4, dataset, deploy_gas_hybrid, deploy_gas_onchain)
+        run_experiment_4_storage(helper, cert_contract_exp1, cert_onchain_contract_exp4, record_sample, deploy_gas_hybrid, deploy_gas_onchain)
+        run_experiment_4_batch_anchoring(helper, cert_contract_exp1, cert_onchain_contract_exp4, record_sample)
         
         run_experiment_5_revocation(helper, cert_factory, baseline_revocation_factory)
+        run_experiment_5_registry(helper)
         
         logging.info("\n--- Note on Experiment 6: Node Fault Recovery Test ---")
         logging.info("This experiment is designed to be run separately as it requires managing multiple Hardhat nodes.")
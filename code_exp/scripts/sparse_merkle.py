@@ -0,0 +1,197 @@
+"""
+Sparse Merkle Revocation Tree
+
+RevocationRegistry.sol stores a single root: that of a sparse Merkle tree over
+the 256-bit space of certificate hashes in which every revoked hash is a
+leaf. SparseMerkleTree maintains the tree off-chain, applies many revocations
+per root update and produces membership ("revoked") and non-membership ("not
+revoked") proofs that the contract can check.
+
+The tree is compacted so that a Python client can hold 100,000 revocations:
+
+- an empty subtree hashes to zero;
+- a subtree holding a single key is replaced by that key's leaf,
+  keccak256(0x01 || key), at whatever depth the subtree starts; the 33-byte
+  preimage keeps leaves distinct from inner nodes, keccak256(left || right);
+- a proof lists the non-zero siblings from the leaf up, plus a bitmap of
+  which depths have one, so it holds about log2(revocations) hashes instead
+  of 256.
+
+A non-membership proof ends either at an empty subtree or at the leaf of
+another revoked key that shares the path so far (the `neighbor`).
+"""
+
+from bisect import bisect_left, insort
+
+from eth_hash.auto import keccak
+
+DEPTH = 256
+ZERO = b'\x00' * 32
+LEAF_PREFIX = b'\x01'
+
+def leaf_hash(key):
+    """Return the leaf of a revoked certificate hash."""
+    return keccak(LEAF_PREFIX + bytes(key))
+
+def _node_hash(left, right):
+    return keccak(left + right)
+
+def _bit(key, depth):
+    """Return the bit of an integer key that selects the child below `depth` (0 is the most significant)."""
+    return (key >> (DEPTH - 1 - depth)) & 1
+
+def compute_root(key, node, depth, bitmap, siblings):
+    """
+    Hash from a node at `depth` on the path of `key` up to the root.
+
+    Args:
+        key (bytes): Certificate hash whose bits select the path
+        node (bytes): Hash of the node at `depth`
+        depth (int): Depth of that node; the root is at depth 0
+        bitmap (int): Bit d is set if the sibling of the path node at depth d + 1 is non-zero
+        siblings (list): The non-zero siblings, deepest first
+
+    Returns:
+        bytes: The root these values hash to
+    """
+    key = int.from_bytes(bytes(key), 'big')
+    remaining = iter(siblings)
+    for d in range(depth - 1, -1, -1):
+        sibling = next(remaining) if (bitmap >> d) & 1 else ZERO
+        node = _node_hash(sibling, node) if _bit(key, d) else _node_hash(node, sibling)
+    return node
+
+def verify_proof(root, proof):
+    """
+    Check a proof from SparseMerkleTree.prove() against a root, as the registry contract does.
+
+    Returns:
+        bool: True if the proof shows `proof['key']` is revoked (or not revoked, per `proof['revoked']`)
+    """
+    key = bytes(proof['key'])
+    if proof['revoked']:
+        node = leaf_hash(key)
+    elif proof['neighbor'] is None:
+        node = ZERO
+    else:
+        neighbor = bytes(proof['neighbor'])
+        shared = int.from_bytes(neighbor, 'big') ^ int.from_bytes(key, 'big')
+        if neighbor == key or (proof['depth'] and shared >> (DEPTH - proof['depth'])):
+            return False
+        node = leaf_hash(neighbor)
+    return compute_root(key, node, proof['depth'], proof['bitmap'], proof['siblings']) == bytes(root)
+
+def encode_proof(proof):
+    """
+    Pack a proof as it would be handed to a verifier.
+
+    Layout: depth (2 bytes), bitmap (32 bytes), an optional 32-byte neighbor
+    (non-membership proofs ending at another leaf), then the siblings.
+    """
+    header = proof['depth'].to_bytes(2, 'big') + proof['bitmap'].to_bytes(32, 'big')
+    neighbor = bytes(proof['neighbor']) if proof['neighbor'] is not None else b''
+    return header + neighbor + b''.join(proof['siblings'])
+
+class SparseMerkleTree:
+    """Compacted sparse Merkle tree of revoked certificate hashes."""
+
+    def __init__(self, keys=()):
+        """
+        Initialize the tree.
+
+        Args:
+            keys (iterable): Revoked certificate hashes to start with
+        """
+        self._keys = []   # Sorted integer keys
+        self._leaves = {}  # Integer key -> leaf hash
+        self._cache = {}  # (depth, prefix) -> hash of an inner node holding two or more keys
+        self._cache_depth = 0  # One past the deepest inner node ever cached; nothing below needs invalidating
+        self.add_many(keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        key = int.from_bytes(bytes(key), 'big')
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    @property
+    def root(self):
+        return self._node(0, 0, len(self._keys))
+
+    def add(self, key):
+        return self.add_many([key])
+
+    def add_many(self, keys):
+        """
+        Revoke many certificate hashes; only the paths of the new keys are rehashed.
+
+        Returns:
+            int: Number of keys that were not revoked yet
+        """
+        added = 0
+        for key in keys:
+            if key in self:
+                continue
+            value = int.from_bytes(bytes(key), 'big')
+            insort(self._keys, value)
+            self._leaves[value] = leaf_hash(bytes(key))
+            for depth in range(self._cache_depth):
+                self._cache.pop((depth, value >> (DEPTH - depth)), None)
+            added += 1
+        return added
+
+    def _split(self, depth, lo, hi):
+        """Return the index of the first key in [lo, hi) that goes right below `depth`."""
+        prefix = self._keys[lo] >> (DEPTH - depth)
+        threshold = ((prefix << 1) | 1) << (DEPTH - 1 - depth)
+        return bisect_left(self._keys, threshold, lo, hi)
+
+    def _node(self, depth, lo, hi):
+        """Return the hash of the subtree at `depth` that holds the keys in [lo, hi)."""
+        if hi == lo:
+            return ZERO
+        if hi - lo == 1:
+            return self._leaves[self._keys[lo]]
+        cache_key = (depth, self._keys[lo] >> (DEPTH - depth))
+        node = self._cache.get(cache_key)
+        if node is None:
+            mid = self._split(depth, lo, hi)
+            node = _node_hash(self._node(depth + 1, lo, mid), self._node(depth + 1, mid, hi))
+            self._cache[cache_key] = node
+            self._cache_depth = max(self._cache_depth, depth + 1)
+        return node
+
+    def prove(self, key):
+        """
+        Return a membership proof if `key` is revoked, a non-membership proof otherwise.
+
+        Returns:
+            dict: 'key', 'revoked', 'depth', 'bitmap', 'siblings' (deepest first) and
+                'neighbor' (the other revoked key a non-membership proof ends at, or None)
+        """
+        key = bytes(key)
+        value = int.from_bytes(key, 'big')
+        lo, hi, depth = 0, len(self._keys), 0
+        path = []  # Siblings from the root down
+        while hi - lo > 1:
+            mid = self._split(depth, lo, hi)
+            if _bit(value, depth):
+                path.append(self._node(depth + 1, lo, mid))
+                lo = mid
+            else:
+                path.append(self._node(depth + 1, mid, hi))
+                hi = mid
+            depth += 1
+        # The path now ends at an empty subtree (no keys left) or at a single leaf
+        revoked = hi - lo == 1 and self._keys[lo] == value
+        neighbor = self._keys[lo].to_bytes(32, 'big') if hi - lo == 1 and not revoked else None
+
+        bitmap, siblings = 0, []
+        for d in range(depth - 1, -1, -1):
+            if path[d] != ZERO:
+                bitmap |= 1 << d
+                siblings.append(path[d])
+        return {'key': key, 'revoked': revoked, 'depth': depth, 'bitmap': bitmap,
+                'siblings': siblings, 'neighbor': neighbor}
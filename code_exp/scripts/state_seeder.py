@@ -0,0 +1,148 @@
+"""
+Direct Storage Seeding for Certificate.sol
+
+Lookup benchmarks need a large `_certificates` mapping, not a million mined
+issuance transactions. StateSeeder writes the mapping entries straight into
+the contract's storage with `hardhat_setStorageAt`, packed into JSON-RPC
+batches, and bumps `_certificateCount` to match. A sample of the seeded
+hashes is then read back through `getCertificateStatus` to confirm the
+computed layout matches the deployed contract.
+
+Storage layout of Certificate.sol (OpenZeppelin v5 Ownable first):
+
+    slot 0   Ownable._owner
+    slot 1   mapping(bytes32 => CertificateDetails) _certificates
+    slot 2-3 EnumerableSet.AddressSet _institutions (_values, _positions)
+    slot 4   uint256 _certificateCount
+
+A mapping entry lives at keccak256(key ‖ uint256(1)). CertificateDetails
+occupies two slots from there: `status` (uint8) and `issuingInstitution`
+packed into the first (status in the lowest byte, the address above it), the
+timestamp in the second. Seeded certificates emit no events.
+"""
+
+import logging
+
+from eth_hash.auto import keccak
+from tqdm import tqdm
+from web3 import Web3
+
+OWNER_SLOT = 0
+CERTIFICATES_SLOT = 1
+CERTIFICATE_COUNT_SLOT = 4
+STATUS_ISSUED = 1
+STATUS_REVOKED = 2
+DEFAULT_VERIFY_SAMPLE = 32
+
+class SeedingError(Exception):
+    pass
+
+def certificate_slot(cert_hash, mapping_slot=CERTIFICATES_SLOT):
+    """Return the first storage slot of `_certificates[cert_hash]` as an int."""
+    return int.from_bytes(keccak(bytes(cert_hash) + mapping_slot.to_bytes(32, 'big')), 'big')
+
+def pack_details(status, institution):
+    """Return the first CertificateDetails word: status in the lowest byte, the institution above it."""
+    return status | (int(institution, 16) << 8)
+
+def _quantity(value):
+    return hex(value)  # Slot positions are quantities without leading zeros
+
+def _word(value):
+    return '0x' + value.to_bytes(32, 'big').hex()
+
+class StateSeeder:
+    """Writes certificates into a deployed Certificate contract's storage in JSON-RPC batches."""
+
+    def __init__(self, rpc, contract_address, institution):
+        """
+        Initialize the StateSeeder.
+
+        Args:
+            rpc (BatchRpcClient): Batch client of a Hardhat node
+            contract_address (str): Address of the deployed Certificate contract
+            institution (str): Address recorded as the issuing institution
+        """
+        self.rpc = rpc
+        self.address = Web3.to_checksum_address(contract_address)
+        self.institution = Web3.to_checksum_address(institution)
+        self.seeded = 0
+
+    def _read_slot(self, slot):
+        return int(self.rpc.request('eth_getStorageAt', [self.address, _quantity(slot), 'latest']), 16)
+
+    def _write_slot_calls(self, cert_hash, status, timestamp):
+        slot = certificate_slot(cert_hash)
+        return [
+            ('hardhat_setStorageAt', [self.address, _quantity(slot), _word(pack_details(status, self.institution))]),
+            ('hardhat_setStorageAt', [self.address, _quantity(slot + 1), _word(timestamp)]),
+        ]
+
+    def check_layout(self, owner):
+        """
+        Confirm slot 0 holds the contract owner, i.e. the assumed layout applies.
+
+        Raises:
+            SeedingError: If slot 0 does not hold `owner`
+        """
+        stored = self._read_slot(OWNER_SLOT)
+        if stored != int(owner, 16):
+            raise SeedingError(f"Unexpected storage layout at {self.address}: slot 0 is {hex(stored)}, not the owner {owner}")
+
+    def certificate_count(self):
+        """Return `_certificateCount` as read from storage."""
+        return self._read_slot(CERTIFICATE_COUNT_SLOT)
+
+    def seed(self, blocks, status=STATUS_ISSUED, timestamp=None, total=None, desc=None):
+        """
+        Write certificates into storage and raise `_certificateCount` accordingly.
+
+        The hashes must not be issued yet; existing entries would be overwritten and
+        counted twice.
+
+        Args:
+            blocks (iterable): Lists of 32-byte certificate hashes, e.g. CertificateSource.iter_blocks()
+            status (int): STATUS_ISSUED or STATUS_REVOKED
+            timestamp (int): Issue timestamp to record; the latest block's if None
+            total (int): Optional number of hashes, for the progress bar
+            desc (str): Optional progress bar description
+
+        Returns:
+            int: Number of certificates written
+        """
+        if timestamp is None:
+            timestamp = int(self.rpc.request('eth_getBlockByNumber', ['latest', False])['timestamp'], 16)
+        count_before = self.certificate_count()
+        written = 0
+        with tqdm(total=total, desc=desc or "Seeding certificates", unit='cert') as progress:
+            for block in blocks:
+                calls = [call for cert_hash in block for call in self._write_slot_calls(cert_hash, status, timestamp)]
+                self.rpc.execute(calls)
+                written += len(block)
+                progress.update(len(block))
+        self.rpc.execute([
+            ('hardhat_setStorageAt', [self.address, _quantity(CERTIFICATE_COUNT_SLOT), _word(count_before + written)])
+        ])
+        self.seeded += written
+        logging.info(f"Seeded {written} certificates into {self.address} storage ({count_before + written} in total)")
+        return written
+
+    def verify(self, contract, sample_hashes, status=STATUS_ISSUED):
+        """
+        Read seeded certificates back through getCertificateStatus.
+
+        Args:
+            contract (Contract): The Certificate contract at this seeder's address
+            sample_hashes (list): Seeded hashes to check
+            status (int): Expected status
+
+        Raises:
+            SeedingError: If any certificate does not read back as seeded
+        """
+        for cert_hash in sample_hashes:
+            cert_status, institution, _ = contract.functions.getCertificateStatus(cert_hash).call()
+            if cert_status != status or Web3.to_checksum_address(institution) != self.institution:
+                raise SeedingError(
+                    f"Seeded certificate {Web3.to_hex(cert_hash)} reads back as status {cert_status} from {institution}"
+                )
+        logging.info(f"Verified {len(sample_hashes)} seeded certificates through getCertificateStatus")
@@ -0,0 +1,279 @@
+"""
+Transaction Pipeline for Bulk Certificate Operations
+
+This module provides a local nonce manager and a pipelined transaction sender.
+Instead of blocking on every receipt before sending the next transaction, the
+pipeline assigns nonces locally, keeps a configurable window of transactions in
+flight and collects their receipts in a background thread.
+"""
+
+import time
+import heapq
+import queue
+import logging
+import threading
+
+from tqdm import tqdm
+
+class NonceManager:
+    """Tracks the next nonce of an account locally and repairs gaps left by failed sends."""
+
+    def __init__(self, w3, address):
+        """
+        Initialize the NonceManager.
+
+        Args:
+            w3 (Web3): The Web3 instance used to query and repair the account state
+            address (str): The account whose nonces are managed
+        """
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+        self._released = []  # Min-heap of nonces that never reached the node
+
+    def _pending_count(self):
+        return self.w3.eth.get_transaction_count(self.address, 'pending')
+
+    def sync(self):
+        """
+        Reconcile the local state with the node.
+
+        Released nonces that the node has already consumed are dropped and the next
+        nonce is moved forward if transactions were sent outside of this manager.
+
+        Returns:
+            int: The next fresh nonce that will be allocated
+        """
+        pending = self._pending_count()
+        with self._lock:
+            self._released = [n for n in self._released if n >= pending]
+            heapq.heapify(self._released)
+            if self._next_nonce is None or self._next_nonce < pending:
+                self._next_nonce = pending
+            return self._next_nonce
+
+    def reset(self):
+        """Discard all local state and reload the next nonce from the node (e.g. after a chain revert)."""
+        with self._lock:
+            self._released = []
+            self._next_nonce = None
+        return self.sync()
+
+    def allocate(self):
+        """
+        Allocate a nonce for a new transaction. Released nonces are reused first.
+
+        Returns:
+            int: The nonce to use
+        """
+        if self._next_nonce is None:
+            self.sync()
+        with self._lock:
+            if self._released:
+                return heapq.heappop(self._released)
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def release(self, nonce):
+        """
+        Hand back a nonce whose transaction failed to send.
+
+        The nonce is only recycled if the node did not consume it; a transaction that
+        reverted while being mined still uses up its nonce.
+
+        Args:
+            nonce (int): The nonce of the failed transaction
+
+        Returns:
+            bool: True if the nonce was recycled, False if it was already consumed
+        """
+        if self._pending_count() > nonce:
+            return False
+        with self._lock:
+            if nonce not in self._released:
+                heapq.heappush(self._released, nonce)
+        return True
+
+    def has_gaps(self):
+        """Return True if there are released nonces that still need to be filled."""
+        with self._lock:
+            return bool(self._released)
+
+    def repair_gaps(self, timeout=120):
+        """
+        Fill every released nonce with a zero-value self-transfer.
+
+        Transactions with a higher nonce stay queued in the node until the gap below
+        them is closed, so this must run before the pipeline reports completion.
+
+        Args:
+            timeout (int): Seconds to wait for each filler transaction to be mined
+
+        Returns:
+            int: The number of gaps that were filled
+        """
+        self.sync()
+        filled = 0
+        while True:
+            with self._lock:
+                if not self._released:
+                    break
+                nonce = heapq.heappop(self._released)
+            logging.warning(f"Repairing nonce gap {nonce} for {self.address} with a filler transaction")
+            tx_hash = self.w3.eth.send_transaction({
+                'from': self.address,
+                'to': self.address,
+                'value': 0,
+                'nonce': nonce,
+                'gas': 21000,
+            })
+            self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+            filled += 1
+        return filled
+
+class TransactionPipeline:
+    """Sends contract transactions with locally assigned nonces, keeping a window of them in flight."""
+
+    def __init__(self, w3, nonce_manager, window=64, receipt_timeout=120, max_retries=3, gas_margin=1.2,
+                 tracker=None):
+        """
+        Initialize the TransactionPipeline.
+
+        Args:
+            w3 (Web3): The Web3 instance used to send transactions
+            nonce_manager (NonceManager): Nonce source for the sending account
+            window (int): Maximum number of transactions sent but not yet confirmed
+            receipt_timeout (int): Seconds to wait for a single receipt
+            max_retries (int): How often a failed send is retried before it is recorded as failed
+            gas_margin (float): Multiplier applied to the estimated gas of the first transaction
+            tracker (ConfirmationTracker): Block-driven receipt source; receipts are polled
+                per transaction if None
+        """
+        self.w3 = w3
+        self.nonce_manager = nonce_manager
+        self.window = window
+        self.receipt_timeout = receipt_timeout
+        self.max_retries = max_retries
+        self.gas_margin = gas_margin
+        self.tracker = tracker
+
+    def run(self, build_call, items, gas=None, desc=None):
+        """
+        Send one transaction per item and wait until all of them are confirmed.
+
+        Args:
+            build_call (callable): Maps an item to a contract function call,
+                e.g. ``lambda h: contract.functions.issueCertificate(h)``
+            items (iterable): The items to send
+            gas (int): Gas limit for every transaction. Only pass it if every item follows the
+                same code path (a first write into an empty slot or a larger batch chunk costs
+                more); if None, the gas of each item is estimated just before it is sent
+            desc (str): Optional progress bar description
+
+        Returns:
+            list: One result dict per item, in input order, with the keys
+                item, tx_hash, nonce, status, latency_seconds, block_number and error
+        """
+        items = list(items)
+        results = [None] * len(items)
+        if not items:
+            return results
+
+        self.nonce_manager.sync()
+        sender = self.nonce_manager.address
+
+        in_flight = threading.BoundedSemaphore(self.window)
+        pending = queue.Queue()
+        progress = tqdm(total=len(items), desc=desc) if desc else None
+
+        def collect_receipts():
+            while True:
+                entry = pending.get()
+                if entry is None:
+                    return
+                index, tx_hash, nonce, sent_at, confirmation = entry
+                try:
+                    if confirmation is not None:
+                        receipt = confirmation.result()
+                    else:
+                        receipt = self.w3.eth.wait_for_transaction_receipt(
+                            tx_hash, timeout=self.receipt_timeout, poll_latency=0.05
+                        )
+                    results[index].update({
+                        'status': receipt.status,
+                        'latency_seconds': time.time() - sent_at,
+                        'block_number': receipt.blockNumber,
+                    })
+                    if receipt.status != 1:
+                        results[index]['error'] = 'Transaction reverted'
+                except Exception as e:
+                    results[index].update({'status': 0, 'error': str(e)})
+                finally:
+                    in_flight.release()
+                    if progress:
+                        progress.update(1)
+
+        collector = threading.Thread(target=collect_receipts, daemon=True)
+        collector.start()
+
+        try:
+            for index, item in enumerate(items):
+                in_flight.acquire()
+                results[index] = {
+                    'item': item, 'tx_hash': None, 'nonce': None, 'status': 0,
+                    'latency_seconds': None, 'block_number': None, 'error': None,
+                }
+                call = build_call(item)
+                try:
+                    item_gas = gas if gas is not None else int(call.estimate_gas({'from': sender}) * self.gas_margin)
+                except Exception as e:
+                    # The item would revert (or the node is unreachable); nothing was sent.
+                    results[index]['error'] = str(e)
+                    tx_hash = None
+                else:
+                    tx_hash, nonce, sent_at = self._send_with_retries(call, sender, item_gas, results[index])
+                if tx_hash is None:
+                    in_flight.release()
+                    if progress:
+                        progress.update(1)
+                    continue
+                confirmation = self.tracker.watch(tx_hash, timeout=self.receipt_timeout) if self.tracker else None
+                pending.put((index, tx_hash, nonce, sent_at, confirmation))
+
+            if self.nonce_manager.has_gaps():
+                # Transactions above a gap are queued by the node until it is filled.
+                self.nonce_manager.repair_gaps(timeout=self.receipt_timeout)
+        finally:
+            pending.put(None)
+            collector.join()
+            if progress:
+                progress.close()
+
+        failed = sum(1 for r in results if r['status'] != 1)
+        if failed:
+            logging.warning(f"Pipeline finished with {failed}/{len(items)} failed transactions")
+        return results
+
+    def _send_with_retries(self, call, sender, gas, result):
+        """Send a transaction, recycling its nonce and retrying if the send itself fails."""
+        for attempt in range(1, self.max_retries + 1):
+            nonce = self.nonce_manager.allocate()
+            try:
+                sent_at = time.time()
+                tx_hash = call.transact({'from': sender, 'nonce': nonce, 'gas': gas})
+                result.update({'tx_hash': tx_hash, 'nonce': nonce, 'error': None})
+                return tx_hash, nonce, sent_at
+            except Exception as e:
+                recycled = self.nonce_manager.release(nonce)
+                result['error'] = str(e)
+                logging.warning(
+                    f"Send attempt {attempt}/{self.max_retries} failed (nonce {nonce}, "
+                    f"{'recycled' if recycled else 'consumed'}): {e}"
+                )
+                if not recycled:
+                    # The node mined the transaction (e.g. it reverted); retrying would repeat it.
+                    return None, nonce, None
+                self.nonce_manager.sync()
+        return None, None, None
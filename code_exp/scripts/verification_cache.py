@@ -0,0 +1,189 @@
+"""
+Event-Invalidated Verification Cache
+
+Verification traffic is repetitive: the same popular certificates are checked
+again and again. VerificationCache keeps getCertificateStatus results in a
+bounded LRU with a time-to-live, and drops an entry as soon as a
+CertificateIssued or CertificateRevoked event for its hash shows up in the
+contract's logs.
+
+Every entry remembers the block its status was read at (`as_of`), and
+invalidation polls eth_getLogs over the blocks since the previous poll. An
+event removes an entry only if it was mined after the entry's block, so a
+load racing a poll can neither lose an invalidation nor be dropped needlessly.
+
+Staleness is bounded by `max_staleness`: a cached status is only served if
+the last completed poll started at most that many seconds ago; otherwise the
+cache polls first. A revocation mined at time T is therefore reflected in
+every answer given after T + max_staleness. A background thread (start())
+can keep polling so that hits rarely wait for a poll.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from web3 import Web3
+
+from event_indexer import ISSUED_TOPIC, REVOKED_TOPIC
+
+DEFAULT_CAPACITY = 100_000
+DEFAULT_TTL = 300.0          # Seconds an entry may be served at most, events or not
+DEFAULT_MAX_STALENESS = 1.0  # Seconds a served status may lag behind the chain
+
+class VerificationCache:
+    """LRU + TTL cache of certificate statuses, invalidated by the contract's events."""
+
+    def __init__(self, load_many, rpc, contract_address, capacity=DEFAULT_CAPACITY, ttl=DEFAULT_TTL,
+                 max_staleness=DEFAULT_MAX_STALENESS, clock=time.monotonic):
+        """
+        Initialize the VerificationCache.
+
+        Args:
+            load_many (callable): Called with (hashes, block) and returns the (status, institution,
+                timestamp) of every hash as of that block, e.g. batched getCertificateStatus calls
+            rpc (BatchRpcClient): Client used for eth_blockNumber and eth_getLogs
+            contract_address (str): Address of the Certificate contract
+            capacity (int): Maximum number of cached statuses
+            ttl (float): Seconds after which an entry is reloaded regardless of events
+            max_staleness (float): Seconds a served status may lag behind the chain
+            clock (callable): Monotonic time source
+        """
+        self.load_many = load_many
+        self.rpc = rpc
+        self.address = Web3.to_checksum_address(contract_address)
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # hash -> (status tuple, as_of block, loaded at)
+        self._polled_through = self._head()
+        self._last_poll = self.clock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.polls = 0
+
+    def _head(self):
+        return int(self.rpc.request('eth_blockNumber', []), 16)
+
+    def poll(self):
+        """
+        Drop every entry whose certificate had an event mined after the entry was read.
+
+        Returns:
+            int: Number of entries invalidated
+        """
+        with self._lock:
+            started = self.clock()
+            head = self._head()
+            invalidated = 0
+            if head > self._polled_through:
+                logs = self.rpc.request('eth_getLogs', [{
+                    'address': [self.address], 'fromBlock': hex(self._polled_through + 1), 'toBlock': hex(head),
+                    'topics': [[ISSUED_TOPIC, REVOKED_TOPIC]],
+                }])
+                for log in logs:
+                    cert_hash = bytes.fromhex(log['topics'][1][2:])
+                    entry = self._entries.get(cert_hash)
+                    if entry is not None and entry[1] < int(log['blockNumber'], 16):
+                        del self._entries[cert_hash]
+                        invalidated += 1
+                self._polled_through = head
+            self._last_poll = started
+            self.polls += 1
+            self.invalidations += invalidated
+            return invalidated
+
+    def get(self, cert_hash):
+        """Return (status, institution, timestamp) of one certificate; see get_many()."""
+        return self.get_many([cert_hash])[0]
+
+    def get_many(self, cert_hashes):
+        """
+        Return (status, institution, timestamp) for every hash, loading the misses in one batch.
+
+        Returns:
+            list: Status tuples in the order of `cert_hashes`
+        """
+        keys = [bytes(h) for h in cert_hashes]
+        with self._lock:
+            if self.clock() - self._last_poll > self.max_staleness:
+                self.poll()
+            now = self.clock()
+            results = [None] * len(keys)
+            missing = {}  # hash -> positions
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[2] > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    missing.setdefault(key, []).append(i)
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    results[i] = entry[0]
+                    self.hits += 1
+
+            if missing:
+                as_of = self._head()
+                values = self.load_many(list(missing), hex(as_of))
+                loaded_at = self.clock()
+                for (key, positions), value in zip(missing.items(), values):
+                    value = tuple(value)
+                    for i in positions:
+                        results[i] = value
+                    self._entries[key] = (value, as_of, loaded_at)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return results
+
+    def start(self, interval=None):
+        """Poll for events in a background thread, every `interval` seconds (default: half the staleness bound)."""
+        if self._thread is not None:
+            return
+        interval = interval if interval is not None else self.max_staleness / 2
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval):
+        while not self._stop_event.wait(interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logging.warning(f"Verification cache poll failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit, miss, eviction, expiration and invalidation counters and the hit rate as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'polls': self.polls,
+        }
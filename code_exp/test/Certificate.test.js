@@ -0,0 +1,70 @@
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+const { anyUint } = require("@nomicfoundation/hardhat-chai-matchers/withArgs");
+
+const ISSUED = 1n;
+const REVOKED = 2n;
+
+function hashes(label, count) {
+  return Array.from({ length: count }, (_, i) => ethers.id(`${label}-${i}`));
+}
+
+describe("Certificate array entry points", function () {
+  let certificate;
+  let owner;
+  let outsider;
+
+  beforeEach(async function () {
+    [owner, outsider] = await ethers.getSigners();
+    certificate = await ethers.deployContract("Certificate", [owner.address]);
+    await certificate.addInstitution(owner.address);
+  });
+
+  it("issues every certificate of issueCertificates with one event each", async function () {
+    const batch = hashes("issue", 5);
+    const tx = certificate.issueCertificates(batch);
+    for (const hash of batch) {
+      await expect(tx).to.emit(certificate, "CertificateIssued").withArgs(hash, owner.address, anyUint);
+    }
+    expect(await certificate.getCertificateCount()).to.equal(5n);
+    for (const hash of batch) {
+      expect((await certificate.getCertificateStatus(hash))[0]).to.equal(ISSUED);
+    }
+  });
+
+  it("rejects a batch containing an issued certificate as a whole", async function () {
+    const batch = hashes("duplicate", 3);
+    await certificate.issueCertificate(batch[1]);
+    await expect(certificate.issueCertificates(batch)).to.be.revertedWith("Certificate already exists");
+    expect((await certificate.getCertificateStatus(batch[0]))[0]).to.equal(0n);
+  });
+
+  it("revokes every certificate of revokeCertificates", async function () {
+    const batch = hashes("revoke", 4);
+    await certificate.issueCertificates(batch);
+    await expect(certificate.revokeCertificates(batch.slice(0, 2)))
+      .to.emit(certificate, "CertificateRevoked");
+    const [statuses] = await certificate.getCertificateStatuses(batch);
+    expect(statuses).to.deep.equal([REVOKED, REVOKED, ISSUED, ISSUED]);
+    await expect(certificate.revokeCertificates(batch.slice(1, 3)))
+      .to.be.revertedWith("Certificate not in issued state");
+  });
+
+  it("returns statuses, institutions and timestamps in input order", async function () {
+    const batch = hashes("status", 3);
+    await certificate.issueCertificates(batch.slice(0, 2));
+    const [statuses, institutions, timestamps] = await certificate.getCertificateStatuses(batch);
+    expect(statuses).to.deep.equal([ISSUED, ISSUED, 0n]);
+    expect(institutions).to.deep.equal([owner.address, owner.address, ethers.ZeroAddress]);
+    expect(timestamps[0]).to.be.greaterThan(0n);
+    expect(timestamps[2]).to.equal(0n);
+  });
+
+  it("restricts the batch transactions to institutions", async function () {
+    const batch = hashes("outsider", 2);
+    await expect(certificate.connect(outsider).issueCertificates(batch))
+      .to.be.revertedWith("Caller is not an authorized institution");
+    await expect(certificate.connect(outsider).revokeCertificates(batch))
+      .to.be.revertedWith("Caller is not an authorized institution");
+  });
+});
@@ -0,0 +1,78 @@
+const path = require("path");
+const { execFileSync } = require("child_process");
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+
+const UNISSUED = 0n;
+const ISSUED = 1n;
+const REVOKED = 2n;
+
+// Trees and proofs come from scripts/merkle.py, so the test fails if it and the contract disagree
+const PYTHON = process.env.PYTHON || "python3";
+const BUILD_TREE = `
+import sys, json
+from web3 import Web3
+from merkle import MerkleTree
+hashes = [Web3.keccak(text=f"{sys.argv[1]}-{i}") for i in range(int(sys.argv[2]))]
+tree = MerkleTree(hashes)
+print(json.dumps({
+    "root": Web3.to_hex(tree.root),
+    "hashes": [Web3.to_hex(h) for h in hashes],
+    "proofs": [[Web3.to_hex(s) for s in tree.proof(h)] for h in hashes],
+}))
+`;
+
+function merkleBatch(label, size) {
+  const output = execFileSync(PYTHON, ["-c", BUILD_TREE, label, String(size)], {
+    cwd: path.join(__dirname, "..", "scripts"),
+  });
+  return JSON.parse(output.toString());
+}
+
+describe("Certificate Merkle batch anchoring", function () {
+  let certificate;
+  let owner;
+  let batch;
+
+  before(function () {
+    batch = merkleBatch("js-batch", 11);
+  });
+
+  beforeEach(async function () {
+    [owner] = await ethers.getSigners();
+    certificate = await ethers.deployContract("Certificate", [owner.address]);
+    await certificate.addInstitution(owner.address);
+    await certificate.anchorBatch(batch.root, batch.hashes.length);
+  });
+
+  it("verifies every member with its proof from merkle.py", async function () {
+    for (let i = 0; i < batch.hashes.length; i++) {
+      const [status, institution] = await certificate.verifyBatchMember(batch.root, batch.hashes[i], batch.proofs[i]);
+      expect(status).to.equal(ISSUED);
+      expect(institution).to.equal(owner.address);
+    }
+  });
+
+  it("rejects a hash that is not in the batch and an unknown root", async function () {
+    const outsider = ethers.id("not-in-batch");
+    expect((await certificate.verifyBatchMember(batch.root, outsider, batch.proofs[0]))[0]).to.equal(UNISSUED);
+    const other = merkleBatch("js-other", 4);
+    expect((await certificate.verifyBatchMember(other.root, other.hashes[0], other.proofs[0]))[0]).to.equal(UNISSUED);
+  });
+
+  it("revokes a single member and then the whole batch", async function () {
+    await certificate.revokeBatchMember(batch.root, batch.hashes[3], batch.proofs[3]);
+    expect((await certificate.verifyBatchMember(batch.root, batch.hashes[3], batch.proofs[3]))[0]).to.equal(REVOKED);
+    expect((await certificate.verifyBatchMember(batch.root, batch.hashes[4], batch.proofs[4]))[0]).to.equal(ISSUED);
+    await expect(certificate.revokeBatchMember(batch.root, batch.hashes[4], batch.proofs[3]))
+      .to.be.revertedWith("Invalid Merkle proof");
+
+    await certificate.revokeBatch(batch.root);
+    expect((await certificate.getBatchStatus(batch.root))[0]).to.equal(REVOKED);
+    expect((await certificate.verifyBatchMember(batch.root, batch.hashes[4], batch.proofs[4]))[0]).to.equal(REVOKED);
+  });
+
+  it("refuses to anchor the same root twice", async function () {
+    await expect(certificate.anchorBatch(batch.root, batch.hashes.length)).to.be.revertedWith("Batch already anchored");
+  });
+});
@@ -0,0 +1,112 @@
+const path = require("path");
+const { execFileSync } = require("child_process");
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+
+// Roots and proofs come from scripts/sparse_merkle.py, so the test fails if it and the contract disagree
+const PYTHON = process.env.PYTHON || "python3";
+const BUILD_UPDATES = `
+import sys, json
+from web3 import Web3
+from sparse_merkle import SparseMerkleTree
+
+def hx(value):
+    return Web3.to_hex(value) if value is not None else None
+
+def proof_json(proof):
+    return {"key": hx(proof["key"]), "revoked": proof["revoked"], "depth": proof["depth"],
+            "bitmap": str(proof["bitmap"]), "siblings": [hx(s) for s in proof["siblings"]],
+            "neighbor": hx(proof["neighbor"])}
+
+revoked = [bytes(Web3.keccak(text=f"{sys.argv[1]}-revoked-{i}")) for i in range(int(sys.argv[2]))]
+valid = [bytes(Web3.keccak(text=f"{sys.argv[1]}-valid-{i}")) for i in range(3)]
+# Shares every bit but the last with a revoked hash, so its proof ends at that neighbor's leaf
+valid.append(revoked[0][:-1] + bytes([revoked[0][-1] ^ 1]))
+
+tree, updates = SparseMerkleTree(), []
+half = len(revoked) // 2
+for chunk in (revoked[:half], revoked[half:]):
+    previous_root = tree.root
+    tree.add_many(chunk)
+    updates.append({"previousRoot": hx(previous_root), "newRoot": hx(tree.root), "hashes": [hx(h) for h in chunk]})
+print(json.dumps({
+    "updates": updates,
+    "proofs": [proof_json(tree.prove(key)) for key in revoked[:3] + valid],
+}))
+`;
+
+function registryUpdates(label, size) {
+  const output = execFileSync(PYTHON, ["-c", BUILD_UPDATES, label, String(size)], {
+    cwd: path.join(__dirname, "..", "scripts"),
+  });
+  return JSON.parse(output.toString());
+}
+
+function verify(registry, proof) {
+  if (proof.revoked) {
+    return registry.verifyRevoked(proof.key, proof.depth, proof.bitmap, proof.siblings);
+  }
+  return registry.verifyNotRevoked(proof.key, proof.neighbor || ethers.ZeroHash, proof.depth, proof.bitmap, proof.siblings);
+}
+
+describe("RevocationRegistry", function () {
+  let registry;
+  let owner;
+  let outsider;
+  let data;
+
+  before(function () {
+    data = registryUpdates("js-registry", 20);
+  });
+
+  beforeEach(async function () {
+    [owner, outsider] = await ethers.getSigners();
+    registry = await ethers.deployContract("RevocationRegistry", [owner.address]);
+  });
+
+  async function publishAll() {
+    for (const update of data.updates) {
+      await expect(registry.publishRevocations(update.previousRoot, update.newRoot, update.hashes))
+        .to.emit(registry, "RevocationsPublished");
+    }
+  }
+
+  it("tracks the root and count of published revocations", async function () {
+    await publishAll();
+    expect(await registry.root()).to.equal(data.updates[data.updates.length - 1].newRoot);
+    expect(await registry.revokedCount()).to.equal(20n);
+  });
+
+  it("accepts membership and non-membership proofs from sparse_merkle.py", async function () {
+    await publishAll();
+    const membership = data.proofs.filter((proof) => proof.revoked);
+    const nonMembership = data.proofs.filter((proof) => !proof.revoked);
+    expect(membership).to.have.length(3);
+    expect(nonMembership.some((proof) => proof.neighbor !== null)).to.equal(true);
+    for (const proof of data.proofs) {
+      expect(await verify(registry, proof)).to.equal(true);
+    }
+  });
+
+  it("rejects proofs against another root or for the opposite claim", async function () {
+    await registry.publishRevocations(data.updates[0].previousRoot, data.updates[0].newRoot, data.updates[0].hashes);
+    const [membership] = data.proofs;
+    expect(await verify(registry, membership)).to.equal(false);
+
+    await registry.publishRevocations(data.updates[1].previousRoot, data.updates[1].newRoot, data.updates[1].hashes);
+    const absent = data.proofs.find((proof) => !proof.revoked);
+    expect(await registry.verifyRevoked(absent.key, absent.depth, absent.bitmap, absent.siblings)).to.equal(false);
+    expect(await registry.verifyNotRevoked(membership.key, ethers.ZeroHash, membership.depth, membership.bitmap, membership.siblings))
+      .to.equal(false);
+  });
+
+  it("only accepts owner updates on top of the current root", async function () {
+    const [first, second] = data.updates;
+    await expect(registry.connect(outsider).publishRevocations(first.previousRoot, first.newRoot, first.hashes))
+      .to.be.revertedWithCustomError(registry, "OwnableUnauthorizedAccount");
+    await expect(registry.publishRevocations(second.previousRoot, second.newRoot, second.hashes))
+      .to.be.revertedWith("Stale revocation root");
+    await expect(registry.publishRevocations(first.previousRoot, first.newRoot, []))
+      .to.be.revertedWith("No revocations");
+  });
+});
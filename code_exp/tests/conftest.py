@@ -0,0 +1,53 @@
+"""
+Shared fixtures for the unit tests of scripts/.
+
+The scripts are flat modules that import each other by name, so their directory
+is put on the import path. Tests that need a chain run on eth-tester's in-process
+py-evm backend (see scripts/evm_backend.py); no Hardhat node is started.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+ARTIFACTS_DIR = os.path.join(ROOT_DIR, 'artifacts', 'contracts')
+# Hardhat's first default account; the in-process chain imports and funds it
+PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+def load_artifact(name):
+    """Return the compiled Hardhat artifact of contracts/<name>.sol."""
+    with open(os.path.join(ARTIFACTS_DIR, f'{name}.sol', f'{name}.json')) as f:
+        return json.load(f)
+
+@pytest.fixture
+def chain():
+    """A fresh in-process chain with the funded deployer as default account."""
+    pytest.importorskip('eth_tester')
+    from evm_backend import InProcessBackend
+
+    backend = InProcessBackend(PRIVATE_KEY)
+    w3 = backend.web3()
+    w3.eth.default_account = w3.eth.account.from_key(PRIVATE_KEY).address
+    yield backend
+    backend.close()
+
+def deploy(backend, name, *args):
+    """Deploy contracts/<name>.sol on an in-process chain and return the contract."""
+    w3 = backend.web3()
+    artifact = load_artifact(name)
+    factory = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor(*args).transact())
+    return backend.contract(receipt.contractAddress, artifact['abi'])
+
+@pytest.fixture
+def certificate(chain):
+    """A Certificate contract with the deployer authorized as an institution."""
+    w3 = chain.web3()
+    contract = deploy(chain, 'Certificate', w3.eth.default_account)
+    w3.eth.wait_for_transaction_receipt(contract.functions.addInstitution(w3.eth.default_account).transact())
+    return contract
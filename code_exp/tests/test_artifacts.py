@@ -0,0 +1,27 @@
+"""
+The compiled artifacts under artifacts/ are committed and loaded by the scripts,
+so they must declare every external function of the Solidity sources. A failure
+here means a contract changed without `npx hardhat compile` being rerun.
+"""
+
+import os
+import re
+
+import pytest
+
+from conftest import ARTIFACTS_DIR, ROOT_DIR, load_artifact
+
+CONTRACTS = sorted(name[:-len('.sol')] for name in os.listdir(os.path.join(ROOT_DIR, 'contracts')) if name.endswith('.sol'))
+
+def _source_functions(name):
+    with open(os.path.join(ROOT_DIR, 'contracts', f'{name}.sol')) as f:
+        source = f.read()
+    return set(re.findall(r'function\s+(\w+)\s*\([^)]*\)[^{;]*\b(?:external|public)\b', source))
+
+@pytest.mark.parametrize('name', CONTRACTS)
+def test_artifact_matches_source(name):
+    assert os.path.exists(os.path.join(ARTIFACTS_DIR, f'{name}.sol', f'{name}.json')), \
+        f"no artifact for contracts/{name}.sol; run `npx hardhat compile`"
+    abi_functions = {entry['name'] for entry in load_artifact(name)['abi'] if entry.get('type') == 'function'}
+    missing = _source_functions(name) - abi_functions
+    assert not missing, f"artifact of {name} is stale (missing {sorted(missing)}); run `npx hardhat compile`"
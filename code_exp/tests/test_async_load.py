@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from async_load import AsyncLoadEngine, LevelStats
+
+SENDERS = ['0x' + '11' * 20, '0x' + '22' * 20]
+
+class FakeEth:
+    """The part of AsyncWeb3.eth the nonce streams use."""
+
+    def __init__(self, pending_counts):
+        self.pending_counts = pending_counts
+
+    async def get_transaction_count(self, sender, block_identifier):
+        return self.pending_counts[sender]
+
+class FakeWeb3:
+    def __init__(self, pending_counts):
+        self.eth = FakeEth(pending_counts)
+
+def _engine(pending_counts):
+    engine = AsyncLoadEngine('http://unused', SENDERS[0], [], SENDERS)
+    engine.w3 = FakeWeb3(pending_counts)
+    for sender in SENDERS:
+        asyncio.run(engine._sync_nonce(sender))
+    return engine
+
+def test_level_stats_counts_successes_failures_and_error_types():
+    stats = LevelStats()
+    stats.record_success(0.25)
+    stats.record_success(0.5)
+    stats.record_failure(TimeoutError())
+    stats.record_failure(TimeoutError())
+    stats.record_failure(ValueError())
+    assert (stats.successful_tx, stats.failed_tx) == (2, 3)
+    assert stats.latency.total_count == 2
+    assert dict(stats.errors) == {'TimeoutError': 2, 'ValueError': 1}
+
+def test_each_sender_has_its_own_nonce_stream():
+    engine = _engine({SENDERS[0]: 5, SENDERS[1]: 0})
+    assert [engine._allocate_nonce(SENDERS[0]) for _ in range(3)] == [5, 6, 7]
+    assert [engine._allocate_nonce(SENDERS[1]) for _ in range(2)] == [0, 1]
+
+def test_released_nonce_is_reused_before_the_stream_advances():
+    engine = _engine({SENDERS[0]: 0, SENDERS[1]: 0})
+    nonces = [engine._allocate_nonce(SENDERS[0]) for _ in range(3)]
+    asyncio.run(engine._release_nonce(SENDERS[0], nonces[1]))
+    assert engine._allocate_nonce(SENDERS[0]) == 1
+    assert engine._allocate_nonce(SENDERS[0]) == 3
+
+def test_nonce_the_node_already_counted_is_not_released():
+    pending_counts = {SENDERS[0]: 0, SENDERS[1]: 0}
+    engine = _engine(pending_counts)
+    nonce = engine._allocate_nonce(SENDERS[0])
+    # A send that timed out on the client but reached the node
+    pending_counts[SENDERS[0]] = 1
+    asyncio.run(engine._release_nonce(SENDERS[0], nonce))
+    assert engine._allocate_nonce(SENDERS[0]) == 1
+
+def test_failed_send_releases_its_nonce():
+    engine = _engine({SENDERS[0]: 0, SENDERS[1]: 0})
+
+    class FailingCall:
+        async def transact(self, transaction):
+            raise ConnectionError("dropped")
+
+    class Functions:
+        def issueCertificate(self, cert_hash):
+            return FailingCall()
+
+    engine.contract = type('Contract', (), {'functions': Functions()})()
+    engine.gas = 100000
+    with pytest.raises(ConnectionError):
+        asyncio.run(engine.send_and_confirm(b'\x00' * 32, SENDERS[0]))
+    assert engine._allocate_nonce(SENDERS[0]) == 0
@@ -0,0 +1,60 @@
+import pytest
+from web3 import Web3
+
+from certificate_batch import (
+    CertificateBatchClient, chunk_size_for_gas, chunked, has_function, measure_linear_gas, require_functions
+)
+
+BATCH_FUNCTIONS = ('issueCertificates', 'revokeCertificates', 'getCertificateStatuses')
+
+def _hashes(label, count):
+    return [Web3.keccak(text=f"{label}-{i}") for i in range(count)]
+
+@pytest.fixture
+def batch_certificate(certificate):
+    """The Certificate contract, if its compiled ABI has the array entry points (see test_artifacts.py)."""
+    missing = [name for name in BATCH_FUNCTIONS if not has_function(certificate, name)]
+    if missing:
+        pytest.skip(f"stale Certificate artifact without {', '.join(missing)}; run `npx hardhat compile`")
+    return certificate
+
+def test_measure_linear_gas_recovers_fixed_and_per_item_gas():
+    base_gas, per_item_gas = measure_linear_gas(lambda items: 21000 + 500 * len(items), list(range(17)))
+    assert (base_gas, per_item_gas) == (21000, 500)
+
+def test_chunk_size_for_gas_respects_limit_and_bounds():
+    assert chunk_size_for_gas(1000, 100, 10_000, safety=0.5) == 40
+    assert chunk_size_for_gas(1000, 100, 10_000, safety=0.5, max_items=8) == 8
+    assert chunk_size_for_gas(10_000, 100, 10_000) == 1
+
+def test_chunked_keeps_order_and_remainder():
+    assert list(chunked(list(range(7)), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+def test_missing_entry_point_raises_instead_of_falling_back(chain, certificate):
+    abi = [entry for entry in certificate.abi if entry.get('name') not in BATCH_FUNCTIONS]
+    contract = chain.web3().eth.contract(address=certificate.address, abi=abi)
+    client = CertificateBatchClient(chain.web3(), contract)
+    with pytest.raises(RuntimeError, match='issueCertificates'):
+        client.issue_many(_hashes('missing', 3))
+    with pytest.raises(RuntimeError, match='getCertificateStatuses'):
+        client.get_statuses(_hashes('missing', 3))
+    with pytest.raises(RuntimeError, match='anchorBatch, verifyBatchMember'):
+        require_functions(contract, 'anchorBatch', 'verifyBatchMember')
+
+def test_issue_revoke_and_query_many_in_chunks(chain, batch_certificate):
+    hashes = _hashes('batch', 40)
+    client = CertificateBatchClient(chain.web3(), batch_certificate, tx_safety=0.01)
+    issued = client.issue_many(hashes)
+    # A tiny gas budget forces several issueCertificates transactions
+    assert len(issued) > 1
+    assert all(r['status'] == 1 for r in issued)
+    assert [h for r in issued for h in r['item']] == hashes
+
+    revoked = client.revoke_many(hashes[:5])
+    assert all(r['status'] == 1 for r in revoked)
+
+    statuses, institutions, timestamps = client.get_statuses(hashes + _hashes('unknown', 2))
+    assert statuses == [2] * 5 + [1] * 35 + [0] * 2
+    assert set(institutions[:40]) == {chain.web3().eth.default_account}
+    assert all(t > 0 for t in timestamps[:40]) and timestamps[40:] == [0, 0]
+    assert batch_certificate.functions.getCertificateCount().call() == 40
@@ -0,0 +1,41 @@
+import pytest
+from web3 import Web3
+
+from certificate_source import CertificateSource
+from hash_store import HashStore
+
+def _store(count):
+    return HashStore.from_hex([Web3.to_hex(Web3.keccak(text=f"stored-{i}")) for i in range(count)])
+
+def test_stored_indices_come_from_the_store_and_the_rest_is_synthesized():
+    store = _store(5)
+    source = CertificateSource(store, seed=1)
+    assert source.stored == 5
+    assert source.hashes(3, 8)[:2] == store.hashes(3, 5)
+    assert source.hash_at(4) == store.hash_at(4)
+    assert source.hash_at(6) == source.hashes(3, 8)[3]
+    assert source.hashes(6, 8) == [source.hash_at(6), source.hash_at(7)]
+
+def test_synthetic_hashes_are_deterministic_and_namespaced():
+    hashes = CertificateSource(seed=1).hashes(0, 1000)
+    assert len(set(hashes)) == 1000
+    assert CertificateSource(seed=1).hashes(0, 1000) == hashes
+    assert not set(CertificateSource(seed=2).hashes(0, 1000)) & set(hashes)
+    assert not set(CertificateSource(seed=1, label='exp2').hashes(0, 1000)) & set(hashes)
+
+def test_blocks_cover_the_range_in_order():
+    source = CertificateSource(_store(4), seed=1)
+    blocks = list(source.iter_blocks(2, 13, block_size=5))
+    assert [len(block) for block in blocks] == [5, 5, 1]
+    assert [h for block in blocks for h in block] == source.hashes(2, 13)
+
+def test_negative_index_is_rejected():
+    with pytest.raises(IndexError):
+        CertificateSource().hash_at(-1)
+
+def test_synthetic_record_carries_its_hash():
+    source = CertificateSource(seed=1)
+    record = source.record_at(10)
+    assert record['record_id'] == 10
+    assert record['certificate_hash'] == Web3.to_hex(source.hash_at(10))
+    assert source.record_at(10) == record
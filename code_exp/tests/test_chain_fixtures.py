@@ -0,0 +1,97 @@
+import pytest
+
+from chain_fixtures import ChainFixtures, FixtureError
+
+class FakeHardhat:
+    """evm_snapshot/evm_revert with Hardhat's semantics: a revert drops that snapshot and every later one."""
+
+    def __init__(self):
+        self.state = []  # Blocks mined so far, as labels
+        self.snapshots = {}
+        self.next_id = 1
+
+    def request(self, method, params):
+        if method == 'evm_snapshot':
+            snapshot_id = hex(self.next_id)
+            self.next_id += 1
+            self.snapshots[snapshot_id] = list(self.state)
+            return snapshot_id
+        if method == 'evm_revert':
+            snapshot_id = params[0]
+            if snapshot_id not in self.snapshots:
+                return False
+            self.state = self.snapshots[snapshot_id]
+            reverted = int(snapshot_id, 16)
+            self.snapshots = {i: s for i, s in self.snapshots.items() if int(i, 16) < reverted}
+            return True
+        if method == 'eth_getBlockByNumber':
+            return {'number': hex(len(self.state)), 'hash': '0x%064x' % len(self.state)}
+        raise AssertionError(f"unexpected {method}")
+
+def _grow(node, label, log):
+    def build(parent_metadata):
+        log.append(label)
+        node.state.append(label)
+        return {'label': label}
+    return build
+
+def _visit(fixtures, node, chain, log):
+    visited = []
+    for index in [chain.index(name) for name in fixtures.visit_order(chain)]:
+        parent = chain[index - 1] if index else None
+        metadata = fixtures.fixture(chain[index], _grow(node, chain[index], log), parent=parent)
+        assert node.state == chain[:index + 1]
+        visited.append(metadata['label'])
+    return visited
+
+def test_restore_returns_state_and_resnapshots():
+    node = FakeHardhat()
+    fixtures = ChainFixtures(node)
+    fixtures.fixture('a', _grow(node, 'a', []))
+    node.state.append('measurement')
+    assert fixtures.restore('a') == {'label': 'a'}
+    assert node.state == ['a']
+    # The fixture can be restored again: it was snapshotted again after the revert
+    assert fixtures.restore('a') == {'label': 'a'}
+
+def test_restoring_an_older_fixture_invalidates_newer_ones():
+    node = FakeHardhat()
+    fixtures = ChainFixtures(node)
+    fixtures.fixture('a', _grow(node, 'a', []))
+    fixtures.fixture('b', _grow(node, 'b', []), parent='a')
+    fixtures.restore('a')
+    assert not fixtures.has('b')
+    with pytest.raises(FixtureError):
+        fixtures.restore('b')
+
+def test_visit_order_builds_a_fresh_chain_upward():
+    node = FakeHardhat()
+    fixtures = ChainFixtures(node)
+    chain = ['deployed', 'size-1', 'size-10', 'size-100']
+    assert fixtures.visit_order(chain) == chain
+    log = []
+    assert _visit(fixtures, node, chain, log) == chain
+    assert log == chain
+
+def test_visit_order_reuses_every_cached_fixture():
+    node = FakeHardhat()
+    fixtures = ChainFixtures(node)
+    chain = ['deployed', 'size-1', 'size-10', 'size-100']
+    _visit(fixtures, node, chain[:3], [])
+
+    # A rerun: the cached prefix is restored from its newest fixture down, only the rest is built
+    order = fixtures.visit_order(chain)
+    assert order == ['size-10', 'size-100', 'size-1', 'deployed']
+    log = []
+    assert sorted(_visit(fixtures, node, chain, log)) == sorted(chain)
+    assert log == ['size-100']
+
+def test_persisted_cache_drops_fixtures_whose_block_is_gone(tmp_path):
+    node = FakeHardhat()
+    path = str(tmp_path / 'fixtures.json')
+    fixtures = ChainFixtures(node, persist_path=path)
+    fixtures.fixture('a', _grow(node, 'a', []))
+    assert ChainFixtures(node, persist_path=path).has('a')
+
+    restarted = FakeHardhat()
+    assert not ChainFixtures(restarted, persist_path=path).has('a')
@@ -0,0 +1,50 @@
+import pytest
+
+from client_factory import ClientFactory, DEFAULT_POOL_SIZE, MAX_POOL_SIZE, pool_size_for, wait_until_ready
+
+ADDRESS = '0x' + 'ab' * 20
+
+class FlakyEth:
+    """Refuses the first `failures` probes, as a node that is still starting."""
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    @property
+    def block_number(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection refused")
+        return 0
+
+class FlakyWeb3:
+    def __init__(self, failures):
+        self.eth = FlakyEth(failures)
+
+def test_pool_size_is_clamped():
+    assert pool_size_for(1) == DEFAULT_POOL_SIZE
+    assert pool_size_for(64) == 64
+    assert pool_size_for(10_000) == MAX_POOL_SIZE
+
+def test_wait_until_ready_probes_until_the_node_answers():
+    w3 = FlakyWeb3(failures=3)
+    assert wait_until_ready(w3, timeout=5, interval=0.01) >= 0
+    assert w3.eth.failures == 0
+
+def test_wait_until_ready_gives_up_after_the_timeout():
+    with pytest.raises(ConnectionError, match='connection refused'):
+        wait_until_ready(FlakyWeb3(failures=10**6), timeout=0.1, interval=0.01)
+
+def test_clients_share_one_session_and_contract_cache():
+    factory = ClientFactory('http://127.0.0.1:8545', pool_size=32)
+    try:
+        w3 = factory.web3()
+        assert factory.web3() is w3
+        assert factory.batch_client().session is factory.session
+        contract = factory.contract(ADDRESS, [])
+        assert factory.contract(ADDRESS.upper().replace('0X', '0x'), []) is contract
+        assert factory.session.get_adapter('http://127.0.0.1:8545')._pool_maxsize == 32
+        factory.resize(64)
+        assert factory.session.get_adapter('http://127.0.0.1:8545')._pool_maxsize == 64
+    finally:
+        factory.close()
@@ -0,0 +1,46 @@
+import pytest
+from web3 import Web3
+from web3.exceptions import TimeExhausted
+
+from confirmation_tracker import ConfirmationTracker, format_receipt
+
+def test_format_receipt_decodes_quantities_and_hashes():
+    receipt = format_receipt({
+        'blockNumber': '0x10', 'status': '0x1', 'gasUsed': '0x5208', 'logs': [],
+        'transactionHash': '0x' + 'ab' * 32, 'blockHash': None,
+    })
+    assert (receipt.blockNumber, receipt.status, receipt.gasUsed) == (16, 1, 21000)
+    assert receipt.transactionHash == bytes.fromhex('ab' * 32)
+    assert receipt.blockHash is None and receipt.logs == []
+
+def test_tracker_resolves_receipts_from_new_blocks(chain, certificate):
+    w3 = chain.web3()
+    tracker = ConfirmationTracker(chain.batch_client(), poll_interval=0.01, timeout=10)
+    try:
+        tx_hashes = [
+            certificate.functions.issueCertificate(Web3.keccak(text=f"tracked-{i}")).transact() for i in range(5)
+        ]
+        futures = [tracker.watch(tx_hash) for tx_hash in tx_hashes]
+        receipts = [future.result(timeout=10) for future in futures]
+    finally:
+        tracker.stop()
+    for tx_hash, receipt in zip(tx_hashes, receipts):
+        assert receipt.status == 1
+        assert receipt.transactionHash == tx_hash
+        assert receipt.blockNumber == w3.eth.get_transaction_receipt(tx_hash).blockNumber
+    assert tracker.receipts_fetched == 5
+
+def test_tracker_times_out_unknown_transactions(chain):
+    tracker = ConfirmationTracker(chain.batch_client(), poll_interval=0.01, timeout=10)
+    try:
+        with pytest.raises(TimeExhausted):
+            tracker.wait(b'\x12' * 32, timeout=0.1)
+    finally:
+        tracker.stop()
+
+def test_stop_fails_waiting_transactions(chain):
+    tracker = ConfirmationTracker(chain.batch_client(), poll_interval=0.01, timeout=60)
+    future = tracker.watch(b'\x34' * 32)
+    tracker.stop()
+    with pytest.raises(TimeExhausted):
+        future.result(timeout=1)
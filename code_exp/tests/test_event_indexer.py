@@ -0,0 +1,85 @@
+from web3 import Web3
+
+from event_indexer import EventIndexer, STATUS_UNISSUED
+from rpc_batch import RpcBatchError
+from state_seeder import STATUS_ISSUED, STATUS_REVOKED
+
+class RangeCappedRpc:
+    """Rejects eth_getLogs requests spanning more than `max_blocks` blocks, like many public nodes."""
+
+    def __init__(self, rpc, max_blocks):
+        self.rpc = rpc
+        self.max_blocks = max_blocks
+        self.rejected = 0
+
+    def request(self, method, params):
+        return self.rpc.request(method, params)
+
+    def execute(self, calls, allow_errors=False):
+        for method, params in calls:
+            if method == 'eth_getLogs':
+                span = int(params[0]['toBlock'], 16) - int(params[0]['fromBlock'], 16) + 1
+                if span > self.max_blocks:
+                    self.rejected += 1
+                    raise RpcBatchError(f"range of {span} blocks exceeds {self.max_blocks}")
+        return self.rpc.execute(calls, allow_errors=allow_errors)
+
+def _transact(chain, call):
+    chain.web3().eth.wait_for_transaction_receipt(call.transact())
+
+def _issue(chain, certificate, labels):
+    hashes = [Web3.keccak(text=label) for label in labels]
+    for cert_hash in hashes:
+        _transact(chain, certificate.functions.issueCertificate(cert_hash))
+    return hashes
+
+def test_index_matches_the_contract_and_resumes_incrementally(chain, certificate, tmp_path):
+    db_path = str(tmp_path / 'index.sqlite')
+    hashes = _issue(chain, certificate, ['a', 'b', 'c'])
+    _transact(chain, certificate.functions.revokeCertificate(hashes[1]))
+    indexer = EventIndexer(chain.batch_client(), certificate.address, db_path=db_path)
+    assert indexer.sync() == 4
+    unknown = Web3.keccak(text='unknown')
+    assert indexer.statuses(hashes + [unknown]) == [
+        tuple(certificate.functions.getCertificateStatus(h).call()) for h in hashes + [unknown]
+    ]
+    assert indexer.status(unknown)[0] == STATUS_UNISSUED
+    indexer.close()
+
+    # A reopened index continues from its checkpoint
+    more = _issue(chain, certificate, ['d'])
+    indexer = EventIndexer(chain.batch_client(), certificate.address, db_path=db_path)
+    assert indexer.sync() == 1
+    assert indexer.status(more[0])[0] == STATUS_ISSUED
+    assert indexer.counts() == {'certificates': 4, 'revoked': 1}
+    indexer.close()
+
+def test_rejected_ranges_are_halved(chain, certificate):
+    _issue(chain, certificate, [f"range-{i}" for i in range(6)])
+    rpc = RangeCappedRpc(chain.batch_client(), 2)
+    indexer = EventIndexer(rpc, certificate.address, initial_range=64, max_range=64)
+    assert indexer.sync() == 6
+    assert rpc.rejected >= 5  # 64 halved down to 2
+    assert indexer.checkpoint == chain.web3().eth.block_number
+
+def test_reorg_rolls_back_and_rebuilds_affected_certificates(chain, certificate):
+    kept, replaced = _issue(chain, certificate, ['kept', 'replaced'])
+    snapshot = chain.tester.take_snapshot()
+    _transact(chain, certificate.functions.revokeCertificate(kept))
+    orphaned = _issue(chain, certificate, ['orphaned'])[0]
+    indexer = EventIndexer(chain.batch_client(), certificate.address)
+    indexer.sync()
+    assert indexer.status(kept)[0] == STATUS_REVOKED
+
+    # Replace the last two blocks with a different history
+    chain.tester.revert_to_snapshot(snapshot)
+    _transact(chain, certificate.functions.revokeCertificate(replaced))
+    fresh = _issue(chain, certificate, ['fresh'])[0]
+    indexer.sync()
+    assert indexer.rollbacks == 1
+    assert [status for status, _, _ in indexer.statuses([kept, replaced, orphaned, fresh])] == [
+        STATUS_ISSUED, STATUS_REVOKED, STATUS_UNISSUED, STATUS_ISSUED
+    ]
+    reference = EventIndexer(chain.batch_client(), certificate.address)
+    reference.sync()
+    assert indexer.state_digest() == reference.state_digest()
@@ -0,0 +1,55 @@
+import pytest
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from conftest import PRIVATE_KEY
+from rpc_batch import RpcBatchError
+
+pytest.importorskip('eth_tester')
+from evm_backend import InProcessBackend, _to_rpc
+
+def test_results_are_encoded_as_json_rpc_values():
+    result = AttributeDict({
+        'number': 7, 'hash': HexBytes(b'\xab' * 32), 'status': True, 'to': None,
+        'logs': [AttributeDict({'data': b'\x01\x02', 'topics': (b'\xff',)})],
+    })
+    assert _to_rpc(result) == {
+        'number': '0x7', 'hash': '0x' + 'ab' * 32, 'status': True, 'to': None,
+        'logs': [{'data': '0x0102', 'topics': ['0xff']}],
+    }
+
+def test_rpc_client_answers_like_a_node(chain):
+    rpc = chain.batch_client()
+    w3 = chain.web3()
+    assert int(rpc.request('eth_blockNumber', []), 16) == w3.eth.block_number
+    balance, count = rpc.execute([
+        ('eth_getBalance', [w3.eth.default_account, 'latest']),
+        ('eth_getTransactionCount', [w3.eth.default_account, 'latest']),
+    ])
+    assert int(balance, 16) == w3.eth.get_balance(w3.eth.default_account)
+    assert int(count, 16) == 0
+    assert rpc.posts_sent == 1
+
+def test_hardhat_only_methods_raise_rpc_batch_error(chain):
+    rpc = chain.batch_client()
+    with pytest.raises(RpcBatchError, match='evm_setAutomine'):
+        rpc.request('evm_setAutomine', [False])
+    head, error = rpc.execute([('eth_blockNumber', []), ('hardhat_setStorageAt', ['0x' + '00' * 20, '0x0', '0x0'])],
+                              allow_errors=True)
+    assert head.startswith('0x') and isinstance(error, RpcBatchError)
+
+def test_deployer_key_is_imported_once_and_funded():
+    backend = InProcessBackend(PRIVATE_KEY)
+    w3 = backend.web3()
+    address = w3.eth.account.from_key(PRIVATE_KEY).address
+    balance = w3.eth.get_balance(address)
+    assert balance > 0
+    # Adding a known key again only tops up its balance
+    assert backend.add_account(PRIVATE_KEY) == address
+    assert w3.eth.get_balance(address) == 2 * balance
+    assert address in backend.tester.get_accounts()
+
+def test_contract_objects_are_cached_per_address(chain, certificate):
+    lowercase = certificate.address.lower()
+    assert chain.contract(lowercase, certificate.abi) is chain.contract(certificate.address, certificate.abi)
+    assert chain.wait_until_ready() == 0.0
@@ -0,0 +1,69 @@
+from web3 import Web3
+
+from gas_cache import GasCache, calldata_gas
+
+CONTRACT = '0x' + '11' * 20
+SELECTOR = '0xabcdef01'
+
+class FakeRpc:
+    """Estimates execution gas from a per-selector table plus the calldata charge."""
+
+    def __init__(self, execution_gas):
+        self.execution_gas = execution_gas
+        self.estimated = []
+
+    def request(self, method, params):
+        assert method == 'eth_getCode'
+        return '0x6080'
+
+    def estimate_gas_many(self, transactions):
+        self.estimated.extend(transactions)
+        return [self.execution_gas[tx['data'][:10]] + calldata_gas(tx['data']) for tx in transactions]
+
+def _tx(argument):
+    return {'from': CONTRACT, 'to': CONTRACT, 'data': SELECTOR + argument.hex()}
+
+def test_calldata_gas_charges_zero_and_nonzero_bytes():
+    assert calldata_gas('0x00ff00ff01') == 2 * 4 + 3 * 16
+    assert calldata_gas('') == 0
+
+def test_each_key_is_estimated_once_and_calldata_is_added_back():
+    rpc = FakeRpc({SELECTOR: 30000})
+    cache = GasCache(rpc, sample_rate=0)
+    transactions = [_tx(b'\x00' * 32), _tx(b'\x01' * 32), _tx(b'\x00' * 16 + b'\x02' * 16)]
+    assert cache.estimate_many(transactions, 'unissued') == [30000 + calldata_gas(tx['data']) for tx in transactions]
+    assert len(rpc.estimated) == 1
+    # A different state class is a different key
+    cache.estimate(_tx(b'\x03' * 32), 'revoked')
+    assert len(rpc.estimated) == 2
+    assert cache.stats() == {'entries': 2, 'hits': 2, 'misses': 2, 'hit_rate': 0.5, 'validations': 0, 'drifts': 0}
+
+def test_drifted_entry_is_estimated_for_every_later_query():
+    rpc = FakeRpc({SELECTOR: 30000})
+    cache = GasCache(rpc, sample_rate=1.0)
+    cache.estimate(_tx(b'\x01' * 32), 'issued')
+    # The declared state class did not capture the path: the cost changes
+    rpc.execution_gas[SELECTOR] = 45000
+    assert cache.estimate(_tx(b'\x02' * 32), 'issued') == 45000 + calldata_gas(_tx(b'\x02' * 32)['data'])
+    assert cache.stats()['drifts'] == 1
+    cache.sample_rate = 0
+    count = len(rpc.estimated)
+    cache.estimate_many([_tx(b'\x04' * 32), _tx(b'\x05' * 32)], 'issued')
+    assert len(rpc.estimated) == count + 2
+    [entry] = cache.entries()
+    assert entry['drifted'] and entry['max_drift'] == 15000
+
+def test_cached_answers_match_real_estimates_on_chain(chain, certificate):
+    w3 = chain.web3()
+    rpc = chain.batch_client()
+    cache = GasCache(rpc, sample_rate=0)
+    sender = w3.eth.default_account
+    hashes = [Web3.keccak(text=f"gas-{i}") for i in range(5)] + [b'\x00' * 31 + b'\x01']
+    transactions = [
+        {'from': sender, 'to': certificate.address, 'data': certificate.encodeABI(fn_name='issueCertificate', args=[h])}
+        for h in hashes
+    ]
+    cached = cache.estimate_many(transactions, 'unissued')
+    real = rpc.estimate_gas_many(transactions)
+    assert all(abs(c - r) <= 2 for c, r in zip(cached, real))
+    assert cache.stats()['misses'] == 1
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+from faker import Faker
+
+from generate_dataset import generate_record, generate_shards, merge_shards, shard_bounds
+from hash_store import HashStore
+
+def _build(tmp_path, name, shard_count, num_records=25, seed=3):
+    shards_dir = str(tmp_path / name / 'shards')
+    output_file = str(tmp_path / name / 'certificates_data.csv')
+    store_dir = str(tmp_path / name / 'store')
+    generate_shards(num_records, shard_count, seed, shards_dir, workers=2, chunk_size=4)
+    merge_shards(shards_dir, output_file, store_dir)
+    return shards_dir, pd.read_csv(output_file), HashStore.open(store_dir)
+
+def test_shard_bounds_cover_the_range_contiguously():
+    bounds = shard_bounds(10, 3)
+    assert bounds == [(0, 4), (4, 7), (7, 10)]
+    assert shard_bounds(2, 2) == [(0, 1), (1, 2)]
+
+def test_record_depends_only_on_seed_and_id():
+    first, digest = generate_record(Faker(), 1, 7)
+    generate_record(Faker(), 1, 8)
+    again, digest_again = generate_record(Faker(), 1, 7)
+    assert (first, digest) == (again, digest_again)
+    assert generate_record(Faker(), 2, 7)[1] != digest
+
+def test_dataset_does_not_depend_on_the_shard_layout(tmp_path):
+    _, csv_one, store_one = _build(tmp_path, 'one', shard_count=1)
+    _, csv_many, store_many = _build(tmp_path, 'many', shard_count=4)
+    pd.testing.assert_frame_equal(csv_one, csv_many)
+    assert store_one.hashes() == store_many.hashes()
+    assert len(store_many) == 25 and list(csv_many['record_id']) == list(range(25))
+    assert [h.hex() for h in store_many.hashes(0, 3)] == [h.removeprefix('0x') for h in csv_many['certificate_hash'][:3]]
+
+def test_complete_shards_are_kept_on_rerun(tmp_path, capsys):
+    shards_dir, _, _ = _build(tmp_path, 'resume', shard_count=3)
+    marker = os.path.join(shards_dir, 'shard-00001', 'records.csv')
+    modified = os.path.getmtime(marker)
+    generate_shards(25, 3, 3, shards_dir, workers=2, chunk_size=4)
+    assert 'already complete' in capsys.readouterr().out
+    assert os.path.getmtime(marker) == modified
+
+def test_merge_refuses_an_incomplete_manifest(tmp_path):
+    shards_dir = str(tmp_path / 'partial')
+    generate_shards(10, 2, 3, shards_dir, workers=1, only_shard=0)
+    with pytest.raises(RuntimeError, match='1 of 2 shards'):
+        merge_shards(shards_dir, str(tmp_path / 'out.csv'), str(tmp_path / 'store'))
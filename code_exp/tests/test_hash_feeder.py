@@ -0,0 +1,40 @@
+import pytest
+
+from certificate_source import CertificateSource
+from hash_feeder import HashFeeder
+
+def test_feeder_serves_the_source_hashes_in_order_across_blocks():
+    source = CertificateSource(seed=3, label='feeder')
+    with HashFeeder(label='feeder', seed=3, start_index=10, block_size=8, prefetch_blocks=2) as feeder:
+        served = [feeder.next_hash() for _ in range(30)]
+    assert served == source.hashes(10, 40)
+    assert len(set(served)) == 30
+    assert feeder.stats()['served'] == 30
+
+def test_dead_producer_raises_instead_of_hanging():
+    feeder = HashFeeder(label='dead', block_size=4, prefetch_blocks=1, stall_timeout=5)
+    feeder.start()
+    try:
+        feeder._process.terminate()
+        feeder._process.join()
+        # Drain whatever the producer buffered before it died
+        with pytest.raises(RuntimeError, match='exited with code'):
+            for _ in range(100):
+                feeder.next_hash()
+    finally:
+        feeder.stop()
+
+def test_stuck_producer_raises_after_the_stall_timeout():
+    feeder = HashFeeder(label='stuck', block_size=4, prefetch_blocks=1, stall_timeout=0.3)
+    feeder.start()
+    try:
+        # Stop producing without ending the process
+        feeder._stop_event.set()
+        feeder._process.join()
+        feeder._process.is_alive = lambda: True
+        with pytest.raises(RuntimeError, match='no block within'):
+            for _ in range(100):
+                feeder.next_hash()
+    finally:
+        feeder._blocks.close()
+        feeder._process = None
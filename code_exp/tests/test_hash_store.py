@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from web3 import Web3
+
+from hash_store import HashStore, allocate_store, finalize_store, hashes_from_hex, write_store
+
+def _hex_hashes(count):
+    return [Web3.to_hex(Web3.keccak(text=f"store-{i}")) for i in range(count)]
+
+def test_hashes_from_hex_accepts_both_prefix_styles():
+    values = _hex_hashes(3)
+    array = hashes_from_hex([values[0], values[1][2:], values[2]])
+    assert array.shape == (3, 32) and array.dtype == np.uint8
+    assert array[1].tobytes() == bytes.fromhex(values[1][2:])
+
+def test_written_store_is_memory_mapped_and_round_trips(tmp_path):
+    values = _hex_hashes(10)
+    names = [f"student {i}" for i in range(10)]
+    write_store(str(tmp_path), hashes_from_hex(values), fields={'student_name': names, 'gpa': np.arange(10) / 4})
+    assert HashStore.exists(str(tmp_path))
+
+    store = HashStore.open(str(tmp_path))
+    assert len(store) == 10 and set(store.field_names) == {'student_name', 'gpa'}
+    assert isinstance(store.raw(), np.memmap)
+    assert store.hashes(2, 4) == [bytes.fromhex(v[2:]) for v in values[2:4]]
+    assert store.hash_at(9) == bytes.fromhex(values[9][2:])
+    assert list(store.field('student_name', 0, 2)) == names[:2]
+
+    frame = store.head(3).frame()
+    assert list(frame['certificate_hash']) == values[:3]
+    assert list(frame['gpa']) == [0, 0.25, 0.5]
+
+def test_write_store_validates_shapes(tmp_path):
+    with pytest.raises(ValueError):
+        write_store(str(tmp_path), np.zeros((2, 31), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        write_store(str(tmp_path), hashes_from_hex(_hex_hashes(2)), fields={'short': [1]})
+
+def test_allocated_store_is_readable_only_once_finalized(tmp_path):
+    hashes, fields = allocate_store(str(tmp_path), 4, {'major': 'U16'})
+    assert not HashStore.exists(str(tmp_path))
+    hashes[:] = hashes_from_hex(_hex_hashes(4))
+    fields['major'][:] = ['a', 'b', 'c', 'd']
+    finalize_store(str(tmp_path), hashes, fields, source='certificates_data.csv')
+
+    store = HashStore.open(str(tmp_path))
+    assert store.hashes() == [bytes.fromhex(v[2:]) for v in _hex_hashes(4)]
+    assert list(store.field('major')) == ['a', 'b', 'c', 'd']
+    # Reallocating invalidates the old store until it is finalized again
+    allocate_store(str(tmp_path), 2)
+    assert not HashStore.exists(str(tmp_path))
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from latency_recorder import LatencyHistogram, LatencyRecorder
+
+def test_percentiles_stay_within_the_configured_precision():
+    histogram = LatencyHistogram(significant_digits=2)
+    samples = [i / 1000 for i in range(1, 1001)]  # 1 ms .. 1 s
+    for sample in samples:
+        histogram.record(sample)
+    assert histogram.total_count == 1000
+    for percentile, exact in ((50, 0.5), (90, 0.9), (99, 0.99), (100, 1.0)):
+        assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.01)
+    assert histogram.mean() == pytest.approx(sum(samples) / len(samples), rel=1e-6)
+    assert histogram.max() == pytest.approx(1.0, rel=0.01)
+
+def test_memory_does_not_grow_with_samples():
+    histogram = LatencyHistogram()
+    size = len(histogram.counts)
+    histogram.record(0.005, count=1_000_000)
+    histogram.record(10_000)  # Beyond highest_seconds; clamped
+    assert len(histogram.counts) == size
+    assert histogram.max() <= histogram.highest_seconds * 1.01
+
+def test_empty_histogram_reports_zero():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0 and histogram.mean() == 0.0
+
+def test_precision_is_validated():
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_digits=6)
+
+def test_merge_equals_recording_everything_in_one_histogram():
+    merged, left, right, combined = (LatencyHistogram() for _ in range(4))
+    for i in range(1, 200):
+        (left if i % 2 else right).record(i / 100)
+        combined.record(i / 100)
+    merged.merge(left)
+    merged.merge(right)
+    assert merged.counts == combined.counts
+    assert merged.percentile(99) == combined.percentile(99)
+    with pytest.raises(ValueError):
+        merged.merge(LatencyHistogram(significant_digits=3))
+
+def test_histogram_round_trips_through_a_dict():
+    histogram = LatencyHistogram()
+    for i in range(1, 50):
+        histogram.record(i / 7)
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.counts == histogram.counts
+    assert (restored.mean(), restored.max()) == (histogram.mean(), histogram.max())
+
+def test_recorder_summarizes_each_operation_with_labels():
+    recorder = LatencyRecorder()
+    threads = [
+        threading.Thread(target=lambda: [recorder.record('call', 0.01) for _ in range(500)]) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with recorder.time('block'):
+        pass
+    rows = {row['operation']: row for row in recorder.summary(level=3)}
+    assert rows['call']['count'] == 2000 and rows['block']['count'] == 1
+    assert rows['call']['level'] == 3
+    assert {'p50_latency_seconds', 'p99_9_latency_seconds', 'max_latency_seconds'} <= set(rows['call'])
+
+def test_recorders_merge_and_round_trip():
+    first, second = LatencyRecorder(), LatencyRecorder()
+    first.record('a', 0.1)
+    second.record('a', 0.2)
+    second.record('b', 0.3)
+    first.merge(second)
+    restored = LatencyRecorder.from_dict(first.to_dict())
+    assert restored.histogram('a').total_count == 2
+    assert restored.histogram('b').max() == pytest.approx(0.3, rel=0.01)
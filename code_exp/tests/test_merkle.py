@@ -0,0 +1,70 @@
+import math
+
+import pytest
+from web3 import Web3
+
+from certificate_batch import has_function
+from merkle import MerkleTree, decode_proof, encode_proof, hash_pair, leaf_hash, verify_proof
+
+def _hashes(label, count):
+    return [Web3.keccak(text=f"{label}-{i}") for i in range(count)]
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 8, 17])
+def test_every_member_proof_verifies(size):
+    hashes = _hashes('member', size)
+    tree = MerkleTree(hashes)
+    for cert_hash in hashes:
+        proof = tree.proof(cert_hash)
+        assert len(proof) <= math.ceil(math.log2(size))
+        assert verify_proof(proof, tree.root, cert_hash)
+
+def test_pairs_are_hashed_in_sorted_order():
+    a, b = leaf_hash(b'\x01' * 32), leaf_hash(b'\x02' * 32)
+    assert hash_pair(a, b) == hash_pair(b, a) == Web3.keccak(min(a, b) + max(a, b))
+    assert MerkleTree([b'\x01' * 32, b'\x02' * 32]).root == hash_pair(a, b)
+
+def test_proof_does_not_verify_other_hashes_or_roots():
+    hashes = _hashes('other', 5)
+    tree = MerkleTree(hashes)
+    proof = tree.proof(hashes[2])
+    assert not verify_proof(proof, tree.root, hashes[3])
+    assert not verify_proof(proof, MerkleTree(_hashes('elsewhere', 5)).root, hashes[2])
+    # An inner node is not a valid leaf
+    assert not verify_proof(tree.proof(hashes[0])[1:], tree.root, tree.levels[1][0])
+
+def test_tree_rejects_empty_duplicate_and_unknown_hashes():
+    with pytest.raises(ValueError):
+        MerkleTree([])
+    with pytest.raises(ValueError):
+        MerkleTree(_hashes('dup', 2) * 2)
+    with pytest.raises(KeyError):
+        MerkleTree(_hashes('known', 2)).proof(Web3.keccak(text='unknown'))
+
+def test_encoded_proof_round_trips():
+    hashes = _hashes('encode', 9)
+    proof = MerkleTree(hashes).proof(hashes[4])
+    packed = encode_proof(proof)
+    assert len(packed) == 32 * len(proof)
+    assert decode_proof(packed) == proof
+    with pytest.raises(ValueError):
+        decode_proof(packed[:-1])
+
+def test_contract_accepts_proofs_from_merkle_py(chain, certificate):
+    if not has_function(certificate, 'verifyBatchMember'):
+        pytest.skip("stale Certificate artifact without anchorBatch/verifyBatchMember; run `npx hardhat compile`")
+    w3 = chain.web3()
+    hashes = _hashes('onchain', 11)
+    tree = MerkleTree(hashes)
+    w3.eth.wait_for_transaction_receipt(certificate.functions.anchorBatch(tree.root, len(tree)).transact())
+
+    for cert_hash in (hashes[0], hashes[5], hashes[10]):
+        status, institution, _ = certificate.functions.verifyBatchMember(tree.root, cert_hash, tree.proof(cert_hash)).call()
+        assert (status, institution) == (1, w3.eth.default_account)
+    outsider = Web3.keccak(text='not-in-batch')
+    assert certificate.functions.verifyBatchMember(tree.root, outsider, tree.proof(hashes[0])).call()[0] == 0
+
+    w3.eth.wait_for_transaction_receipt(
+        certificate.functions.revokeBatchMember(tree.root, hashes[5], tree.proof(hashes[5])).transact()
+    )
+    assert certificate.functions.verifyBatchMember(tree.root, hashes[5], tree.proof(hashes[5])).call()[0] == 2
+    assert certificate.functions.verifyBatchMember(tree.root, hashes[0], tree.proof(hashes[0])).call()[0] == 1
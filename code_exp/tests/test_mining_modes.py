@@ -0,0 +1,106 @@
+import time
+import threading
+
+import pytest
+
+from mining_modes import ManualMiner, MiningController, mode_label
+
+class FakeNode:
+    """Records mining RPCs and keeps a pending pool that evm_mine empties into a block."""
+
+    def __init__(self, pending=0):
+        self.pending = pending
+        self.blocks = [0]
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, params):
+        with self._lock:
+            self.calls.append((method, params))
+            if method == 'eth_getBlockTransactionCountByNumber':
+                if params[0] == 'pending':
+                    return hex(self.pending)
+                return hex(self.blocks[int(params[0], 16)])
+            if method == 'evm_mine':
+                self.blocks.append(self.pending)
+                self.pending = 0
+            if method == 'eth_blockNumber':
+                return hex(len(self.blocks) - 1)
+
+    def execute(self, calls):
+        return [self.request(method, params) for method, params in calls]
+
+    def add_pending(self, count):
+        with self._lock:
+            self.pending += count
+
+def _wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+def test_mode_labels():
+    assert mode_label('automine') == 'automine'
+    assert mode_label('interval', interval_ms=250) == 'interval-250ms'
+    assert mode_label('manual', batch_size=20) == 'manual-20'
+
+def test_set_mode_sends_the_node_settings():
+    node = FakeNode()
+    controller = MiningController(node)
+    assert controller.set_mode('interval', interval_ms=500) == 'interval-500ms'
+    assert node.calls == [('evm_setAutomine', [False]), ('evm_setIntervalMining', [500])]
+    with pytest.raises(ValueError, match='Unknown mining mode'):
+        controller.set_mode('instant')
+
+def test_switching_back_to_automine_mines_leftover_transactions():
+    node = FakeNode()
+    controller = MiningController(node)
+    controller.set_mode('interval')
+    node.add_pending(3)
+    controller.set_mode('automine')
+    assert node.blocks == [0, 3]
+    assert node.calls[-1] == ('evm_mine', [])
+
+def test_manual_miner_mines_full_batches():
+    node = FakeNode()
+    miner = ManualMiner(node, batch_size=5, max_wait=60, poll_interval=0.001)
+    miner.start()
+    try:
+        node.add_pending(4)
+        time.sleep(0.05)
+        assert miner.blocks_mined == 0
+        node.add_pending(1)
+        _wait_for(lambda: miner.blocks_mined == 1)
+    finally:
+        miner.stop()
+    assert node.blocks == [0, 5]
+
+def test_manual_miner_does_not_strand_a_partial_batch():
+    node = FakeNode()
+    miner = ManualMiner(node, batch_size=50, max_wait=0.05, poll_interval=0.001)
+    miner.start()
+    try:
+        node.add_pending(2)
+        _wait_for(lambda: miner.blocks_mined == 1)
+    finally:
+        miner.stop()
+    assert node.blocks == [0, 2]
+
+def test_controller_stops_the_manual_miner_on_mode_change():
+    node = FakeNode()
+    controller = MiningController(node)
+    assert controller.set_mode('manual', batch_size=10) == 'manual-10'
+    miner = controller.miner
+    controller.set_mode('automine')
+    assert controller.miner is None and miner._thread is None
+
+def test_block_stats_exclude_empty_blocks_from_the_averages():
+    node = FakeNode()
+    node.blocks = [0, 4, 0, 2, 6]
+    controller = MiningController(node)
+    assert controller.head() == 4
+    assert controller.block_stats(1, 4) == {
+        'blocks': 4, 'non_empty_blocks': 3, 'transactions': 12, 'mean_tx_per_block': 4, 'max_tx_per_block': 6,
+    }
+    assert controller.block_stats(5, 4)['blocks'] == 0
@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from open_loop import OpenLoopGenerator, OpenLoopStats, arrival_offsets
+
+def test_constant_schedule_is_evenly_spaced():
+    assert arrival_offsets(4, 1, 'constant') == [0, 0.25, 0.5, 0.75]
+
+def test_poisson_schedule_is_seeded_and_near_the_rate():
+    offsets = arrival_offsets(100, 20, 'poisson', seed=7)
+    assert offsets == arrival_offsets(100, 20, 'poisson', seed=7)
+    assert offsets == sorted(offsets) and offsets[-1] < 20
+    assert abs(len(offsets) - 2000) < 200
+
+def test_schedule_rejects_unknown_process_and_handles_zero_rate():
+    with pytest.raises(ValueError):
+        arrival_offsets(10, 1, 'bursty')
+    assert arrival_offsets(0, 10) == []
+
+def test_corrected_latency_charges_the_send_lag():
+    stats = OpenLoopStats(offered_rate=10, process='constant')
+    stats.record(intended=0.0, sent=0.0, completed=0.1, success=True)
+    # Sent 2 s late behind a stalled generator; the service time alone hides that
+    stats.record(intended=1.0, sent=3.0, completed=3.1, success=True)
+    stats.record(intended=2.0, sent=2.0, completed=2.5, success=False)
+    stats.duration = 4.0
+    summary = stats.summary()
+    assert (summary['sent_tx'], summary['successful_tx'], summary['failed_tx']) == (3, 2, 1)
+    assert summary['achieved_tps'] == 0.5
+    assert summary['mean_send_lag_seconds'] == pytest.approx(2 / 3)
+    assert summary['max_corrected_latency_seconds'] == pytest.approx(2.1, rel=0.01)
+    assert stats.service_latency.max() == pytest.approx(0.1, rel=0.01)
+
+class FakeEngine:
+    """Confirms every send after a fixed delay, without a node."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.senders = ['a', 'b']
+        self.sent = []
+
+    async def start(self):
+        pass
+
+    async def prepare(self, next_hash):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_and_confirm(self, cert_hash, sender):
+        self.sent.append((cert_hash, sender))
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(status=1)
+
+def test_generator_keeps_sending_while_requests_are_outstanding():
+    # Each request takes longer than the gap between arrivals; a closed loop would fall behind
+    engine = FakeEngine(delay=0.2)
+    hashes = iter(range(100))
+    stats = asyncio.run(OpenLoopGenerator(engine, process='constant').run_rate(50, 0.2, lambda: next(hashes)))
+    assert stats.sent_tx == stats.successful_tx == 10
+    assert [sender for _, sender in engine.sent] == ['a', 'b'] * 5
+    assert stats.total_send_lag / stats.sent_tx < 0.05
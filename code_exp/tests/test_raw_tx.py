@@ -0,0 +1,59 @@
+import pytest
+from web3 import Web3
+
+from raw_tx import CalldataTemplate, RawTransactionSender
+from conftest import PRIVATE_KEY
+
+def test_calldata_template_is_selector_plus_argument():
+    template = CalldataTemplate('issueCertificate(bytes32)')
+    arg = Web3.keccak(text='calldata')
+    assert template.encode(arg) == bytes(Web3.keccak(text='issueCertificate(bytes32)')[:4]) + bytes(arg)
+    with pytest.raises(ValueError):
+        template.encode(b'\x01' * 31)
+
+def test_raw_sender_issues_and_reads_status(chain, certificate):
+    w3 = chain.web3()
+    sender = RawTransactionSender(w3, PRIVATE_KEY, certificate.address)
+    cert_hash = Web3.keccak(text='raw-issue')
+    receipt = w3.eth.wait_for_transaction_receipt(sender.issue(cert_hash))
+    assert receipt.status == 1
+    status, institution, _ = sender.get_status(cert_hash)
+    assert status == 1 and institution == w3.eth.default_account
+
+def test_raw_sender_refreshes_fees_as_blocks_advance(chain, certificate):
+    w3 = chain.web3()
+    sender = RawTransactionSender(w3, PRIVATE_KEY, certificate.address, fee_refresh_blocks=2, fee_check_interval=1)
+    refreshes = sender.fee_refreshes
+    for i in range(4):
+        w3.eth.wait_for_transaction_receipt(sender.issue(Web3.keccak(text=f"raw-fees-{i}")))
+    assert sender.fee_refreshes > refreshes
+
+def test_raw_sender_retries_underpriced_send_with_fresh_fees(chain, certificate, monkeypatch):
+    w3 = chain.web3()
+    sender = RawTransactionSender(w3, PRIVATE_KEY, certificate.address)
+    send_raw = w3.eth.send_raw_transaction
+    attempts = []
+
+    def reject_first(raw):
+        attempts.append(raw)
+        if len(attempts) == 1:
+            raise ValueError("transaction underpriced")
+        return send_raw(raw)
+
+    monkeypatch.setattr(w3.eth, 'send_raw_transaction', reject_first)
+    refreshes = sender.fee_refreshes
+    receipt = w3.eth.wait_for_transaction_receipt(sender.issue(Web3.keccak(text='raw-underpriced')))
+    assert receipt.status == 1
+    assert len(attempts) == 2 and sender.fee_refreshes == refreshes + 1
+
+def test_raw_sender_releases_nonce_on_other_errors(chain, certificate, monkeypatch):
+    w3 = chain.web3()
+    sender = RawTransactionSender(w3, PRIVATE_KEY, certificate.address)
+
+    def fail(raw):
+        raise ConnectionError("node unreachable")
+
+    monkeypatch.setattr(w3.eth, 'send_raw_transaction', fail)
+    with pytest.raises(ConnectionError):
+        sender.issue(Web3.keccak(text='raw-unreachable'))
+    assert sender.nonce_manager.has_gaps()
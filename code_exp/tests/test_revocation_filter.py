@@ -0,0 +1,64 @@
+import pytest
+from web3 import Web3
+
+from revocation_filter import FilteredVerifier, RevocationFilter, optimal_parameters
+
+def _hashes(label, count):
+    return [Web3.keccak(text=f"{label}-{i}") for i in range(count)]
+
+def test_no_false_negatives_and_false_positives_near_the_target_rate():
+    revoked = _hashes('revoked', 2000)
+    revocation_filter = RevocationFilter(2000, fp_rate=0.01)
+    revocation_filter.update(revoked)
+    assert all(h in revocation_filter for h in revoked)
+    false_positives = sum(h in revocation_filter for h in _hashes('valid', 20000))
+    assert false_positives / 20000 < 0.02
+    assert revocation_filter.expected_fp_rate() == pytest.approx(0.01, rel=0.1)
+
+def test_optimal_parameters():
+    assert optimal_parameters(1000, 0.01) == (9586, 7)
+    assert optimal_parameters(1, 0.5)[0] == 8
+
+def test_serialized_filter_round_trips(tmp_path):
+    revocation_filter = RevocationFilter(100, fp_rate=0.001)
+    revocation_filter.update(_hashes('saved', 50))
+    revocation_filter.through_block = 42
+    path = str(tmp_path / 'revoked.bloom')
+    assert revocation_filter.save(path) == len(revocation_filter.to_bytes())
+    loaded = RevocationFilter.load(path)
+    assert (loaded.items, loaded.through_block, loaded.hash_count) == (50, 42, revocation_filter.hash_count)
+    assert loaded.to_bytes() == revocation_filter.to_bytes()
+    with pytest.raises(ValueError, match='Not a revocation filter'):
+        RevocationFilter.from_bytes(b'XXXX' + revocation_filter.to_bytes()[4:])
+
+def test_filtered_verifier_goes_on_chain_only_for_positives():
+    revoked = _hashes('revoked', 10)
+    revocation_filter = RevocationFilter(10)
+    revocation_filter.update(revoked)
+    checked = []
+
+    def check_on_chain(hashes):
+        checked.extend(hashes)
+        return [h in revoked for h in hashes]
+
+    verifier = FilteredVerifier(revocation_filter, check_on_chain)
+    queries = revoked[:3] + _hashes('valid', 200)
+    assert verifier.is_revoked_many(queries) == [True] * 3 + [False] * 200
+    stats = verifier.stats()
+    assert stats['chain_checks'] == len(checked) == 3 + stats['false_positives']
+    assert stats['queries'] == 203
+
+def test_sync_adds_revocations_from_events_incrementally(chain, certificate):
+    w3 = chain.web3()
+    hashes = _hashes('event', 4)
+    for cert_hash in hashes:
+        w3.eth.wait_for_transaction_receipt(certificate.functions.issueCertificate(cert_hash).transact())
+    w3.eth.wait_for_transaction_receipt(certificate.functions.revokeCertificate(hashes[0]).transact())
+    revocation_filter = RevocationFilter(100)
+    assert revocation_filter.sync(chain.batch_client(), certificate.address) == 1
+    assert revocation_filter.through_block == w3.eth.block_number
+
+    w3.eth.wait_for_transaction_receipt(certificate.functions.revokeCertificate(hashes[1]).transact())
+    assert revocation_filter.sync(chain.batch_client(), certificate.address) == 1
+    assert hashes[0] in revocation_filter and hashes[1] in revocation_filter
+    assert revocation_filter.items == 2
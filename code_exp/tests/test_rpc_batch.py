@@ -0,0 +1,96 @@
+import json
+
+import pytest
+import requests
+
+from rpc_batch import BatchSizeTuner, BatchRpcClient, RpcBatchError
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+class FakeSession:
+    """Answers every request with its params echoed back, in reverse order, like a node may."""
+
+    def __init__(self, fail_above=None, errors=()):
+        self.fail_above = fail_above
+        self.errors = set(errors)
+        self.batch_sizes = []
+
+    def post(self, url, data, headers, timeout):
+        payload = json.loads(data)
+        if isinstance(payload, dict):
+            return FakeResponse({'jsonrpc': '2.0', 'id': payload['id'], 'result': payload['params']})
+        self.batch_sizes.append(len(payload))
+        if self.fail_above is not None and len(payload) > self.fail_above:
+            raise requests.ConnectionError("batch too large")
+        replies = []
+        for request in payload:
+            if request['params'][0] in self.errors:
+                replies.append({'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32000, 'message': 'revert'}})
+            else:
+                replies.append({'jsonrpc': '2.0', 'id': request['id'], 'result': request['params'][0]})
+        return FakeResponse(list(reversed(replies)))
+
+def test_tuner_grows_while_throughput_improves_then_settles():
+    tuner = BatchSizeTuner(initial=4, maximum=64)
+    tuner.record(4, 1.0)    # 4/s
+    assert tuner.size == 8
+    tuner.record(8, 1.0)    # 8/s
+    assert tuner.size == 16
+    tuner.record(16, 4.0)   # 4/s: worse, fall back to the best size
+    assert tuner.size == 8
+    tuner.record(8, 0.5)
+    assert tuner.size == 8
+
+def test_tuner_ignores_partial_batches_and_halves_on_failure():
+    tuner = BatchSizeTuner(initial=16, minimum=2)
+    tuner.record(3, 0.1)
+    assert tuner.size == 16
+    tuner.failed()
+    assert tuner.size == 8
+    for _ in range(5):
+        tuner.failed()
+    assert tuner.size == 2
+
+def test_execute_returns_results_in_call_order_across_batches():
+    client = BatchRpcClient('http://node', session=FakeSession(), tuner=BatchSizeTuner(initial=3, maximum=3))
+    results = client.execute([('eth_call', [i]) for i in range(10)])
+    assert results == list(range(10))
+    assert client.posts_sent == 4
+    assert client.bytes_sent > 0 and client.bytes_received > 0
+
+def test_execute_shrinks_batches_that_fail():
+    session = FakeSession(fail_above=4)
+    client = BatchRpcClient('http://node', session=session, tuner=BatchSizeTuner(initial=16))
+    assert client.execute([('eth_call', [i]) for i in range(12)]) == list(range(12))
+    assert max(session.batch_sizes[-3:]) <= 4
+
+def test_execute_raises_or_returns_item_errors():
+    client = BatchRpcClient('http://node', session=FakeSession(errors={2}), tuner=BatchSizeTuner(initial=8))
+    calls = [('eth_call', [i]) for i in range(4)]
+    with pytest.raises(RpcBatchError):
+        client.execute(calls)
+    results = client.execute(calls, allow_errors=True)
+    assert isinstance(results[2], RpcBatchError)
+    assert [r for i, r in enumerate(results) if i != 2] == [0, 1, 3]
+
+def test_in_process_client_matches_direct_calls(chain, certificate):
+    from raw_tx import CERTIFICATE_TEMPLATES
+    from web3 import Web3
+
+    w3 = chain.web3()
+    issued = Web3.keccak(text='rpc-batch-issued')
+    w3.eth.wait_for_transaction_receipt(certificate.functions.issueCertificate(issued).transact())
+    hashes = [issued, Web3.keccak(text='rpc-batch-unknown')]
+    template = CERTIFICATE_TEMPLATES['getCertificateStatus']
+    calls = [{'to': certificate.address, 'data': '0x' + template.encode(h).hex()} for h in hashes]
+    raw = chain.batch_client().eth_call_many(calls)
+    direct = [certificate.functions.getCertificateStatus(h).call() for h in hashes]
+    assert [int.from_bytes(data[:32], 'big') for data in raw] == [status for status, _, _ in direct]
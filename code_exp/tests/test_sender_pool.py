@@ -0,0 +1,29 @@
+import pytest
+
+from sender_pool import SenderPool
+
+def test_authorizes_only_the_missing_accounts(chain, certificate):
+    w3 = chain.web3()
+    owner = w3.eth.default_account
+    accounts = w3.eth.accounts[:3]
+    w3.eth.wait_for_transaction_receipt(certificate.functions.addInstitution(accounts[1]).transact())
+    block_before = w3.eth.block_number
+
+    pool = SenderPool(w3, certificate, owner)
+    assert pool.authorize(3) == accounts
+    assert all(certificate.functions.isInstitution(a).call() for a in accounts)
+    new_transactions = sum(
+        len(w3.eth.get_block(n).transactions) for n in range(block_before + 1, w3.eth.block_number + 1)
+    )
+    assert new_transactions == len([a for a in accounts if a not in (owner, accounts[1])])
+
+    # Authorized accounts need no further transactions
+    block_after = w3.eth.block_number
+    assert pool.authorize(3) == accounts
+    assert w3.eth.block_number == block_after
+
+def test_rejects_more_accounts_than_the_node_unlocks(chain, certificate):
+    w3 = chain.web3()
+    pool = SenderPool(w3, certificate, w3.eth.default_account)
+    with pytest.raises(ValueError, match='only unlocks'):
+        pool.authorize(len(w3.eth.accounts) + 1)
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+from web3 import Web3
+
+from conftest import ARTIFACTS_DIR, deploy
+from sparse_merkle import ZERO, SparseMerkleTree, encode_proof, leaf_hash, verify_proof
+
+def _hashes(label, count):
+    return [bytes(Web3.keccak(text=f"{label}-{i}")) for i in range(count)]
+
+def _reference_root(keys, depth=0):
+    """The compacted tree hashed from scratch, level by level."""
+    if not keys:
+        return ZERO
+    if len(keys) == 1:
+        return leaf_hash(keys[0])
+    left = [k for k in keys if not (int.from_bytes(k, 'big') >> (255 - depth)) & 1]
+    right = [k for k in keys if (int.from_bytes(k, 'big') >> (255 - depth)) & 1]
+    return bytes(Web3.keccak(_reference_root(left, depth + 1) + _reference_root(right, depth + 1)))
+
+def _flip_last_bit(key):
+    return key[:-1] + bytes([key[-1] ^ 1])
+
+def test_empty_tree_has_zero_root_and_proves_absence():
+    tree = SparseMerkleTree()
+    proof = tree.prove(_hashes('empty', 1)[0])
+    assert tree.root == ZERO
+    assert not proof['revoked'] and proof['depth'] == 0
+    assert verify_proof(tree.root, proof)
+
+@pytest.mark.parametrize('count', [1, 2, 5, 33])
+def test_root_matches_reference(count):
+    keys = _hashes('ref', count)
+    assert SparseMerkleTree(keys).root == _reference_root(keys)
+
+def test_incremental_updates_match_a_fresh_tree():
+    keys = _hashes('incremental', 40)
+    tree = SparseMerkleTree()
+    for start in range(0, 40, 7):
+        tree.add_many(keys[start:start + 7])
+        assert tree.root == SparseMerkleTree(keys[:start + 7]).root
+    assert tree.add_many(keys[:3]) == 0
+    assert len(tree) == 40
+
+def test_membership_and_non_membership_proofs_verify():
+    revoked = _hashes('revoked', 20)
+    tree = SparseMerkleTree(revoked)
+    for key in revoked[:5]:
+        proof = tree.prove(key)
+        assert proof['revoked'] and verify_proof(tree.root, proof)
+    for key in _hashes('valid', 5):
+        proof = tree.prove(key)
+        assert not proof['revoked'] and verify_proof(tree.root, proof)
+
+def test_non_membership_proof_can_end_at_a_neighbor_leaf():
+    revoked = _hashes('neighbor', 8)
+    tree = SparseMerkleTree(revoked)
+    proof = tree.prove(_flip_last_bit(revoked[0]))
+    assert proof['neighbor'] == revoked[0]
+    assert verify_proof(tree.root, proof)
+    assert len(encode_proof(proof)) == 2 + 32 + 32 + 32 * len(proof['siblings'])
+
+def test_forged_proofs_are_rejected():
+    revoked = _hashes('forged', 8)
+    tree = SparseMerkleTree(revoked)
+    membership = tree.prove(revoked[3])
+    assert not verify_proof(tree.root, dict(membership, revoked=False, neighbor=None))
+    assert not verify_proof(tree.root, dict(membership, neighbor=revoked[3], revoked=False))
+    absent = tree.prove(_hashes('absent', 1)[0])
+    assert not verify_proof(tree.root, dict(absent, revoked=True))
+    assert not verify_proof(SparseMerkleTree(revoked[:7]).root, membership)
+
+@pytest.fixture
+def registry(chain):
+    if not os.path.exists(os.path.join(ARTIFACTS_DIR, 'RevocationRegistry.sol', 'RevocationRegistry.json')):
+        pytest.skip("RevocationRegistry has not been compiled; run `npx hardhat compile`")
+    return deploy(chain, 'RevocationRegistry', chain.web3().eth.default_account)
+
+def _verify_on_chain(registry, proof):
+    if proof['revoked']:
+        return registry.functions.verifyRevoked(proof['key'], proof['depth'], proof['bitmap'], proof['siblings']).call()
+    neighbor = proof['neighbor'] if proof['neighbor'] is not None else ZERO
+    return registry.functions.verifyNotRevoked(
+        proof['key'], neighbor, proof['depth'], proof['bitmap'], proof['siblings']
+    ).call()
+
+def test_registry_checks_proofs_from_sparse_merkle_py(chain, registry):
+    w3 = chain.web3()
+    revoked = _hashes('registry', 12)
+    tree = SparseMerkleTree()
+    for chunk in (revoked[:5], revoked[5:]):
+        previous_root = tree.root
+        tree.add_many(chunk)
+        w3.eth.wait_for_transaction_receipt(registry.functions.publishRevocations(previous_root, tree.root, chunk).transact())
+    assert registry.functions.root().call() == tree.root
+    assert registry.functions.revokedCount().call() == len(revoked)
+
+    for key in revoked[:3] + _hashes('registry-valid', 3) + [_flip_last_bit(revoked[4])]:
+        assert _verify_on_chain(registry, tree.prove(key))
+    # A membership claim for an absent key does not pass
+    absent = tree.prove(_hashes('registry-absent', 1)[0])
+    assert not registry.functions.verifyRevoked(absent['key'], absent['depth'], absent['bitmap'], absent['siblings']).call()
+
+def test_registry_only_accepts_owner_updates_on_the_current_root(chain, registry):
+    w3 = chain.web3()
+    keys = _hashes('owner', 2)
+    with pytest.raises(Exception, match='Stale revocation root'):
+        registry.functions.publishRevocations(b'\x01' * 32, SparseMerkleTree(keys).root, keys).call()
+    outsider = w3.eth.accounts[1]
+    with pytest.raises(Exception):
+        registry.functions.publishRevocations(ZERO, SparseMerkleTree(keys).root, keys).call({'from': outsider})
@@ -0,0 +1,80 @@
+import pytest
+from web3 import Web3
+
+from certificate_batch import has_function
+from state_seeder import (
+    CERTIFICATE_COUNT_SLOT, STATUS_ISSUED, STATUS_REVOKED, SeedingError, StateSeeder, certificate_slot, pack_details
+)
+
+class OverlayRpc:
+    """Reads from the in-process chain, with hardhat_setStorageAt writes applied to an overlay."""
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self.storage = {}
+        self.batches = []
+
+    def request(self, method, params):
+        if method == 'eth_getStorageAt' and (params[0], params[1]) in self.storage:
+            return self.storage[(params[0], params[1])]
+        return self.rpc.request(method, params)
+
+    def execute(self, calls):
+        self.batches.append(calls)
+        for method, (address, slot, value) in calls:
+            assert method == 'hardhat_setStorageAt'
+            self.storage[(address, slot)] = value
+        return [True] * len(calls)
+
+def _issue(chain, certificate, cert_hash):
+    chain.web3().eth.wait_for_transaction_receipt(certificate.functions.issueCertificate(cert_hash).transact())
+
+def test_computed_slots_match_a_certificate_issued_by_transaction(chain, certificate):
+    w3 = chain.web3()
+    cert_hash = Web3.keccak(text='layout')
+    _issue(chain, certificate, cert_hash)
+    seeder = StateSeeder(chain.batch_client(), certificate.address, w3.eth.default_account)
+    seeder.check_layout(w3.eth.default_account)
+
+    slot = certificate_slot(cert_hash)
+    _, _, timestamp = certificate.functions.getCertificateStatus(cert_hash).call()
+    assert seeder._read_slot(slot) == pack_details(STATUS_ISSUED, w3.eth.default_account)
+    assert seeder._read_slot(slot + 1) == timestamp
+    seeder.verify(certificate, [cert_hash])
+
+def test_certificate_count_slot_matches_the_contract(chain, certificate):
+    if not has_function(certificate, 'getCertificateCount'):
+        pytest.skip("stale Certificate artifact without _certificateCount; run `npx hardhat compile`")
+    w3 = chain.web3()
+    for i in range(3):
+        _issue(chain, certificate, Web3.keccak(text=f"count-{i}"))
+    seeder = StateSeeder(chain.batch_client(), certificate.address, w3.eth.default_account)
+    assert seeder.certificate_count() == certificate.functions.getCertificateCount().call() == 3
+
+def test_layout_check_and_verify_reject_mismatches(chain, certificate):
+    w3 = chain.web3()
+    seeder = StateSeeder(chain.batch_client(), certificate.address, w3.eth.default_account)
+    with pytest.raises(SeedingError, match='Unexpected storage layout'):
+        seeder.check_layout('0x' + '11' * 20)
+    with pytest.raises(SeedingError, match='reads back as status 0'):
+        seeder.verify(certificate, [Web3.keccak(text='never-seeded')])
+
+def test_seed_writes_two_slots_per_certificate_and_raises_the_count(chain, certificate):
+    w3 = chain.web3()
+    rpc = OverlayRpc(chain.batch_client())
+    seeder = StateSeeder(rpc, certificate.address, w3.eth.default_account)
+    blocks = [[Web3.keccak(text=f"seed-{i}") for i in range(start, start + 3)] for start in (0, 3)]
+
+    assert seeder.seed(blocks, status=STATUS_REVOKED, timestamp=1234) == 6
+    assert [len(batch) for batch in rpc.batches] == [6, 6, 1]
+    for cert_hash in blocks[0] + blocks[1]:
+        slot = certificate_slot(cert_hash)
+        assert seeder._read_slot(slot) == pack_details(STATUS_REVOKED, w3.eth.default_account)
+        assert seeder._read_slot(slot + 1) == 1234
+    assert seeder.certificate_count() == 6
+
+    # A second run continues the count from the first
+    seeder.seed([[Web3.keccak(text='seed-extra')]], timestamp=1234)
+    assert seeder.certificate_count() == 7
+    assert seeder.seeded == 7
+    assert rpc.batches[-1] == [('hardhat_setStorageAt', [certificate.address, hex(CERTIFICATE_COUNT_SLOT), '0x' + (7).to_bytes(32, 'big').hex()])]
@@ -0,0 +1,72 @@
+from web3 import Web3
+
+from tx_pipeline import NonceManager, TransactionPipeline
+
+def _hashes(label, count):
+    return [Web3.keccak(text=f"{label}-{i}") for i in range(count)]
+
+def test_nonce_manager_allocates_consecutive_nonces(chain):
+    w3 = chain.web3()
+    manager = NonceManager(w3, w3.eth.default_account)
+    first = manager.sync()
+    assert [manager.allocate() for _ in range(3)] == [first, first + 1, first + 2]
+
+def test_nonce_manager_recycles_released_nonces_first(chain):
+    w3 = chain.web3()
+    manager = NonceManager(w3, w3.eth.default_account)
+    first = manager.sync()
+    allocated = [manager.allocate() for _ in range(3)]
+    assert manager.release(allocated[1])
+    assert manager.has_gaps()
+    assert manager.allocate() == first + 1
+    assert manager.allocate() == first + 3
+
+def test_nonce_manager_does_not_recycle_consumed_nonces(chain):
+    w3 = chain.web3()
+    manager = NonceManager(w3, w3.eth.default_account)
+    nonce = manager.allocate()
+    tx_hash = w3.eth.send_transaction({'from': manager.address, 'to': manager.address, 'value': 0, 'nonce': nonce})
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+    assert not manager.release(nonce)
+    assert not manager.has_gaps()
+
+def test_repair_gaps_fills_released_nonces(chain):
+    w3 = chain.web3()
+    manager = NonceManager(w3, w3.eth.default_account)
+    first = manager.sync()
+    manager.allocate()
+    manager.release(first)
+    assert manager.repair_gaps() == 1
+    assert w3.eth.get_transaction_count(manager.address) == first + 1
+
+def test_pipeline_confirms_every_item_in_order(chain, certificate):
+    w3 = chain.web3()
+    hashes = _hashes('pipeline', 10)
+    pipeline = TransactionPipeline(w3, NonceManager(w3, w3.eth.default_account), window=4)
+    results = pipeline.run(lambda h: certificate.functions.issueCertificate(h), hashes)
+    assert [r['item'] for r in results] == hashes
+    assert all(r['status'] == 1 and r['block_number'] is not None for r in results)
+    assert len({r['nonce'] for r in results}) == len(hashes)
+    assert all(certificate.functions.getCertificateStatus(h).call()[0] == 1 for h in hashes)
+
+def test_pipeline_estimates_gas_per_item(chain, certificate):
+    w3 = chain.web3()
+    issued, fresh = _hashes('issued', 1), _hashes('fresh', 2)
+    w3.eth.wait_for_transaction_receipt(certificate.functions.issueCertificate(issued[0]).transact())
+    pipeline = TransactionPipeline(w3, NonceManager(w3, w3.eth.default_account))
+    # Revoking costs a different amount of gas than issuing; each item gets its own estimate
+    calls = [('revoke', issued[0])] + [('issue', h) for h in fresh]
+    results = pipeline.run(
+        lambda c: getattr(certificate.functions, f'{c[0]}Certificate')(c[1]), calls
+    )
+    assert [r['status'] for r in results] == [1, 1, 1]
+
+def test_pipeline_records_items_that_would_revert(chain, certificate):
+    w3 = chain.web3()
+    duplicate = _hashes('duplicate', 1)[0]
+    w3.eth.wait_for_transaction_receipt(certificate.functions.issueCertificate(duplicate).transact())
+    fresh = _hashes('after-duplicate', 2)
+    pipeline = TransactionPipeline(w3, NonceManager(w3, w3.eth.default_account))
+    results = pipeline.run(lambda h: certificate.functions.issueCertificate(h), [duplicate] + fresh)
+    assert results[0]['status'] == 0 and results[0]['error']
+    assert [r['status'] for r in results[1:]] == [1, 1]
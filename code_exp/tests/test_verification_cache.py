@@ -0,0 +1,80 @@
+from eth_abi import decode
+from web3 import Web3
+
+from raw_tx import CERTIFICATE_STATUS_TYPES
+from state_seeder import STATUS_ISSUED, STATUS_REVOKED
+from verification_cache import VerificationCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class StaticRpc:
+    """A node whose head never moves."""
+
+    def request(self, method, params):
+        assert method == 'eth_blockNumber'
+        return '0x10'
+
+def _statuses_at(chain, certificate):
+    """Batched getCertificateStatus calls at a block, as the verification experiment loads them."""
+    def load_many(hashes, block):
+        transactions = [
+            {'to': certificate.address, 'data': certificate.encodeABI(fn_name='getCertificateStatus', args=[h])}
+            for h in hashes
+        ]
+        return [decode(CERTIFICATE_STATUS_TYPES, data) for data in chain.batch_client().eth_call_many(transactions, block=block)]
+    return load_many
+
+def _transact(chain, call):
+    chain.web3().eth.wait_for_transaction_receipt(call.transact())
+
+def test_revocation_is_served_once_the_staleness_bound_passes(chain, certificate):
+    cert_hash = Web3.keccak(text='popular')
+    _transact(chain, certificate.functions.issueCertificate(cert_hash))
+    clock = FakeClock()
+    cache = VerificationCache(_statuses_at(chain, certificate), chain.batch_client(), certificate.address,
+                              max_staleness=1.0, clock=clock)
+    assert cache.get(cert_hash)[0] == STATUS_ISSUED
+    _transact(chain, certificate.functions.revokeCertificate(cert_hash))
+
+    # Within the bound the cached status may still be served
+    clock.now = 0.5
+    assert cache.get(cert_hash)[0] == STATUS_ISSUED
+    clock.now = 1.5
+    assert cache.get(cert_hash)[0] == STATUS_REVOKED
+    assert cache.stats()['invalidations'] == 1
+
+def test_events_older_than_the_entry_do_not_invalidate_it(chain, certificate):
+    cert_hash = Web3.keccak(text='settled')
+    cache = VerificationCache(_statuses_at(chain, certificate), chain.batch_client(), certificate.address, clock=FakeClock())
+    _transact(chain, certificate.functions.issueCertificate(cert_hash))
+    # Loaded after the event was mined, but before the cache polled for it
+    assert cache.get(cert_hash)[0] == STATUS_ISSUED
+    assert cache.poll() == 0
+    assert cache.get(cert_hash)[0] == STATUS_ISSUED
+    assert cache.stats()['misses'] == 1
+
+def test_least_recently_used_entries_are_evicted_and_old_ones_expire():
+    loads = []
+
+    def load_many(hashes, block):
+        loads.append(hashes)
+        return [(STATUS_ISSUED, '0x' + '00' * 20, 1)] * len(hashes)
+
+    clock = FakeClock()
+    cache = VerificationCache(load_many, StaticRpc(), '0x' + '11' * 20, capacity=2, ttl=10, max_staleness=100, clock=clock)
+    a, b, c = (bytes([i]) * 32 for i in range(3))
+    cache.get_many([a, b, a])
+    assert loads == [[a, b]]
+    cache.get(a)       # a is now the most recent
+    cache.get(c)       # evicts b
+    cache.get(b)
+    assert loads[-1] == [b] and cache.stats()['evictions'] == 2
+
+    clock.now = 20
+    cache.get(c)
+    assert loads[-1] == [c] and cache.stats()['expirations'] == 1